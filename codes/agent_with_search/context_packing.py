@@ -0,0 +1,206 @@
+"""
+Context packing for the agent with search.
+
+Retrieved documents (full Tavily contents plus full Wikipedia pages) are far larger than
+what the answer needs. Before generation they go through four steps:
+
+1. Chunk: split every document into passages of about `chunk_tokens` tokens, on paragraph
+   and sentence boundaries. Each chunk keeps the metadata (href / source) of its document.
+2. Dedupe: drop chunks whose word shingles overlap an earlier, better-scored chunk by more
+   than `dedupe_threshold` (Jaccard), so the same fact from web and Wikipedia is sent once.
+3. Score: rank chunks against the question with BM25, vectorised over the query terms.
+4. Pack: take the best matching chunks until `max_tokens` is reached, and render each one
+   inside its `<Document ...>` provenance tag.
+
+Token counts are estimated as characters / 4, which is close enough for budgeting.
+
+Usage:
+    packed = pack_context(question, documents, max_tokens=1500)
+    prompt = answer_template.format(question=question, context=packed.text)
+"""
+# Import libraries
+import re
+import math
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import numpy as np
+from langchain_core.documents import Document
+
+_WORD = re.compile(r"\w+")
+_PARAGRAPH = re.compile(r"\n\s*\n")
+_SENTENCE = re.compile(r"(?<=[.!?])\s+")
+_SEPARATOR = "\n\n---\n\n"
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / 4)
+
+
+def tokenize(text: str) -> list[str]:
+    return _WORD.findall(text.casefold())
+
+
+@dataclass
+class Chunk:
+    """A passage of a retrieved document."""
+    text: str
+    metadata: dict
+    tokens: int
+    score: float = 0.0
+
+
+@dataclass
+class PackedContext:
+    """Packed prompt context plus what was kept and dropped, for logging and benchmarks."""
+    text: str
+    chunks: list[Chunk]
+    input_tokens: int
+    packed_tokens: int
+    candidates: int
+    duplicates: int
+
+
+# Chunking
+def _split_long(text: str, max_chars: int) -> list[str]:
+    """Split an oversized paragraph on sentence boundaries (or hard-wrap a single huge sentence)."""
+    pieces, current = [], ""
+    for sentence in _SENTENCE.split(text):
+        while len(sentence) > max_chars:
+            pieces.append(sentence[:max_chars])
+            sentence = sentence[max_chars:]
+        if current and len(current) + len(sentence) + 1 > max_chars:
+            pieces.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def chunk_documents(documents: list[Document], chunk_tokens: int = 200) -> list[Chunk]:
+    """Split documents into ~`chunk_tokens` passages that keep their document's metadata."""
+    max_chars = chunk_tokens * 4
+    chunks = []
+    for doc in documents:
+        current = ""
+        paragraphs = [p.strip() for p in _PARAGRAPH.split(doc.page_content) if p.strip()]
+        for paragraph in paragraphs:
+            for piece in _split_long(paragraph, max_chars) if len(paragraph) > max_chars else [paragraph]:
+                if current and len(current) + len(piece) + 2 > max_chars:
+                    chunks.append(Chunk(current, doc.metadata, estimate_tokens(current)))
+                    current = piece
+                else:
+                    current = f"{current}\n\n{piece}" if current else piece
+        if current:
+            chunks.append(Chunk(current, doc.metadata, estimate_tokens(current)))
+    return chunks
+
+
+# Scoring
+def bm25_scores(query: str, passages: list[list[str]], k1: float = 1.5, b: float = 0.75) -> np.ndarray:
+    """BM25 score of every tokenized passage against `query`."""
+    terms = list(dict.fromkeys(tokenize(query)))
+    if not terms or not passages:
+        return np.zeros(len(passages))
+
+    index = {term: i for i, term in enumerate(terms)}
+    tf = np.zeros((len(passages), len(terms)))
+    for row, words in enumerate(passages):
+        for word in words:
+            column = index.get(word)
+            if column is not None:
+                tf[row, column] += 1
+
+    lengths = np.array([len(words) for words in passages], dtype=float)
+    avg_length = lengths.mean() or 1.0
+    df = (tf > 0).sum(axis=0)
+    idf = np.log1p((len(passages) - df + 0.5) / (df + 0.5))
+    norm = k1 * (1 - b + b * lengths / avg_length)
+    return ((tf * (k1 + 1)) / (tf + norm[:, None]) * idf).sum(axis=1)
+
+
+# Deduplication
+def _shingles(words: list[str], size: int = 3) -> set:
+    if len(words) < size:
+        return {tuple(words)}
+    return {tuple(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def _is_duplicate(shingles: set, kept: list[set], threshold: float) -> bool:
+    for other in kept:
+        overlap = len(shingles & other)
+        if overlap and overlap / len(shingles | other) >= threshold:
+            return True
+    return False
+
+
+# Rendering
+def format_chunk(chunk: Chunk) -> str:
+    """Render a chunk inside the provenance tag of its source document."""
+    metadata = chunk.metadata
+    if "href" in metadata:
+        return f'<Document href="{metadata["href"]}">\n{chunk.text}\n</Document>'
+    return f'<Document source="{metadata.get("source", "")}" page="{metadata.get("page", "")}">\n{chunk.text}\n</Document>'
+
+
+def pack_context(
+        question: str,
+        documents: list[Document],
+        max_tokens: int = 1500,
+        chunk_tokens: int = 200,
+        dedupe_threshold: float = 0.6,
+        formatter: Optional[Callable[[Chunk], str]] = None,
+) -> PackedContext:
+    """
+    Chunk, dedupe, score and pack `documents` into at most `max_tokens` of prompt context.
+
+    Args:
+        question: The user question used for scoring.
+        documents: Retrieved documents from every source.
+        max_tokens: Token budget of the packed context.
+        chunk_tokens: Target size of each chunk.
+        dedupe_threshold: Shingle Jaccard similarity above which a chunk counts as a duplicate.
+        formatter: Renders one chunk; defaults to `format_chunk`.
+
+    Returns:
+        PackedContext with the rendered text, best chunk first.
+    """
+    formatter = formatter or format_chunk
+    chunks = chunk_documents(documents, chunk_tokens)
+    words = [tokenize(chunk.text) for chunk in chunks]
+    scores = bm25_scores(question, words)
+
+    # Chunks sharing no term with the question only dilute the prompt, unless nothing matches
+    relevant = scores > 0 if scores.any() else np.ones(len(chunks), dtype=bool)
+
+    selected, texts, kept_shingles, used, duplicates = [], [], [], 0, 0
+    # Stable sort: ties keep retrieval order
+    for i in np.argsort(-scores, kind="stable"):
+        if not relevant[i]:
+            continue
+        chunk = chunks[i]
+        chunk.score = float(scores[i])
+        shingles = _shingles(words[i])
+        if _is_duplicate(shingles, kept_shingles, dedupe_threshold):
+            duplicates += 1
+            continue
+        # Budget the rendered chunk, so provenance tags and separators are counted too
+        rendered = formatter(chunk)
+        cost = estimate_tokens(rendered) + (estimate_tokens(_SEPARATOR) if selected else 0)
+        if used + cost > max_tokens:
+            continue
+        selected.append(chunk)
+        texts.append(rendered)
+        kept_shingles.append(shingles)
+        used += cost
+
+    return PackedContext(
+        text=_SEPARATOR.join(texts),
+        chunks=selected,
+        input_tokens=sum(estimate_tokens(doc.page_content) for doc in documents),
+        packed_tokens=used,
+        candidates=len(chunks),
+        duplicates=duplicates,
+    )
@@ -1,82 +1,95 @@
 """
 This script implements an agent capable of web search with Tavily and access Wikipedia
 to answer user queries.
+
+Run it with `--stream` to print retrieval progress and answer tokens as they arrive
+(see `stream_answer`), instead of waiting for the whole answer, and with `--diagram` to
+save the graph diagram. Importing the module only registers the graph; it is compiled on
+first use through the graph registry.
 """
 # Import libraries
+import time
+import asyncio
+import argparse
 from operator import add
+from typing import Any, AsyncIterator, Optional
 from typing_extensions import TypedDict, Annotated
 
 from langgraph.graph import StateGraph, START, END
-from langchain_google_genai import ChatGoogleGenerativeAI
+from langchain_core.documents import Document
+from langchain_core.runnables import RunnableConfig
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
-from langchain_community.tools import TavilySearchResults
-from langchain_community.document_loaders import WikipediaLoader
 
-from codes.config.config import config
+from codes.utils.llm_factory import get_async_chat_model
+from codes.utils.graph_diagram import render_diagram
+from codes.utils.graph_registry import get_compiled_graph, register_graph
+from codes.agent_with_search.context_packing import pack_context
+from codes.agent_with_search.retrievers import RetrievalResult, get_retriever, retrieve_with_deadline
+
+# Retrieval deadlines (seconds); override per run via config["configurable"]
+SOURCE_TIMEOUTS = {"web": 4.0, "wikipedia": 4.0}
+RETRIEVAL_BUDGET = 5.0
+
+# Token budget of the packed context in the answer prompt; override via config["configurable"]
+CONTEXT_TOKENS = 1500
 
-# Create ChatModel
-llm = ChatGoogleGenerativeAI(
-    model=config.model.model_name,
-    api_key=config.model.api_key
-)
 
 # Create State
 class State(TypedDict):
     question: str
     answer: str
-    context: Annotated[list, add]
+    context: Annotated[list[Document], add]
+    sources: Annotated[list, add]
+
+
+async def _retrieve(source: str, question: str, config: RunnableConfig) -> RetrievalResult:
+    """Query one source within min(per-source timeout, overall retrieval budget)."""
+    configurable = config.get("configurable", {})
+    timeout = min(
+        configurable.get(f"{source}_timeout", SOURCE_TIMEOUTS[source]),
+        configurable.get("retrieval_budget", RETRIEVAL_BUDGET),
+    )
+    return await retrieve_with_deadline(get_retriever(source), question, timeout)
+
 
 # Create Nodes
-def search_web(state):
+async def search_web(state: State, config: RunnableConfig):
     """ Retrieve docs from web search """
 
     # Search
-    tavily_search = TavilySearchResults(tavily_api_key=config.tavily_api_key.get_secret_value(), max_results=3)
-    search_docs = tavily_search.invoke(state['question'])
-
-    # Format
-    formatted_search_docs = "\n\n---\n\n".join(
-        [
-            f'<Document href="{doc["url"]}">\n{doc["content"]}\n</Document>'
-            for doc in search_docs
-        ]
-    )
+    result = await _retrieve("web", state['question'], config)
 
-    return {"context": [formatted_search_docs]}
+    return {"context": result.documents, "sources": [result.summary()]}
 
 
-def search_wikipedia(state):
+async def search_wikipedia(state: State, config: RunnableConfig):
     """ Retrieve docs from wikipedia """
 
     # Search
-    search_docs = WikipediaLoader(query=state['question'],
-                                  load_max_docs=2).load()
-
-    # Format
-    formatted_search_docs = "\n\n---\n\n".join(
-        [
-            f'<Document source="{doc.metadata["source"]}" page="{doc.metadata.get("page", "")}">\n{doc.page_content}\n</Document>'
-            for doc in search_docs
-        ]
-    )
+    result = await _retrieve("wikipedia", state['question'], config)
 
-    return {"context": [formatted_search_docs]}
+    return {"context": result.documents, "sources": [result.summary()]}
 
 
-def generate_answer(state):
+async def generate_answer(state: State, config: RunnableConfig):
     """ Node to answer a question """
 
     # Get state
-    context = state["context"]
     question = state["question"]
 
+    # Keep only the best, non-duplicate passages within the token budget
+    budget = config.get("configurable", {}).get("context_tokens", CONTEXT_TOKENS)
+    packed = pack_context(question, state["context"], max_tokens=budget)
+    context = packed.text or "No context could be retrieved in time."
+
     # Template
     answer_template = """Answer the question {question} using this context: {context}"""
     answer_instructions = answer_template.format(question=question,
                                                  context=context)
 
-    # Answer
-    answer = llm.invoke([SystemMessage(content=answer_instructions)] + [HumanMessage(content=f"Answer the question.")])
+    # Answer with the model whose async client belongs to this event loop
+    llm = get_async_chat_model()
+    answer = await llm.ainvoke([SystemMessage(content=answer_instructions)] + [HumanMessage(content=f"Answer the question.")])
 
     # Append it to state
     return {"answer": answer}
@@ -96,12 +109,86 @@ builder.add_edge(START, "search_web")
 builder.add_edge("search_wikipedia", "generate_answer")
 builder.add_edge("search_web", "generate_answer")
 builder.add_edge("generate_answer", END)
-graph = builder.compile()
-
-graph_image = graph.get_graph().draw_mermaid_png()
-with open("agent_with_search.png", "wb") as f:
-    f.write(graph_image)
 
 
-result = graph.invoke({"question": "What is the latest price for bitcoin?"})
-print(result['answer'].content)
\ No newline at end of file
+@register_graph("agent-with-search")
+def build_graph() -> StateGraph:
+    return builder
+
+
+def __getattr__(name: str):
+    # `graph` is compiled lazily, on first access
+    if name == "graph":
+        return get_compiled_graph("agent-with-search")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Streaming
+async def stream_answer(question: str, config: Optional[RunnableConfig] = None) -> AsyncIterator[dict[str, Any]]:
+    """
+    Run the graph and yield events as they happen.
+
+    Events (dicts with a "type" key):
+        retrieval: one source finished; `source`, `status`, `documents`, `elapsed`.
+        token:     a piece of the answer; `content`, plus `ttft` (seconds) on the first token.
+        done:      the full answer message in `answer`, and `elapsed` seconds.
+    """
+    start = time.perf_counter()
+    first_token = True
+    graph = get_compiled_graph("agent-with-search")
+    async for mode, chunk in graph.astream(
+            {"question": question}, config, stream_mode=["updates", "messages"]
+    ):
+        if mode == "messages":
+            message, metadata = chunk
+            if metadata.get("langgraph_node") != "generate_answer" or not message.content:
+                continue
+            event = {"type": "token", "content": message.content}
+            if first_token:
+                event["ttft"] = time.perf_counter() - start
+                first_token = False
+            yield event
+        else:
+            for node, update in chunk.items():
+                if node in ("search_web", "search_wikipedia"):
+                    for summary in update["sources"]:
+                        yield {"type": "retrieval", **summary}
+                elif node == "generate_answer":
+                    yield {"type": "done", "answer": update["answer"], "elapsed": time.perf_counter() - start}
+
+
+async def _print_stream(question: str):
+    async for event in stream_answer(question):
+        if event["type"] == "retrieval":
+            print(f"[{event['source']}] {event['status']} ({event['documents']} docs, {event['elapsed']}s)")
+        elif event["type"] == "token":
+            if "ttft" in event:
+                print(f"[first token after {event['ttft']:.2f}s]")
+            print(event["content"], end="", flush=True)
+        else:
+            print(f"\n[done in {event['elapsed']:.2f}s]")
+
+
+def save_diagram(path: str = "agent_with_search.svg"):
+    render_diagram(get_compiled_graph("agent-with-search"), path)
+    print(f"Graph saved as {path}")
+
+
+def main(question: str, stream: bool = False, diagram: bool = False):
+    if diagram:
+        save_diagram()
+    if stream:
+        asyncio.run(_print_stream(question))
+    else:
+        result = asyncio.run(get_compiled_graph("agent-with-search").ainvoke({"question": question}))
+        print(result['answer'].content)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Agent with web and Wikipedia search")
+    parser.add_argument("question", nargs="?", default="What is the latest price for bitcoin?")
+    parser.add_argument("--stream", action="store_true",
+                        help="Print retrieval progress and answer tokens as they arrive")
+    parser.add_argument("--diagram", action="store_true", help="Save the graph diagram as agent_with_search.svg")
+    args = parser.parse_args()
+    main(args.question, stream=args.stream, diagram=args.diagram)
@@ -0,0 +1,223 @@
+"""
+Retrieval sources for the agent with search.
+
+Each source exposes `async aretrieve(query) -> list[Document]` and is created once and
+reused across requests (one Tavily client, one Wikipedia API wrapper per process).
+`retrieve_with_deadline` bounds a source by a timeout: a source that misses its deadline
+is cancelled and reported as degraded instead of holding up the answer.
+
+LocalRetriever is an offline stand-in with injectable latency, jitter and failures, used
+automatically when MODEL__PROVIDER=local and for tail-latency experiments.
+
+The default web and Wikipedia sources are wrapped in a CachedRetriever, so repeated or
+near-identical questions are answered from `retrieval_cache` instead of the upstream API
+(set RETRIEVAL_CACHE_PATH to keep results across restarts).
+
+Usage:
+    from codes.agent_with_search.retrievers import LocalRetriever, set_retriever
+
+    set_retriever("web", LocalRetriever("web", latency=0.2, jitter=2.0))
+"""
+# Import libraries
+import time
+import random
+import asyncio
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Optional, Protocol
+
+from langchain_core.documents import Document
+
+from codes.config.config import config
+from codes.utils.retrieval_cache import RetrievalCache
+
+logger = logging.getLogger(__name__)
+
+
+class Retriever(Protocol):
+    name: str
+
+    async def aretrieve(self, query: str) -> list[Document]:
+        ...
+
+
+class TavilyRetriever:
+    """Web search through a single, reused Tavily client."""
+
+    def __init__(self, max_results: int = 3):
+        self.name = "web"
+        self.max_results = max_results
+        self._tool = None
+
+    @property
+    def tool(self):
+        if self._tool is None:
+            from langchain_community.tools import TavilySearchResults
+
+            self._tool = TavilySearchResults(
+                tavily_api_key=config.tavily_api_key.get_secret_value(), max_results=self.max_results
+            )
+        return self._tool
+
+    async def aretrieve(self, query: str) -> list[Document]:
+        results = await self.tool.ainvoke(query)
+        return [Document(page_content=r["content"], metadata={"href": r["url"]}) for r in results]
+
+
+class WikipediaRetriever:
+    """Wikipedia pages through a single, reused API wrapper (the client is sync, so it runs in a thread)."""
+
+    def __init__(self, load_max_docs: int = 2, doc_content_chars_max: int = 4000):
+        self.name = "wikipedia"
+        self.load_max_docs = load_max_docs
+        self.doc_content_chars_max = doc_content_chars_max
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            from langchain_community.utilities import WikipediaAPIWrapper
+
+            self._client = WikipediaAPIWrapper(
+                top_k_results=self.load_max_docs, doc_content_chars_max=self.doc_content_chars_max
+            )
+        return self._client
+
+    async def aretrieve(self, query: str) -> list[Document]:
+        # A cancelled wait leaves the worker thread to finish on its own; its result is dropped
+        return await asyncio.to_thread(self.client.load, query)
+
+
+class LocalRetriever:
+    """
+    Offline stand-in retriever.
+
+    Args:
+        name: Source name ("web" or "wikipedia" for the built-in nodes).
+        documents: Documents to return; a placeholder document is generated when omitted.
+        latency: Base delay in seconds.
+        jitter: Extra random delay in [0, jitter) seconds, to model tail latency.
+        failure_rate: Probability of raising instead of answering.
+        seed: Seed for the latency/failure random generator.
+    """
+
+    def __init__(
+            self,
+            name: str,
+            documents: Optional[list[Document]] = None,
+            latency: float = 0.0,
+            jitter: float = 0.0,
+            failure_rate: float = 0.0,
+            seed: Optional[int] = None,
+    ):
+        self.name = name
+        self.documents = documents
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+        self.calls = 0
+
+    async def aretrieve(self, query: str) -> list[Document]:
+        self.calls += 1
+        await asyncio.sleep(self.latency + self._random.random() * self.jitter)
+        if self._random.random() < self.failure_rate:
+            raise ConnectionError(f"{self.name} stand-in failed")
+        if self.documents is not None:
+            return list(self.documents)
+        metadata = {"href": f"https://local.test/{self.name}"} if self.name == "web" else {
+            "source": f"https://local.test/{self.name}", "page": ""
+        }
+        return [Document(page_content=f"Local {self.name} result for: {query}", metadata=metadata)]
+
+
+class CachedRetriever:
+    """Serve `retriever` through a RetrievalCache keyed by its source name and the normalised query."""
+
+    def __init__(self, retriever: Retriever, cache: RetrievalCache):
+        self.name = retriever.name
+        self.retriever = retriever
+        self.cache = cache
+
+    async def aretrieve(self, query: str) -> list[Document]:
+        return await self.cache.aget_or_fetch(self.name, query, lambda: self.retriever.aretrieve(query))
+
+
+@dataclass
+class RetrievalResult:
+    """Outcome of one source within its deadline."""
+    source: str
+    documents: list[Document] = field(default_factory=list)
+    status: str = "ok"  # ok | timeout | error
+    elapsed: float = 0.0
+    error: Optional[str] = None
+
+    def summary(self) -> dict:
+        return {
+            "source": self.source,
+            "status": self.status,
+            "documents": len(self.documents),
+            "elapsed": round(self.elapsed, 3),
+            **({"error": self.error} if self.error else {}),
+        }
+
+
+async def retrieve_with_deadline(retriever: Retriever, query: str, timeout: float) -> RetrievalResult:
+    """Run `retriever` for at most `timeout` seconds; degrade to an empty result instead of raising."""
+    start = time.perf_counter()
+    try:
+        documents = await asyncio.wait_for(retriever.aretrieve(query), timeout=max(timeout, 0.0))
+        return RetrievalResult(retriever.name, documents, "ok", time.perf_counter() - start)
+    except asyncio.TimeoutError:
+        logger.warning(f"Retrieval from {retriever.name} exceeded {timeout:.2f}s, continuing without it")
+        return RetrievalResult(retriever.name, status="timeout", elapsed=time.perf_counter() - start)
+    except Exception as e:
+        logger.warning(f"Retrieval from {retriever.name} failed: {e}")
+        return RetrievalResult(retriever.name, status="error", elapsed=time.perf_counter() - start, error=str(e))
+
+
+# Web results go stale quickly, encyclopedia pages rarely change
+SOURCE_TTLS = {"web": 15 * 60, "wikipedia": 24 * 3600}
+
+# Process-wide retrievers and cache, created on first use and reused across requests
+_retrievers: dict[str, Retriever] = {}
+_cache: Optional[RetrievalCache] = None
+_lock = threading.RLock()
+
+
+def retrieval_cache() -> RetrievalCache:
+    """Return the shared retrieval cache (hit/miss/latency counters via `.stats()`)."""
+    global _cache
+    if _cache is None:
+        with _lock:
+            if _cache is None:
+                _cache = RetrievalCache(ttls=SOURCE_TTLS, disk_path=config.retrieval_cache_path)
+    return _cache
+
+
+def _default_retriever(name: str) -> Retriever:
+    if config.is_local_provider():
+        return LocalRetriever(name)
+    if name == "web":
+        return CachedRetriever(TavilyRetriever(), retrieval_cache())
+    if name == "wikipedia":
+        return CachedRetriever(WikipediaRetriever(), retrieval_cache())
+    raise KeyError(f"Unknown retrieval source: {name}")
+
+
+def get_retriever(name: str) -> Retriever:
+    """Return the shared retriever for source `name`."""
+    retriever = _retrievers.get(name)
+    if retriever is None:
+        with _lock:
+            retriever = _retrievers.get(name)
+            if retriever is None:
+                retriever = _retrievers[name] = _default_retriever(name)
+    return retriever
+
+
+def set_retriever(name: str, retriever: Retriever) -> None:
+    """Replace the retriever for source `name` (e.g. with a LocalRetriever)."""
+    with _lock:
+        _retrievers[name] = retriever
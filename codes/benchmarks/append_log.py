@@ -0,0 +1,158 @@
+"""
+Fan-in accumulation: `operator.add` lists vs the structurally shared AppendLog.
+
+1. reducer     - fold n single-item updates into one key, as a channel does when n parallel
+                 tasks (Send fan-out) each return one item. operator.add copies the list on
+                 every update (O(n^2)); append_log appends to a shared buffer (O(n)).
+2. graph       - the same fan-in through a real graph: Send to n workers, each returning
+                 one item into the accumulating key.
+3. checkpoint  - a loop graph appending a few items per step; bytes held by the
+                 checkpointer and time spent writing checkpoints, per saver and reducer.
+
+Usage:
+    python -m codes.benchmarks.append_log --sizes 10000 50000 100000 --graph-fanin 500
+"""
+# Import libraries
+import json
+import time
+import operator
+import argparse
+from typing import Annotated, Callable, Optional, TypedDict
+
+from langgraph.types import Send
+from langgraph.graph import StateGraph, START, END
+from langgraph.checkpoint.memory import InMemorySaver
+
+from codes.utils.append_log import append_log
+from codes.utils.compacting_saver import CompactingSaver
+
+REDUCERS = {"operator.add": operator.add, "append_log": append_log}
+
+
+def bench_reducer(reducer: Callable, n: int) -> float:
+    value = []
+    start = time.perf_counter()
+    for i in range(n):
+        value = reducer(value, [i])
+    elapsed = time.perf_counter() - start
+    assert len(value) == n
+    return elapsed
+
+
+def _fanin_graph(reducer: Callable):
+    class State(TypedDict):
+        n: int
+        items: Annotated[list, reducer]
+
+    def fan_out(state: State):
+        return [Send("worker", {"i": i}) for i in range(state["n"])]
+
+    def worker(state: dict):
+        return {"items": [state["i"]]}
+
+    builder = StateGraph(State)
+    builder.add_node("worker", worker)
+    builder.add_conditional_edges(START, fan_out, ["worker"])
+    builder.add_edge("worker", END)
+    return builder.compile()
+
+
+def bench_graph(reducer: Callable, n: int) -> float:
+    graph = _fanin_graph(reducer)
+    start = time.perf_counter()
+    result = graph.invoke({"n": n})
+    elapsed = time.perf_counter() - start
+    assert len(result["items"]) == n
+    return elapsed
+
+
+def _loop_graph(reducer: Callable, steps: int, per_step: int):
+    class State(TypedDict):
+        step: int
+        items: Annotated[list, reducer]
+
+    def collect(state: State):
+        base = state["step"] * per_step
+        return {"step": state["step"] + 1, "items": [f"item {base + i}" for i in range(per_step)]}
+
+    def route(state: State):
+        return "collect" if state["step"] < steps else END
+
+    builder = StateGraph(State)
+    builder.add_node("collect", collect)
+    builder.add_edge(START, "collect")
+    builder.add_conditional_edges("collect", route, ["collect", END])
+    return builder
+
+
+def _stored_bytes(saver) -> int:
+    if isinstance(saver, CompactingSaver):
+        return saver.memory_report()["total_bytes"]
+    blobs = sum(len(blob[1]) for blob in saver.blobs.values())
+    checkpoints = sum(
+        len(checkpoint[1]) + len(metadata[1])
+        for namespaces in saver.storage.values()
+        for checkpoints in namespaces.values()
+        for checkpoint, metadata, _ in checkpoints.values()
+    )
+    return blobs + checkpoints
+
+
+def bench_checkpoint(reducer: Callable, saver_cls: type, steps: int, per_step: int) -> dict:
+    saver = saver_cls()
+    graph = _loop_graph(reducer, steps, per_step).compile(checkpointer=saver)
+    start = time.perf_counter()
+    graph.invoke({"step": 0}, {"configurable": {"thread_id": "bench"}, "recursion_limit": steps + 10})
+    elapsed = time.perf_counter() - start
+    return {"wall_s": round(elapsed, 3), "stored_kb": round(_stored_bytes(saver) / 1024, 1)}
+
+
+def run(sizes: list[int], graph_fanin: int, steps: int, per_step: int, add_limit: Optional[int]) -> dict:
+    results = {"reducer": {}, "graph": {}, "checkpoint": {}}
+    for n in sizes:
+        results["reducer"][n] = {
+            name: round(bench_reducer(reducer, n), 4) if name != "operator.add" or add_limit is None or n <= add_limit
+            else None
+            for name, reducer in REDUCERS.items()
+        }
+    results["graph"][graph_fanin] = {name: round(bench_graph(r, graph_fanin), 3) for name, r in REDUCERS.items()}
+    for saver_cls in (InMemorySaver, CompactingSaver):
+        results["checkpoint"][saver_cls.__name__] = {
+            name: bench_checkpoint(reducer, saver_cls, steps, per_step) for name, reducer in REDUCERS.items()
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 50_000, 100_000], help="Fan-in updates")
+    parser.add_argument("--add-limit", type=int, default=100_000, help="Skip operator.add above this size")
+    parser.add_argument("--graph-fanin", type=int, default=500, help="Send fan-out width for the graph run")
+    parser.add_argument("--steps", type=int, default=300, help="Steps of the checkpointed loop graph")
+    parser.add_argument("--per-step", type=int, default=10, help="Items appended per step")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable JSON only")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.graph_fanin, args.steps, args.per_step, args.add_limit)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    def seconds(value):
+        return f"{value:>14.4f}" if value is not None else f"{'skipped':>14}"
+
+    print(f"{'reducer: n updates':<22}{'operator.add s':>14}{'append_log s':>14}")
+    for n, r in results["reducer"].items():
+        print(f"{n:<22,}{seconds(r['operator.add'])}{seconds(r['append_log'])}")
+    for n, r in results["graph"].items():
+        print(f"\n{'graph: Send fan-in':<22}{'operator.add s':>14}{'append_log s':>14}")
+        print(f"{n:<22,}{seconds(r['operator.add'])}{seconds(r['append_log'])}")
+    print(f"\ncheckpoint: {args.steps} steps x {args.per_step} items")
+    print(f"{'saver':<18}{'reducer':<15}{'wall s':>9}{'stored KB':>12}")
+    for saver, rows in results["checkpoint"].items():
+        for name, r in rows.items():
+            print(f"{saver:<18}{name:<15}{r['wall_s']:>9.3f}{r['stored_kb']:>12,.1f}")
+
+
+if __name__ == "__main__":
+    main()
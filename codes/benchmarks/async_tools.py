@@ -0,0 +1,135 @@
+"""
+Async tool execution: `_arun` calling `_run` on the loop vs OffloadedTool.
+
+--calls concurrent ainvoke calls of two tools, each run three ways:
+- io   - blocking I/O (sleeps --io-ms), like a file or HTTP client without async support.
+- cpu  - pure-Python work (--cpu-n loop iterations).
+
+  blocking - BaseTool whose _arun calls _run directly (the pattern in notes/tools.py)
+  thread   - OffloadedTool(execution="thread")
+  process  - OffloadedTool(execution="process")
+
+For each: wall time of the batch, and from LoopMonitor how long the event loop was
+blocked and its worst lag (what every other coroutine in the graph would wait).
+
+Usage:
+    python -m codes.benchmarks.async_tools --calls 16 --io-ms 50 --cpu-n 2000000
+"""
+# Import libraries
+import json
+import time
+import asyncio
+import argparse
+from typing import Optional, Type
+
+from pydantic import BaseModel, Field
+from langchain_core.tools import BaseTool
+
+from codes.utils.async_tools import LoopMonitor, OffloadedTool
+
+
+class WorkInput(BaseModel):
+    amount: int = Field(description="Milliseconds to wait (io) or loop iterations (cpu)")
+
+
+def _io(amount: int) -> str:
+    time.sleep(amount / 1000)
+    return "done"
+
+
+def _cpu(amount: int) -> str:
+    return str(sum(i * i for i in range(amount)))
+
+
+class BlockingIOTool(BaseTool):
+    name: str = "io"
+    description: str = "Blocking I/O"
+    args_schema: Type[BaseModel] = WorkInput
+
+    def _run(self, amount: int, run_manager: Optional[object] = None) -> str:
+        return _io(amount)
+
+    async def _arun(self, amount: int, run_manager: Optional[object] = None) -> str:
+        return self._run(amount)
+
+
+class BlockingCPUTool(BlockingIOTool):
+    name: str = "cpu"
+    description: str = "CPU-bound work"
+
+    def _run(self, amount: int, run_manager: Optional[object] = None) -> str:
+        return _cpu(amount)
+
+
+class OffloadedIOTool(OffloadedTool):
+    name: str = "io"
+    description: str = "Blocking I/O"
+    args_schema: Type[BaseModel] = WorkInput
+    max_concurrency: int = 64
+
+    def _run(self, amount: int, run_manager: Optional[object] = None) -> str:
+        return _io(amount)
+
+
+class OffloadedCPUTool(OffloadedIOTool):
+    name: str = "cpu"
+    description: str = "CPU-bound work"
+
+    def _run(self, amount: int, run_manager: Optional[object] = None) -> str:
+        return _cpu(amount)
+
+
+VARIANTS = {
+    "io": {
+        "blocking": lambda: BlockingIOTool(),
+        "thread": lambda: OffloadedIOTool(execution="thread"),
+        "process": lambda: OffloadedIOTool(execution="process"),
+    },
+    "cpu": {
+        "blocking": lambda: BlockingCPUTool(),
+        "thread": lambda: OffloadedCPUTool(execution="thread"),
+        "process": lambda: OffloadedCPUTool(execution="process"),
+    },
+}
+
+
+async def bench_variant(tool: BaseTool, calls: int, amount: int) -> dict:
+    await tool.ainvoke({"amount": 1})  # warm-up (pool start)
+    async with LoopMonitor(interval=0.005) as monitor:
+        start = time.perf_counter()
+        await asyncio.gather(*(tool.ainvoke({"amount": amount}) for _ in range(calls)))
+        elapsed = time.perf_counter() - start
+    stats = monitor.stats()
+    return {"wall_s": round(elapsed, 3), "loop_blocked_s": stats["blocked_s"], "max_lag_s": stats["max_lag_s"]}
+
+
+async def run(calls: int, io_ms: int, cpu_n: int) -> dict:
+    amounts = {"io": io_ms, "cpu": cpu_n}
+    return {
+        kind: {name: await bench_variant(make(), calls, amounts[kind]) for name, make in variants.items()}
+        for kind, variants in VARIANTS.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument("--calls", type=int, default=16, help="Concurrent tool calls")
+    parser.add_argument("--io-ms", type=int, default=50, help="Blocking wait per io call")
+    parser.add_argument("--cpu-n", type=int, default=2_000_000, help="Loop iterations per cpu call")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable JSON only")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.calls, args.io_ms, args.cpu_n))
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{args.calls} concurrent calls")
+    print(f"{'tool':<6}{'execution':<11}{'wall s':>9}{'loop blocked s':>16}{'max lag s':>11}")
+    for kind, rows in results.items():
+        for name, r in rows.items():
+            print(f"{kind:<6}{name:<11}{r['wall_s']:>9.3f}{r['loop_blocked_s']:>16.3f}{r['max_lag_s']:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Calculator engine: eval() vs the safe compiled calculator, single and batched.
+
+1. repeated  - --calls evaluations drawn from --distinct formulas (agents repeat themselves):
+               eval() parses every call, the calculator compiles each formula once.
+2. many      - --many distinct constant formulas of a few shapes: one scalar evaluate()
+               per formula vs evaluate_many (one vectorised pass per shape).
+3. bindings  - one formula over --bindings variable bindings: a Python loop of evaluate()
+               vs evaluate_batch.
+
+Usage:
+    python -m codes.benchmarks.calculator --calls 100000 --many 100000 --bindings 1000000
+"""
+# Import libraries
+import json
+import time
+import random
+import argparse
+
+import numpy as np
+
+from codes.utils.safe_calculator import Calculator
+
+SHAPES = ["{} * ({} + {})", "{} / {} - {}", "sqrt({}) + {} ** 2", "({} + {}) * {} % 7"]
+FORMULA = "principal * (1 + rate / 12) ** (12 * years)"
+
+
+def make_expressions(count: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    expressions = []
+    for _ in range(count):
+        shape = rng.choice(SHAPES)
+        expressions.append(shape.format(*(rng.randint(1, 99) for _ in range(shape.count("{}")))))
+    return expressions
+
+
+def _timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def bench_repeated(calls: int, distinct: int) -> dict:
+    pool = make_expressions(distinct)
+    stream = [pool[i % distinct] for i in range(calls)]
+    namespace = {"__builtins__": {}, "sqrt": np.sqrt}
+    calculator = Calculator()
+    return {
+        "eval_s": round(_timed(lambda: [eval(e, namespace) for e in stream]), 4),
+        "calculator_s": round(_timed(lambda: [calculator.evaluate(e) for e in stream]), 4),
+        "hit_rate": calculator.stats()["hit_rate"],
+    }
+
+
+def bench_many(count: int) -> dict:
+    expressions = make_expressions(count, seed=1)
+    scalar, vector = Calculator(max_entries=count), Calculator(max_entries=count)
+    loop_s = _timed(lambda: [scalar.evaluate(e) for e in expressions])
+    cold_s = _timed(lambda: vector.evaluate_many(expressions))
+    warm_s = _timed(lambda: vector.evaluate_many(expressions))
+    expected = np.array([scalar.evaluate(e) for e in expressions[:1000]], dtype=np.float64)
+    assert np.allclose(vector.evaluate_many(expressions[:1000]), expected)
+    return {"loop_s": round(loop_s, 4), "many_cold_s": round(cold_s, 4), "many_warm_s": round(warm_s, 4)}
+
+
+def bench_bindings(count: int) -> dict:
+    rng = np.random.default_rng(0)
+    columns = {
+        "principal": rng.uniform(1_000, 100_000, count),
+        "rate": rng.uniform(0.01, 0.1, count),
+        "years": rng.integers(1, 30, count).astype(np.float64),
+    }
+    calculator = Calculator()
+    rows = [dict(zip(columns, values)) for values in zip(*(column.tolist() for column in columns.values()))]
+    loop_s = _timed(lambda: [calculator.evaluate(FORMULA, **row) for row in rows])
+    batch_s = _timed(lambda: calculator.evaluate_batch(FORMULA, columns))
+    return {"loop_s": round(loop_s, 4), "batch_s": round(batch_s, 4)}
+
+
+def run(calls: int, distinct: int, many: int, bindings: int) -> dict:
+    return {
+        "repeated": bench_repeated(calls, distinct),
+        "many": bench_many(many),
+        "bindings": bench_bindings(bindings),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument("--calls", type=int, default=100_000, help="Evaluations in the repeated run")
+    parser.add_argument("--distinct", type=int, default=200, help="Distinct formulas in the repeated run")
+    parser.add_argument("--many", type=int, default=100_000, help="Formulas in the evaluate_many run")
+    parser.add_argument("--bindings", type=int, default=1_000_000, help="Bindings in the evaluate_batch run")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable JSON only")
+    args = parser.parse_args()
+
+    results = run(args.calls, args.distinct, args.many, args.bindings)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    r = results["repeated"]
+    print(f"repeated: {args.calls:,} calls over {args.distinct} formulas")
+    print(f"  eval()            {r['eval_s']:>9.4f} s")
+    print(f"  calculator        {r['calculator_s']:>9.4f} s   (cache hit rate {r['hit_rate']:.1%})")
+    r = results["many"]
+    print(f"many: {args.many:,} distinct formulas")
+    print(f"  evaluate() loop   {r['loop_s']:>9.4f} s")
+    print(f"  evaluate_many     {r['many_cold_s']:>9.4f} s cold, {r['many_warm_s']:.4f} s warm")
+    r = results["bindings"]
+    print(f"bindings: {args.bindings:,} x '{FORMULA}'")
+    print(f"  evaluate() loop   {r['loop_s']:>9.4f} s")
+    print(f"  evaluate_batch    {r['batch_s']:>9.4f} s")
+
+
+if __name__ == "__main__":
+    main()
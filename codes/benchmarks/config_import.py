@@ -0,0 +1,107 @@
+"""
+Cold-start benchmark for the configuration module.
+
+Every sample runs in a fresh interpreter so module caches do not leak between runs.
+Each child process reports three phases:
+1. import   - `import codes.config.config`, which agent modules now pay on import.
+2. resolve  - parsing .env/environment and validating; this used to run inside the import.
+3. install  - installing a pickled ConfigSnapshot instead, as a forked/spawned worker would.
+
+Usage:
+    python -m codes.benchmarks.config_import --runs 20
+"""
+# Import libraries
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+
+# Dummy values so the benchmark runs without a real .env file
+BENCH_ENV = {
+    "LANGSMITH_PROJECT": "bench",
+    "LANGSMITH_API_KEY": "bench",
+    "TAVILY_API_KEY": "bench",
+    "OPENAI_API_KEY": "bench",
+    "DATABASE__URI": "mongodb://localhost:27017",
+    "MODEL__API_KEY": "bench",
+    "LOG_LEVEL": "WARNING",
+}
+
+CHILD = """
+import sys, time, json, pickle
+t0 = time.perf_counter()
+import codes.config.config as cfg
+t1 = time.perf_counter()
+cfg.get_config()
+t2 = time.perf_counter()
+cfg.reset_config()
+snapshot = bytes.fromhex(sys.argv[1])
+t3 = time.perf_counter()
+cfg.install_config(pickle.loads(snapshot))
+cfg.get_config()
+t4 = time.perf_counter()
+sys.stdout.write(json.dumps({"import": t1 - t0, "resolve": t2 - t1, "install": t4 - t3}))
+"""
+
+SNAPSHOT = """
+import sys, pickle
+from codes.config.config import snapshot_config
+sys.stdout.write(pickle.dumps(snapshot_config()).hex())
+"""
+
+
+def _child(code: str, env: dict, *argv: str) -> str:
+    """Run `code` in a fresh interpreter and return its stdout."""
+    return subprocess.run(
+        [sys.executable, "-c", code, *argv],
+        env=env, cwd=ROOT, check=True, capture_output=True, text=True,
+    ).stdout
+
+
+def run(runs: int) -> dict:
+    """Sample every phase `runs` times and return median/p95 timings in milliseconds."""
+    env = {**os.environ, **BENCH_ENV, "PYTHONPATH": str(ROOT)}
+    snapshot_hex = _child(SNAPSHOT, env)
+
+    samples = {"import": [], "resolve": [], "install": []}
+    for _ in range(runs):
+        for phase, seconds in json.loads(_child(CHILD, env, snapshot_hex)).items():
+            samples[phase].append(seconds * 1000)
+
+    results = {}
+    for phase, values in samples.items():
+        values.sort()
+        results[phase] = {
+            "median_ms": round(statistics.median(values), 3),
+            "p95_ms": round(values[min(len(values) - 1, int(len(values) * 0.95))], 3),
+        }
+    results["snapshot_bytes"] = len(snapshot_hex) // 2
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10, help="Fresh interpreters to sample")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable JSON only")
+    args = parser.parse_args()
+
+    results = run(args.runs)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    for phase in ("import", "resolve", "install"):
+        stats = results[phase]
+        print(f"{phase:<10} median {stats['median_ms']:>9.3f} ms   p95 {stats['p95_ms']:>9.3f} ms")
+    print(f"{'snapshot':<10} {results['snapshot_bytes']} bytes")
+    print("\nBefore this change every import of codes.config.config paid import + resolve;")
+    print("now importers pay only `import`, and workers given a snapshot pay `install`.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Context packing benchmark for the agent with search.
+
+Builds synthetic retrieval results shaped like the real ones (a few long web pages plus
+long Wikipedia pages that repeat part of the web content) with one passage holding the
+answer, then compares the unpacked prompt with pack_context at several budgets:
+
+- tokens:  estimated prompt tokens sent to the model (prefill, and so time-to-first-token,
+           grows with this number).
+- pack ms: time spent chunking, deduplicating, scoring and packing.
+- recall:  whether the answer passage is still in the packed context.
+
+Usage:
+    python -m codes.benchmarks.context_packing --budgets 500 1500 3000
+"""
+# Import libraries
+import json
+import time
+import random
+import argparse
+
+from langchain_core.documents import Document
+
+from codes.agent_with_search.context_packing import estimate_tokens, pack_context
+
+QUESTION = "What is the latest price for bitcoin?"
+ANSWER = "The latest price for bitcoin is 67,250 US dollars, up 2% in the last 24 hours."
+VOCABULARY = (
+    "bitcoin price latest market network blockchain protocol miners history launch wallet exchange block "
+    "consensus supply halving energy adoption regulation volatility ledger node fee"
+).split()
+
+
+def _paragraph(rng: random.Random, sentences: int = 6, lead: str = "") -> str:
+    return " ".join(
+        (lead + " ".join(rng.choice(VOCABULARY) for _ in range(rng.randint(8, 16)))).capitalize() + "."
+        for _ in range(sentences)
+    )
+
+
+def build_documents(seed: int = 0, web_pages: int = 3, wiki_pages: int = 2) -> list[Document]:
+    """Web pages and Wikipedia pages that share on-topic paragraphs, with the answer in one web page."""
+    rng = random.Random(seed)
+    shared = [_paragraph(rng, lead="bitcoin price ") for _ in range(6)]
+    docs = []
+    for i in range(web_pages):
+        paragraphs = [_paragraph(rng) for _ in range(12)] + shared[i * 2:i * 2 + 2]
+        if i == web_pages - 1:
+            paragraphs.insert(7, ANSWER)
+        docs.append(Document(page_content="\n\n".join(paragraphs), metadata={"href": f"https://web.test/{i}"}))
+    for i in range(wiki_pages):
+        paragraphs = shared + [_paragraph(rng) for _ in range(40)]
+        docs.append(Document(
+            page_content="\n\n".join(paragraphs),
+            metadata={"source": f"https://en.wikipedia.org/wiki/Page_{i}", "page": ""},
+        ))
+    return docs
+
+
+def run(budgets: list[int], repeats: int = 20, seed: int = 0) -> dict:
+    docs = build_documents(seed)
+    raw = "\n\n---\n\n".join(doc.page_content for doc in docs)
+    results = {"unpacked": {"tokens": estimate_tokens(raw), "pack_ms": 0.0, "recall": ANSWER in raw}}
+    for budget in budgets:
+        start = time.perf_counter()
+        for _ in range(repeats):
+            packed = pack_context(QUESTION, docs, max_tokens=budget)
+        results[f"budget={budget}"] = {
+            "tokens": estimate_tokens(packed.text),
+            "pack_ms": round((time.perf_counter() - start) / repeats * 1000, 2),
+            "recall": ANSWER in packed.text,
+            "chunks": f"{len(packed.chunks)}/{packed.candidates}",
+            "duplicates": packed.duplicates,
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument("--budgets", type=int, nargs="+", default=[500, 1500, 3000])
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--json", action="store_true", help="Print machine-readable JSON only")
+    args = parser.parse_args()
+
+    results = run(args.budgets, args.repeats)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'variant':<16}{'tokens':>10}{'pack ms':>10}{'recall':>8}{'chunks':>10}{'dups':>6}")
+    for name, r in results.items():
+        print(
+            f"{name:<16}{r['tokens']:>10,}{r['pack_ms']:>10.2f}{str(r['recall']):>8}"
+            f"{r.get('chunks', '-'):>10}{r.get('duplicates', '-'):>6}"
+        )
+
+
+if __name__ == "__main__":
+    main()
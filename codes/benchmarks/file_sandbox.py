@@ -0,0 +1,137 @@
+"""
+File manager backend: reading everything vs FileSandbox's mmap paging, and listings.
+
+On a generated log of --size-mb:
+1. read    - one page of --page-lines lines at a few depths of the file: read() the
+             whole file and split it (what a naive backend does) vs FileSandbox.read by
+             line range (cold: first seek; warm: paging on with remembered chunk
+             boundaries) and by byte range. Time and Python memory peak (tracemalloc;
+             mapped pages are not Python allocations and are not counted).
+2. write   - atomic streamed write of the same log in 1 MB chunks.
+3. list    - listing a directory of --files files, uncached vs cached by mtime.
+
+Usage:
+    python -m codes.benchmarks.file_sandbox --size-mb 256 --files 5000
+"""
+# Import libraries
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+from pathlib import Path
+from typing import Callable
+
+from codes.utils.file_sandbox import FileSandbox
+
+LOG_NAME = "logs/app.txt"
+
+
+def _log_chunks(size_mb: int):
+    line, written, chunk = 0, 0, []
+    target = size_mb * 1024 * 1024
+    while written < target:
+        text = f"2025-01-01T00:00:00 INFO worker-{line % 16} request {line} handled in {line % 997} ms\n"
+        chunk.append(text)
+        written += len(text)
+        line += 1
+        if len(chunk) == 10_000:
+            yield "".join(chunk)
+            chunk = []
+    if chunk:
+        yield "".join(chunk)
+
+
+def _measure(fn: Callable) -> tuple[float, float, object]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return round(elapsed * 1e3, 2), round(peak / 1024 / 1024, 2), result
+
+
+def bench_read(sandbox: FileSandbox, page_lines: int) -> dict:
+    path = sandbox.resolve(LOG_NAME)
+    with open(path, "rb") as file:
+        total_lines = sum(chunk.count(b"\n") for chunk in iter(lambda: file.read(1 << 24), b""))
+    results = {}
+    for fraction in (0.0, 0.5, 0.99):
+        line = int(total_lines * fraction)
+
+        def naive():
+            with open(path, encoding="utf-8") as file:
+                return "".join(file.read().splitlines(keepends=True)[line:line + page_lines])
+
+        naive_ms, naive_mb, expected = _measure(naive)
+        sandbox._line_checkpoints.clear()
+        cold_ms, cold_mb, page = _measure(lambda: sandbox.read(LOG_NAME, start_line=line, num_lines=page_lines))
+        assert page.text == expected
+        warm_ms, warm_mb, _ = _measure(lambda: sandbox.read(LOG_NAME, start_line=line + page_lines, num_lines=page_lines))
+        bytes_ms, bytes_mb, _ = _measure(lambda: sandbox.read(LOG_NAME, offset=page.start, length=page.end - page.start))
+        results[f"{fraction:.0%}"] = {
+            "line": line,
+            "naive_ms": naive_ms, "naive_mb": naive_mb,
+            "lines_cold_ms": cold_ms, "lines_cold_mb": cold_mb,
+            "lines_warm_ms": warm_ms, "lines_warm_mb": warm_mb,
+            "bytes_ms": bytes_ms, "bytes_mb": bytes_mb,
+        }
+    return results
+
+
+def bench_list(root: Path, files: int) -> dict:
+    sandbox = FileSandbox(root / "many")
+    for i in range(files):
+        (sandbox.root / f"note_{i:05d}.md").write_text("x")
+    uncached_ms, _, entries = _measure(lambda: FileSandbox(sandbox.root).list())
+    sandbox.list()
+    cached_ms, _, _ = _measure(lambda: sandbox.list())
+    assert len(entries) == files
+    return {"files": files, "uncached_ms": uncached_ms, "cached_ms": cached_ms}
+
+
+def run(size_mb: int, page_lines: int, files: int) -> dict:
+    root = Path(tempfile.mkdtemp(prefix="file_sandbox_bench_"))
+    try:
+        sandbox = FileSandbox(root, max_tokens=page_lines * 100)
+        start = time.perf_counter()
+        written = sandbox.write(LOG_NAME, _log_chunks(size_mb))
+        write_s = time.perf_counter() - start
+        return {
+            "read": bench_read(sandbox, page_lines),
+            "write": {"mb": round(written / 1024 / 1024, 1), "seconds": round(write_s, 3)},
+            "list": bench_list(root, files),
+        }
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument("--size-mb", type=int, default=256, help="Size of the generated log")
+    parser.add_argument("--page-lines", type=int, default=50, help="Lines per page")
+    parser.add_argument("--files", type=int, default=5000, help="Files in the listed directory")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable JSON only")
+    args = parser.parse_args()
+
+    results = run(args.size_mb, args.page_lines, args.files)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    w = results["write"]
+    print(f"write: {w['mb']} MB streamed atomically in {w['seconds']:.3f} s")
+    print(f"\nread {args.page_lines} lines at depth   {'naive ms':>10}{'MB':>8}{'cold ms':>10}{'MB':>7}"
+          f"{'warm ms':>10}{'bytes ms':>10}{'MB':>7}")
+    for depth, r in results["read"].items():
+        print(f"{depth:>5} (line {r['line']:>10,}){'':>8}{r['naive_ms']:>10.1f}{r['naive_mb']:>8.1f}"
+              f"{r['lines_cold_ms']:>10.1f}{r['lines_cold_mb']:>7.1f}{r['lines_warm_ms']:>10.2f}"
+              f"{r['bytes_ms']:>10.2f}{r['bytes_mb']:>7.2f}")
+    r = results["list"]
+    print(f"\nlist {r['files']:,} files: {r['uncached_ms']:.2f} ms uncached, {r['cached_ms']:.3f} ms cached")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,458 @@
+"""
+Offline benchmark of the project's graphs: where does a turn's time and memory go?
+
+Every graph runs against scripted LocalChatModels (configurable latency and token stream)
+and LocalRetrievers, so nothing leaves the process and the numbers isolate the graphs' own
+cost. For each graph the suite reports:
+1. nodes       - latency per node (mean/p50/p95), measured with a callback handler.
+2. overhead    - framework time per super-step: turn wall time minus the critical path
+                 (the slowest node of every super-step).
+3. checkpoint  - checkpointer writes per turn and the time spent in them.
+4. memory      - Python heap growth and checkpointer bytes per conversation thread.
+5. throughput  - turns/second with N conversations running concurrently.
+
+Results can be written as JSON (`--out`) and compared with an earlier run (`--baseline`)
+to track regressions between commits.
+
+Usage:
+    python -m codes.benchmarks.graph_overhead --turns 4 --concurrency 1 8 32 --out bench.json
+    python -m codes.benchmarks.graph_overhead --graphs chat-bot messages-trim --baseline bench.json
+"""
+# Import libraries
+import os
+import io
+import gc
+import sys
+import json
+import time
+import uuid
+import asyncio
+import argparse
+import platform
+import statistics
+import threading
+import contextlib
+import subprocess
+import tracemalloc
+import importlib.metadata
+from dataclasses import dataclass
+from collections import defaultdict
+from typing import Any, Callable, Optional
+
+from codes.benchmarks.config_import import BENCH_ENV
+
+# Offline: the LLM factory hands out LocalChatModels and retrievers default to LocalRetrievers
+for _key, _value in BENCH_ENV.items():
+    os.environ.setdefault(_key, _value)
+os.environ["MODEL__PROVIDER"] = "local"
+os.environ["LANGCHAIN_TRACING_V2"] = "false"
+os.environ["LANGSMITH_TRACING"] = "false"
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+from langgraph.store.memory import InMemoryStore
+
+from codes.utils.llm_factory import configure_local_models
+from codes.utils.compacting_saver import CompactingSaver
+from codes.utils.graph_registry import clear_graph_cache, get_compiled_graph
+
+TOOL_QUESTION = "What are 3 + 4 and 6 * 7?"
+PROFILE_STATEMENT = "My name is Ada and I like chess."
+
+
+# Scripted model
+def _tool_call(name: str, args: dict) -> dict:
+    return {"name": name, "args": args, "id": f"call_{uuid.uuid4().hex[:8]}", "type": "tool_call"}
+
+
+def scripted_responder(answer_tokens: int) -> Callable:
+    """
+    One responder serving every graph:
+    - the memory updater prompt gets a UserProfile tool call,
+    - the ReAct question gets add/Multiply tool calls, then an answer built from the results,
+    - anything else gets an answer of `answer_tokens` tokens.
+    """
+    answer = " ".join(["token"] * max(answer_tokens - 1, 0))
+
+    def respond(messages):
+        if any(isinstance(m, SystemMessage) and m.text().startswith("You are memory updater") for m in messages):
+            return AIMessage(content="", tool_calls=[_tool_call("UserProfile", {"name": "Ada", "interests": ["chess"]})])
+
+        last_human = max((i for i, m in enumerate(messages) if isinstance(m, HumanMessage)), default=-1)
+        results = [m.content for m in messages[last_human + 1:] if isinstance(m, ToolMessage)]
+        if results:
+            return f"The results are {', '.join(map(str, results))}."
+        if last_human >= 0 and messages[last_human].text() == TOOL_QUESTION:
+            return AIMessage(content="", tool_calls=[
+                _tool_call("add", {"a": 3, "b": 4}), _tool_call("Multiply", {"a": 6, "b": 7}),
+            ])
+        return f"Answer: {answer}"
+
+    return respond
+
+
+# Graphs under test
+@dataclass
+class GraphSpec:
+    """How to drive one registered graph for a turn."""
+    name: str
+    make_input: Callable[[int], dict]
+    needs_store: bool = False
+
+
+def _chat_turn(turn: int) -> dict:
+    return {"messages": [HumanMessage(content=f"Turn {turn}: tell me something about topic {turn}.")]}
+
+
+def _memory_turn(turn: int) -> dict:
+    return {"messages": [HumanMessage(content=PROFILE_STATEMENT if turn == 0 else f"Tell me about topic {turn}.")]}
+
+
+GRAPHS = {
+    spec.name: spec for spec in [
+        GraphSpec("simple-react-agent", lambda turn: {"messages": [HumanMessage(content=TOOL_QUESTION)]}),
+        GraphSpec("agent-with-search", lambda turn: {"question": f"What is topic {turn}?"}),
+        GraphSpec("semantic-memory", _memory_turn, needs_store=True),
+        GraphSpec("semantic-memory-background", _memory_turn, needs_store=True),
+        GraphSpec("chat-bot", _chat_turn, needs_store=True),
+        GraphSpec("messages-reduce", _chat_turn),
+        GraphSpec("messages-filter", _chat_turn),
+        GraphSpec("messages-trim", _chat_turn),
+    ]
+}
+
+
+def configure_models(latency: float, token_latency: float, answer_tokens: int) -> None:
+    """Point every chat model the factory hands out at the scripted responder."""
+    configure_local_models(
+        latency=latency, token_latency=token_latency, responder=scripted_responder(answer_tokens)
+    )
+
+
+# Instrumentation
+class NodeTimer(BaseCallbackHandler):
+    """Records the duration and super-step of every node run of one graph invocation."""
+    run_inline = True
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._open: dict[Any, tuple[str, int, float]] = {}
+        self._nested: set = set()
+        self.runs: list[tuple[str, int, float]] = []
+
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, metadata=None, **kwargs):
+        metadata = metadata or {}
+        name = kwargs.get("name")
+        with self._lock:
+            # Runs inside a node (including the nodes of a subgraph it calls) are part of its time
+            if parent_run_id in self._open or parent_run_id in self._nested:
+                self._nested.add(run_id)
+                return
+            # A node's own run carries its name; other runs only inherit the metadata
+            if name is not None and name == metadata.get("langgraph_node"):
+                self._open[run_id] = (name, metadata.get("langgraph_step", 0), time.perf_counter())
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        with self._lock:
+            entry = self._open.pop(run_id, None)
+            if entry is not None:
+                name, step, start = entry
+                self.runs.append((name, step, time.perf_counter() - start))
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self.on_chain_end(None, run_id=run_id)
+
+    def critical_path(self) -> tuple[float, int]:
+        """Sum over super-steps of the slowest node, and the number of super-steps."""
+        slowest: dict[int, float] = defaultdict(float)
+        for _, step, seconds in self.runs:
+            slowest[step] = max(slowest[step], seconds)
+        return sum(slowest.values()), len(slowest)
+
+
+class CheckpointTimer:
+    """Counts and times the checkpointer's writes (async writes delegate to these in memory)."""
+
+    def __init__(self, saver):
+        self.saver = saver
+        self.puts = 0
+        self.put_writes = 0
+        self.seconds = 0.0
+        for method in ("put", "put_writes"):
+            setattr(saver, method, self._timed(method, getattr(saver, method)))
+
+    def _timed(self, method: str, func: Callable) -> Callable:
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.seconds += time.perf_counter() - start
+                if method == "put":
+                    self.puts += 1
+                else:
+                    self.put_writes += 1
+
+        return timed
+
+
+def _percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 3)
+
+
+# Driving the graphs
+def _compile(spec: GraphSpec):
+    saver = CompactingSaver()
+    store = InMemoryStore() if spec.needs_store else None
+    return get_compiled_graph(spec.name, checkpointer=saver, store=store), saver
+
+
+async def run_turn(graph, spec: GraphSpec, thread_id: str, turn: int, callbacks=None) -> dict:
+    """Stream one turn (so models stream tokens) and return its wall time and time to first token."""
+    config = {
+        "configurable": {"thread_id": thread_id, "user_id": thread_id},
+        "callbacks": callbacks or [],
+    }
+    start = time.perf_counter()
+    first_token = None
+    async for chunk, _ in graph.astream(spec.make_input(turn), config, stream_mode="messages"):
+        if first_token is None and getattr(chunk, "content", None):
+            first_token = time.perf_counter() - start
+    return {"wall": time.perf_counter() - start, "ttft": first_token}
+
+
+async def _conversation(graph, spec: GraphSpec, thread_id: str, turns: int) -> list[float]:
+    return [(await run_turn(graph, spec, thread_id, turn))["wall"] for turn in range(turns)]
+
+
+async def bench_latency(spec: GraphSpec, turns: int, threads: int) -> dict:
+    """Per-node latency, framework overhead per super-step and checkpoint cost."""
+    graph, saver = _compile(spec)
+    checkpoints = CheckpointTimer(saver)
+    nodes: dict[str, list[float]] = defaultdict(list)
+    walls, ttfts, overheads, step_counts = [], [], [], []
+
+    for t in range(threads):
+        for turn in range(turns):
+            timer = NodeTimer()
+            result = await run_turn(graph, spec, f"latency-{t}", turn, callbacks=[timer])
+            critical, steps = timer.critical_path()
+            for name, _, seconds in timer.runs:
+                nodes[name].append(seconds)
+            walls.append(result["wall"])
+            if result["ttft"] is not None:
+                ttfts.append(result["ttft"])
+            overheads.append((result["wall"] - critical) / max(steps, 1))
+            step_counts.append(steps)
+
+    count = len(walls)
+    return {
+        "nodes": {
+            name: {
+                "calls": len(values),
+                "mean_ms": _ms(statistics.fmean(values)),
+                "p50_ms": _ms(_percentile(values, 0.5)),
+                "p95_ms": _ms(_percentile(values, 0.95)),
+            }
+            for name, values in nodes.items()
+        },
+        "turn": {
+            "turns": count,
+            "wall_mean_ms": _ms(statistics.fmean(walls)),
+            "wall_p95_ms": _ms(_percentile(walls, 0.95)),
+            "ttft_mean_ms": _ms(statistics.fmean(ttfts)) if ttfts else None,
+            "super_steps": round(statistics.fmean(step_counts), 2),
+        },
+        "overhead": {
+            "per_step_mean_ms": _ms(statistics.fmean(overheads)),
+            "per_step_p95_ms": _ms(_percentile(overheads, 0.95)),
+        },
+        "checkpoint": {
+            "puts_per_turn": round(checkpoints.puts / count, 2),
+            "put_writes_per_turn": round(checkpoints.put_writes / count, 2),
+            "ms_per_turn": _ms(checkpoints.seconds / count),
+            "us_per_write": round(checkpoints.seconds / max(checkpoints.puts + checkpoints.put_writes, 1) * 1e6, 2),
+        },
+    }
+
+
+async def bench_memory(spec: GraphSpec, turns: int, threads: int) -> dict:
+    """Heap growth and checkpointer bytes per conversation thread."""
+    graph, saver = _compile(spec)
+    # Warm up module-level caches so they are not charged to the threads
+    await _conversation(graph, spec, "memory-warmup", 1)
+    saver.delete_thread("memory-warmup")
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for t in range(threads):
+        await _conversation(graph, spec, f"memory-{t}", turns)
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    report = saver.memory_report()
+    return {
+        "threads": threads,
+        "turns_per_thread": turns,
+        "heap_kb_per_thread": round((after - before) / threads / 1024, 2),
+        "checkpoint_kb_per_thread": round(report["mean_bytes_per_thread"] / 1024, 2),
+    }
+
+
+async def bench_throughput(spec: GraphSpec, turns: int, concurrency: list[int]) -> dict:
+    """Turns per second with `n` conversations in flight at once."""
+    results = {}
+    for n in concurrency:
+        graph, _ = _compile(spec)
+        start = time.perf_counter()
+        walls = await asyncio.gather(*(_conversation(graph, spec, f"load-{n}-{t}", turns) for t in range(n)))
+        elapsed = time.perf_counter() - start
+        flat = [w for conversation in walls for w in conversation]
+        results[str(n)] = {
+            "turns_per_s": round(len(flat) / elapsed, 2),
+            "turn_p95_ms": _ms(_percentile(flat, 0.95)),
+        }
+    return results
+
+
+async def bench_graph(spec: GraphSpec, args: argparse.Namespace) -> dict:
+    configure_models(args.model_latency, args.token_latency, args.answer_tokens)
+    # Semantic memory prints the profile on every turn; keep the report readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = await bench_latency(spec, args.turns, args.threads)
+        result["memory"] = await bench_memory(spec, args.turns, args.memory_threads)
+        result["throughput"] = await bench_throughput(spec, args.turns, args.concurrency)
+    if spec.name == "semantic-memory-background":
+        from codes.semantic_memory.agent import memory_writer
+
+        memory_writer.flush(timeout=30)
+    clear_graph_cache(spec.name)
+    return result
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args: argparse.Namespace) -> dict:
+    graphs = {}
+    for name in args.graphs:
+        graphs[name] = asyncio.run(bench_graph(GRAPHS[name], args))
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "langgraph": importlib.metadata.version("langgraph"),
+            "settings": {
+                key: getattr(args, key) for key in (
+                    "turns", "threads", "memory_threads", "concurrency",
+                    "model_latency", "token_latency", "answer_tokens",
+                )
+            },
+        },
+        "graphs": graphs,
+    }
+
+
+# Regression tracking
+HEADLINE = [
+    ("overhead", "per_step_mean_ms", "overhead ms/step", False),
+    ("checkpoint", "ms_per_turn", "checkpoint ms/turn", False),
+    ("memory", "checkpoint_kb_per_thread", "checkpoint KB/thread", False),
+    ("turn", "wall_mean_ms", "turn ms", False),
+]
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Lines describing headline metrics that got worse by more than `threshold` (fraction)."""
+    regressions = []
+    for name, current in results["graphs"].items():
+        previous = baseline.get("graphs", {}).get(name)
+        if previous is None:
+            continue
+        metrics = [(section, key, label, higher_is_better) for section, key, label, higher_is_better in HEADLINE]
+        metrics += [("throughput", n, f"turns/s @{n}", True) for n in current["throughput"]]
+        for section, key, label, higher_is_better in metrics:
+            new = current[section].get(key)
+            old = previous.get(section, {}).get(key)
+            if isinstance(new, dict):
+                new, old = new["turns_per_s"], (old or {}).get("turns_per_s")
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if (-change if higher_is_better else change) > threshold:
+                regressions.append(f"{name}: {label} {old} -> {new} ({change:+.0%})")
+    return regressions
+
+
+def _print_report(results: dict):
+    for name, r in results["graphs"].items():
+        turn, overhead, cp, mem = r["turn"], r["overhead"], r["checkpoint"], r["memory"]
+        print(f"\n{name}  ({turn['super_steps']} super-steps/turn, turn {turn['wall_mean_ms']} ms, "
+              f"ttft {turn['ttft_mean_ms']} ms)")
+        print(f"  {'node':<26}{'calls':>7}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}")
+        for node, n in r["nodes"].items():
+            print(f"  {node:<26}{n['calls']:>7}{n['mean_ms']:>10.3f}{n['p50_ms']:>10.3f}{n['p95_ms']:>10.3f}")
+        print(f"  overhead/step: {overhead['per_step_mean_ms']} ms (p95 {overhead['per_step_p95_ms']} ms)")
+        print(f"  checkpoint: {cp['puts_per_turn']} puts + {cp['put_writes_per_turn']} put_writes/turn, "
+              f"{cp['ms_per_turn']} ms/turn, {cp['us_per_write']} us/write")
+        print(f"  memory/thread: heap {mem['heap_kb_per_thread']} KB, checkpoints {mem['checkpoint_kb_per_thread']} KB "
+              f"({mem['turns_per_thread']} turns)")
+        print("  throughput: " + ", ".join(f"{n} threads {t['turns_per_s']} turns/s" for n, t in r["throughput"].items()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument("--graphs", nargs="+", choices=sorted(GRAPHS), default=list(GRAPHS))
+    parser.add_argument("--turns", type=int, default=4, help="Turns per conversation thread")
+    parser.add_argument("--threads", type=int, default=5, help="Threads for the latency measurements")
+    parser.add_argument("--memory-threads", type=int, default=20, help="Threads for the memory measurement")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32], help="Concurrent threads")
+    parser.add_argument("--model-latency", type=float, default=0.02, help="Seconds before a model's first token")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="Seconds between streamed tokens")
+    parser.add_argument("--answer-tokens", type=int, default=20, help="Tokens per scripted answer")
+    parser.add_argument("--out", metavar="PATH", help="Write the results as JSON to this file")
+    parser.add_argument("--baseline", metavar="PATH", help="Earlier --out file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Relative change reported as a regression")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable JSON only")
+    args = parser.parse_args()
+
+    results = run(args)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        results["regressions"] = regressions
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        _print_report(results)
+        if args.baseline:
+            print("\nRegressions vs baseline:" if regressions else "\nNo regressions vs baseline.")
+            for line in regressions:
+                print(f"  {line}")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Parallel vs sequential tool calling in the simple ReAct agent.
+
+A scripted LocalChatModel answers "What are 3 + 4, 6 * 7 and 10 / 4?":
+- sequential: one tool call per assistant turn (the default, prebuilt ToolNode),
+- parallel:   all three tool calls in the first turn, run concurrently by ParallelToolNode.
+
+Model latency stands in for the LLM round trip and tool latency for I/O-bound tools, so
+the numbers show how many assistant<->tools loop iterations and how much wall time the
+parallel mode saves.
+
+Usage:
+    python -m codes.benchmarks.parallel_tools --model-latency 0.3 --tool-latency 0.2
+"""
+# Import libraries
+import json
+import time
+import uuid
+import argparse
+
+from langchain_core.tools import tool
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from codes.utils.fake_models import LocalChatModel
+from codes.simple_react_agent.simple_react_agent import create_builder
+
+QUESTION = "What are 3 + 4, 6 * 7 and 10 / 4?"
+CALLS = [("add", {"a": 3, "b": 4}), ("Multiply", {"a": 6, "b": 7}), ("divide", {"a": 10, "b": 4})]
+
+
+def make_tools(latency: float):
+    """add/multiply/divide with simulated I/O latency."""
+
+    @tool("add", description="Add two numbers")
+    def add(a: int, b: int) -> int:
+        time.sleep(latency)
+        return a + b
+
+    @tool("Multiply", description="Multiply two numbers")
+    def multiply(a: int, b: int) -> int:
+        time.sleep(latency)
+        return a * b
+
+    @tool("divide", description="Divide two numbers")
+    def divide(a: int, b: int) -> float:
+        time.sleep(latency)
+        return a / b
+
+    return [add, multiply, divide]
+
+
+def _tool_call(name: str, args: dict) -> dict:
+    return {"name": name, "args": args, "id": f"call_{uuid.uuid4().hex[:8]}", "type": "tool_call"}
+
+
+def scripted_responder(parallel: bool):
+    """Request the remaining tool calls (all at once or one by one), then answer."""
+
+    def respond(messages):
+        done = sum(isinstance(m, ToolMessage) for m in messages)
+        if done >= len(CALLS):
+            results = [m.content for m in messages if isinstance(m, ToolMessage)]
+            return f"The results are {', '.join(results)}."
+        pending = CALLS[done:] if parallel else CALLS[done:done + 1]
+        return AIMessage(content="", tool_calls=[_tool_call(name, args) for name, args in pending])
+
+    return respond
+
+
+def run_mode(parallel: bool, model_latency: float, tool_latency: float, runs: int) -> dict:
+    model = LocalChatModel(responder=scripted_responder(parallel), latency=model_latency)
+    graph = create_builder(
+        model, make_tools(tool_latency), parallel_tool_calls=parallel, fast_path=False
+    ).compile()
+    start = time.perf_counter()
+    for _ in range(runs):
+        result = graph.invoke({"messages": [HumanMessage(content=QUESTION)]})
+    elapsed = time.perf_counter() - start
+    return {
+        "assistant_calls_per_run": model.calls / runs,
+        "tool_rounds_per_run": model.calls / runs - 1,
+        "wall_s_per_run": round(elapsed / runs, 3),
+        "answer": result["messages"][-1].content,
+    }
+
+
+def run(model_latency: float, tool_latency: float, runs: int) -> dict:
+    results = {
+        "sequential": run_mode(False, model_latency, tool_latency, runs),
+        "parallel": run_mode(True, model_latency, tool_latency, runs),
+    }
+    results["speedup"] = round(results["sequential"]["wall_s_per_run"] / results["parallel"]["wall_s_per_run"], 2)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument("--model-latency", type=float, default=0.3, help="Seconds per model call")
+    parser.add_argument("--tool-latency", type=float, default=0.2, help="Seconds per tool call")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="Print machine-readable JSON only")
+    args = parser.parse_args()
+
+    results = run(args.model_latency, args.tool_latency, args.runs)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'mode':<12}{'assistant calls':>17}{'tool rounds':>13}{'wall s/run':>12}")
+    for mode in ("sequential", "parallel"):
+        r = results[mode]
+        print(f"{mode:<12}{r['assistant_calls_per_run']:>17.0f}{r['tool_rounds_per_run']:>13.0f}{r['wall_s_per_run']:>12.3f}")
+    print(f"speedup: {results['speedup']}x   answer: {results['parallel']['answer']}")
+
+
+if __name__ == "__main__":
+    main()
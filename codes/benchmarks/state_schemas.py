@@ -0,0 +1,226 @@
+"""
+State schema overhead: TypedDict vs dataclass vs Pydantic vs compact (__slots__) state.
+
+For a small state (name/age/gender) and a large one (analyst and task records):
+
+1. steps   - per-step cost of a linear graph of --steps nodes, each touching one counter;
+             Pydantic state is rebuilt and validated on every hop. The compact state is
+             run validated at the boundary (input/output) and with --sample-rate of node
+             updates validated on top.
+2. validate - cost of one full validation of the state from raw values: what Pydantic pays
+             to build a state, and what the compact state pays once per boundary.
+3. memory  - bytes per state instance (records included), measured with tracemalloc.
+
+Usage:
+    python -m codes.benchmarks.state_schemas --steps 50 --runs 20 --tasks 200
+"""
+# Import libraries
+import gc
+import json
+import time
+import argparse
+import tracemalloc
+import statistics
+from enum import Enum
+from datetime import datetime, timedelta
+from dataclasses import make_dataclass
+from typing import Any, Callable, Literal, Optional, TypedDict
+
+from pydantic import create_model
+from langgraph.graph import StateGraph, START, END
+
+from codes.utils.compact_state import StateValidator
+
+
+class Priority(str, Enum):
+    LOW = "low"
+    MEDIUM = "medium"
+    HIGH = "high"
+
+
+class Status(str, Enum):
+    TODO = "todo"
+    DOING = "doing"
+    DONE = "done"
+
+
+# Field specs shared by every representation
+SMALL_FIELDS = [("name", str), ("age", int), ("gender", Literal["male", "female"])]
+ANALYST_FIELDS = [("affiliation", str), ("name", str), ("role", str), ("description", str)]
+TASK_FIELDS = [
+    ("id", int), ("title", str), ("description", str), ("priority", Priority), ("status", Status),
+    ("deadline", Optional[datetime]), ("created_at", datetime),
+]
+
+
+class Schemas:
+    """State (and record) classes of one representation, built from the field specs."""
+
+    def __init__(self, kind: str, large: bool):
+        self.kind = kind
+        self.large = large
+        fields = [("counter", int)] + SMALL_FIELDS
+        if large:
+            self.analyst = self._record("Analyst", ANALYST_FIELDS)
+            self.task = self._record("Task", TASK_FIELDS)
+            fields += [("topic", str), ("analysts", list[self.analyst]), ("tasks", list[self.task])]
+        self.state = self._record("State", fields)
+
+    def _record(self, name: str, fields: list[tuple[str, Any]]) -> type:
+        if self.kind == "typeddict":
+            return TypedDict(name, dict(fields))
+        if self.kind == "pydantic":
+            return create_model(name, **{key: (hint, ...) for key, hint in fields})
+        return make_dataclass(name, fields, slots=self.kind == "compact")
+
+    def build(self, values: dict) -> Any:
+        """Typed instance of the state, records converted to the record classes."""
+        values = dict(values)
+        if self.large:
+            values["analysts"] = [self.analyst(**a) for a in values["analysts"]]
+            values["tasks"] = [self.task(**t) for t in values["tasks"]]
+        return self.state(**values)
+
+
+KINDS = ["typeddict", "dataclass", "pydantic", "compact"]
+
+
+def make_values(large: bool, analysts: int, tasks: int) -> dict:
+    values = {"counter": 0, "name": "Peyman", "age": 20, "gender": "male"}
+    if large:
+        now = datetime(2025, 1, 1)
+        values["topic"] = "Efficient LLM inference"
+        values["analysts"] = [
+            {"affiliation": f"Lab {i}", "name": f"Analyst {i}", "role": "Researcher",
+             "description": "Focuses on serving cost and latency " * 4}
+            for i in range(analysts)
+        ]
+        values["tasks"] = [
+            {"id": i, "title": f"Task {i}", "description": "Profile and optimise the pipeline " * 3,
+             "priority": list(Priority)[i % 3], "status": list(Status)[i % 3],
+             "deadline": now + timedelta(days=i) if i % 2 else None, "created_at": now}
+            for i in range(tasks)
+        ]
+    return values
+
+
+def _counter(state: Any) -> int:
+    return state["counter"] if isinstance(state, dict) else state.counter
+
+
+def _linear_graph(schema: type, steps: int, wrap: Callable[[Callable], Callable] = lambda node: node):
+    def step(state):
+        return {"counter": _counter(state) + 1}
+
+    builder = StateGraph(schema)
+    previous = START
+    for i in range(steps):
+        builder.add_node(f"step_{i}", wrap(step))
+        builder.add_edge(previous, f"step_{i}")
+        previous = f"step_{i}"
+    builder.add_edge(previous, END)
+    return builder.compile()
+
+
+def _timed(invoke: Callable[[], dict], runs: int, steps: int) -> dict:
+    invoke()  # warm-up
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = invoke()
+        times.append(time.perf_counter() - start)
+        assert result["counter"] == steps
+    median = statistics.median(times)
+    return {"run_ms": round(median * 1e3, 2), "per_step_us": round(median / steps * 1e6, 1)}
+
+
+def bench_steps(large: bool, values: dict, steps: int, runs: int, sample_rate: float) -> dict:
+    config = {"recursion_limit": steps + 10}
+    results = {}
+    for kind in KINDS:
+        schemas = Schemas(kind, large)
+        graph = _linear_graph(schemas.state, steps)
+        results[kind] = _timed(lambda: graph.invoke(schemas.build(values), config), runs, steps)
+
+    # Compact state validated where data enters and leaves the graph (input given as raw dicts)
+    schemas = Schemas("compact", large)
+    validator = StateValidator(schemas.state)
+    graph = validator.wrap(_linear_graph(schemas.state, steps))
+    results["compact+boundary"] = _timed(lambda: graph.invoke(values, config), runs, steps)
+
+    sampler = StateValidator(schemas.state, sample_rate=sample_rate, seed=0)
+    graph = sampler.wrap(_linear_graph(schemas.state, steps, sampler.sampled))
+    results[f"compact+boundary+{sample_rate:g} sampled"] = _timed(lambda: graph.invoke(values, config), runs, steps)
+    return results
+
+
+def bench_validation(large: bool, values: dict, runs: int) -> dict:
+    validators = {
+        "pydantic": Schemas("pydantic", large).state.model_validate,
+        "compact": StateValidator(Schemas("compact", large).state).validate_input,
+    }
+    results = {}
+    for kind, validate in validators.items():
+        validate(values)
+        start = time.perf_counter()
+        for _ in range(runs):
+            validate(values)
+        results[kind] = round((time.perf_counter() - start) / runs * 1e6, 1)
+    return results
+
+
+def bench_memory(large: bool, values: dict, count: int) -> dict:
+    results = {}
+    for kind in KINDS:
+        schemas = Schemas(kind, large)
+        gc.collect()
+        tracemalloc.start()
+        instances = [schemas.build(values) for _ in range(count)]
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[kind] = round(size / count)
+        del instances
+    return results
+
+
+def run(steps: int, runs: int, analysts: int, tasks: int, instances: int, sample_rate: float) -> dict:
+    results = {}
+    for label, large in (("small", False), ("large", True)):
+        values = make_values(large, analysts, tasks)
+        results[label] = {
+            "steps": bench_steps(large, values, steps, runs, sample_rate),
+            "validate_us": bench_validation(large, values, runs * 10),
+            "bytes_per_instance": bench_memory(large, values, instances if not large else max(1, instances // 100)),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument("--steps", type=int, default=50, help="Nodes in the linear graph")
+    parser.add_argument("--runs", type=int, default=20, help="Timed invocations per schema")
+    parser.add_argument("--analysts", type=int, default=20, help="Analyst records in the large state")
+    parser.add_argument("--tasks", type=int, default=200, help="Task records in the large state")
+    parser.add_argument("--instances", type=int, default=10_000, help="Small instances for the memory run")
+    parser.add_argument("--sample-rate", type=float, default=0.1, help="Node updates validated when sampling")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable JSON only")
+    args = parser.parse_args()
+
+    results = run(args.steps, args.runs, args.analysts, args.tasks, args.instances, args.sample_rate)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    for label, result in results.items():
+        print(f"\n{label} state, {args.steps}-step graph")
+        print(f"{'schema':<32}{'run ms':>10}{'per step us':>14}{'bytes/instance':>16}")
+        for kind, r in result["steps"].items():
+            size = result["bytes_per_instance"].get(kind)
+            size = f"{size:,}" if size is not None else ""
+            print(f"{kind:<32}{r['run_ms']:>10.2f}{r['per_step_us']:>14.1f}{size:>16}")
+        validate = ", ".join(f"{kind} {us:,.1f} us" for kind, us in result["validate_us"].items())
+        print(f"one full validation: {validate}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Throughput benchmark: SqliteStore vs InMemoryStore.
+
+For each dataset size the stores are filled with batched puts, then measured on:
+1. put     - batched writes (1,000 items per batch() call).
+2. get     - random single-key reads (cold, and warm through the LRU cache).
+3. list    - prefix search of one user's namespace (limit 100).
+4. ns      - list_namespaces under a prefix.
+
+Items are spread over 1,000 users as ("memory", "user-<n>") namespaces, like the semantic
+memory agent and the todo_agent namespaces.
+
+Usage:
+    python -m codes.benchmarks.store_throughput --sizes 10000 100000 1000000
+"""
+# Import libraries
+import os
+import json
+import time
+import random
+import argparse
+import tempfile
+
+from langgraph.store.base import PutOp
+from langgraph.store.memory import InMemoryStore
+
+from codes.utils.sqlite_store import SqliteStore
+
+USERS = 1_000
+BATCH = 1_000
+READS = 10_000
+LISTS = 1_000
+
+
+def _item(i: int) -> tuple[tuple[str, ...], str, dict]:
+    return ("memory", f"user-{i % USERS}"), f"item-{i}", {"name": f"user {i}", "interests": ["chess", "go"], "n": i}
+
+
+def _rate(count: int, seconds: float) -> float:
+    return round(count / seconds, 1) if seconds else float("inf")
+
+
+def bench_store(store, size: int, rng: random.Random) -> dict:
+    """Fill `store` with `size` items and measure ops/second for each operation."""
+    results = {}
+
+    start = time.perf_counter()
+    for lo in range(0, size, BATCH):
+        store.batch([PutOp(*_item(i)) for i in range(lo, min(lo + BATCH, size))])
+    results["put_ops_s"] = _rate(size, time.perf_counter() - start)
+
+    keys = [_item(rng.randrange(size))[:2] for _ in range(READS)]
+    start = time.perf_counter()
+    for namespace, key in keys:
+        store.get(namespace, key)
+    results["get_ops_s"] = _rate(READS, time.perf_counter() - start)
+
+    # Second pass over the same keys is served from the LRU cache when one is configured
+    start = time.perf_counter()
+    for namespace, key in keys:
+        store.get(namespace, key)
+    results["get_warm_ops_s"] = _rate(READS, time.perf_counter() - start)
+
+    users = [("memory", f"user-{rng.randrange(USERS)}") for _ in range(LISTS)]
+    start = time.perf_counter()
+    for namespace in users:
+        store.search(namespace, limit=100)
+    results["list_ops_s"] = _rate(LISTS, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for _ in range(10):
+        store.list_namespaces(prefix=("memory",), limit=100)
+    results["list_namespaces_ops_s"] = _rate(10, time.perf_counter() - start)
+    return results
+
+
+def run(sizes: list[int], cache_size: int, seed: int = 0) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            row = {}
+            row["InMemoryStore"] = bench_store(InMemoryStore(), size, random.Random(seed))
+            path = os.path.join(tmp, f"store-{size}.db")
+            row["SqliteStore"] = bench_store(SqliteStore(path), size, random.Random(seed))
+            path = os.path.join(tmp, f"store-cached-{size}.db")
+            row[f"SqliteStore(cache={cache_size})"] = bench_store(
+                SqliteStore(path, cache_size=cache_size), size, random.Random(seed)
+            )
+            row["sqlite_file_mb"] = round(os.path.getsize(os.path.join(tmp, f"store-{size}.db")) / 2**20, 1)
+            results[size] = row
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--cache-size", type=int, default=10_000, help="LRU size for the cached variant")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable JSON only")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.cache_size)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    for size, row in results.items():
+        print(f"\n{size:,} items (sqlite file {row.pop('sqlite_file_mb')} MB)")
+        print(f"{'store':<28}{'put/s':>12}{'get/s':>12}{'warm get/s':>12}{'list/s':>10}{'ns/s':>8}")
+        for name, r in row.items():
+            print(
+                f"{name:<28}{r['put_ops_s']:>12,.0f}{r['get_ops_s']:>12,.0f}{r['get_warm_ops_s']:>12,.0f}"
+                f"{r['list_ops_s']:>10,.0f}{r['list_namespaces_ops_s']:>8,.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
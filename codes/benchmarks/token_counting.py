@@ -0,0 +1,131 @@
+"""
+Token counting for message trimming: full recount vs cached vs incremental.
+
+For each history size the chat is continued for a number of turns (one human and one AI
+message per turn), trimming the history to `--max-tokens` before every model call:
+1. recount      - trim_messages with a plain token counter (every message, every turn).
+2. cached       - trim_messages with a TokenCounter (each message tokenized once).
+3. incremental  - trim_to_budget with the running window kept between turns.
+
+All three must select the same messages. The report shows microseconds for the first turn
+(nothing counted yet) and the median of the following turns.
+
+Usage:
+    python -m codes.benchmarks.token_counting --sizes 1000 5000 10000 --turns 20
+    python -m codes.benchmarks.token_counting --exact      # tokenizer of the factory's chat model
+"""
+# Import libraries
+import os
+import json
+import time
+import random
+import argparse
+import statistics
+from typing import Callable
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, trim_messages
+from langchain_core.messages.utils import count_tokens_approximately
+
+from codes.benchmarks.config_import import BENCH_ENV
+from codes.utils.token_accounting import TokenCounter, trim_to_budget
+
+WORDS = "the agent reads a long message history and keeps only what fits in the model budget".split()
+
+
+def _message(i: int, rng: random.Random) -> BaseMessage:
+    text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 80)))
+    cls = HumanMessage if i % 2 == 0 else AIMessage
+    return cls(content=text, id=f"m-{i}")
+
+
+def _history(size: int, seed: int) -> list[BaseMessage]:
+    rng = random.Random(seed)
+    return [_message(i, rng) for i in range(size)]
+
+
+def _exact_model():
+    for key, value in BENCH_ENV.items():
+        os.environ.setdefault(key, value)
+    from codes.config.config import LLMProvider
+    from codes.utils.llm_factory import get_chat_model
+
+    return get_chat_model(LLMProvider.OPENAI, "gpt-4o")
+
+
+def _continue_chat(size: int, turns: int, seed: int, trim: Callable) -> tuple[list[float], list[int]]:
+    """Time `trim(history)` over `turns` turns; return the seconds and kept lengths per turn."""
+    history = _history(size, seed)
+    rng = random.Random(seed + 1)
+    kept, seconds = [], []
+    for turn in range(turns):
+        history.append(_message(size + 2 * turn, rng))
+        start = time.perf_counter()
+        kept.append(len(trim(history)))
+        seconds.append(time.perf_counter() - start)
+        history.append(_message(size + 2 * turn + 1, rng))
+    return seconds, kept
+
+
+def bench_size(size: int, turns: int, max_tokens: int, exact: bool, seed: int = 0) -> dict:
+    model = _exact_model() if exact else None
+    plain_counter = model if exact else count_tokens_approximately
+
+    def recount(history):
+        return trim_messages(history, max_tokens=max_tokens, strategy="last", token_counter=plain_counter)
+
+    cached_counter = TokenCounter(model=model)
+
+    def cached(history):
+        return trim_messages(history, max_tokens=max_tokens, strategy="last", token_counter=cached_counter)
+
+    incremental_counter = TokenCounter(model=model)
+    state = {"window": None}
+
+    def incremental(history):
+        messages, state["window"] = trim_to_budget(history, state["window"], max_tokens, incremental_counter)
+        return messages
+
+    results, kept = {}, {}
+    for name, trim in (("recount", recount), ("cached", cached), ("incremental", incremental)):
+        seconds, kept[name] = _continue_chat(size, turns, seed, trim)
+        results[name] = {
+            "first_turn_us": round(seconds[0] * 1e6, 1),
+            "us_per_turn": round(statistics.median(seconds[1:] or seconds) * 1e6, 1),
+        }
+    # The cached counter's totals are per-message sums, so it is the reference for the window
+    results["same_selection"] = kept["cached"] == kept["incremental"]
+    results["kept_messages"] = kept["incremental"][-1]
+    results["speedup_vs_recount"] = round(results["recount"]["us_per_turn"] / results["incremental"]["us_per_turn"], 1)
+    return results
+
+
+def run(sizes: list[int], turns: int, max_tokens: int, exact: bool) -> dict:
+    return {size: bench_size(size, turns, max_tokens, exact) for size in sizes}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 5_000, 10_000])
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--max-tokens", type=int, default=1_000)
+    parser.add_argument("--exact", action="store_true", help="Count with the chat model's tokenizer")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable JSON only")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.turns, args.max_tokens, args.exact)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'messages':>10}{'':>14}{'recount us':>13}{'cached us':>12}{'incremental us':>16}")
+    for size, r in results.items():
+        for label, key in (("first turn", "first_turn_us"), ("next turns", "us_per_turn")):
+            print(
+                f"{size:>10,}{label:>14}{r['recount'][key]:>13,.1f}{r['cached'][key]:>12,.1f}"
+                f"{r['incremental'][key]:>16,.1f}"
+            )
+        print(f"{'':>10}{'':>14}speedup {r['speedup_vs_recount']}x, same selection: {r['same_selection']}")
+
+
+if __name__ == "__main__":
+    main()
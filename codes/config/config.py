@@ -15,14 +15,24 @@ Usage:
     if config.is_production():
         # Production-specific logic
         pass
+
+The configuration is resolved lazily: importing this module is cheap and the
+environment is parsed on the first attribute access of `config` (or the first
+`get_config()` call). Worker processes can receive a frozen snapshot instead:
+
+    from concurrent.futures import ProcessPoolExecutor
+    from config.config import install_config, snapshot_config
+
+    pool = ProcessPoolExecutor(initializer=install_config, initargs=(snapshot_config(),))
 """
 # Import libraries
-import sys
 import logging
+import threading
 from enum import Enum
 from pathlib import Path
-from pydantic_settings import BaseSettings
-from pydantic import SecretStr, Field, ValidationError, BaseModel
+from typing import Optional
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from pydantic import SecretStr, Field, ValidationError, BaseModel, ConfigDict
 
 from codes.utils.helpers import get_default_host
 
@@ -40,6 +50,7 @@ class LLMProvider(str, Enum):
     """Supported Large Language Model providers."""
     OPENAI = "openai"
     GOOGLE = "google"
+    LOCAL = "local"
 
 
 class DatabaseConfig(BaseModel):
@@ -64,10 +75,12 @@ class ModelConfig(BaseModel):
     Large Language Model provider configuration.
 
     Attributes:
-        provider: LLM provider (openai or google)
+        provider: LLM provider (openai, google, or local for an offline stand-in)
         model_name: LLM model identifier (e.g., gpt-4o, gemini-2.5-flash)
         api_key: Provider API key for authentication
         temperature: Model temperature (range: 0.0 - 1.0)
+        pool_size: Maximum open connections in the shared per-provider pool
+        request_timeout: Per-request timeout in seconds
     """
     provider: LLMProvider = Field(
         default=LLMProvider.GOOGLE,
@@ -86,6 +99,16 @@ class ModelConfig(BaseModel):
         le=1.0,
         description="Model temperature"
     )
+    pool_size: int = Field(
+        default=20,
+        ge=1,
+        description="Maximum open connections per provider pool"
+    )
+    request_timeout: float = Field(
+        default=60.0,
+        gt=0.0,
+        description="Per-request timeout in seconds"
+    )
 
 
 class SystemConfig(BaseSettings):
@@ -170,6 +193,15 @@ class SystemConfig(BaseSettings):
         description="OpenAI API key"
     )
 
+    google_api_key: Optional[SecretStr] = Field(
+        default=None,
+        description="Google API key, used when Gemini is requested while another provider is configured"
+    )
+
+    retrieval_cache_path: Optional[str] = Field(
+        default=None,
+        description="SQLite file for the persistent retrieval cache tier (memory only when unset)"
+    )
 
 
     # External Service Configurations
@@ -192,6 +224,10 @@ class SystemConfig(BaseSettings):
         """Check if using Google as LLM provider."""
         return self.model.provider == LLMProvider.GOOGLE
 
+    def is_local_provider(self) -> bool:
+        """Check if using the offline stand-in model."""
+        return self.model.provider == LLMProvider.LOCAL
+
     class Config:
         """Pydantic configuration for environment variable loading."""
         env_file = Path(__file__).parent.parent.parent / '.env'
@@ -202,19 +238,132 @@ class SystemConfig(BaseSettings):
 
 # Initialize logging with basic configuration
 DEFAULT_LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-logging.basicConfig(level=logging.DEBUG, format=DEFAULT_LOG_FORMAT)
 
-# Load and validate configuration on module import
-try:
-    config = SystemConfig()
-    logging.info(f"Configuration loaded for environment: {config.environment}")
-except ValidationError as e:
-    logging.error(f"Configuration validation failed: {e}")
-    sys.exit(1)
-except Exception as e:
-    logging.error(f"Failed to load configuration: {e}")
-    sys.exit(1)
+
+class _FrozenDatabaseConfig(DatabaseConfig):
+    """Read-only DatabaseConfig held by a ConfigSnapshot."""
+    model_config = ConfigDict(frozen=True)
+
+
+class _FrozenModelConfig(ModelConfig):
+    """Read-only ModelConfig held by a ConfigSnapshot."""
+    model_config = ConfigDict(frozen=True)
+
+
+class ConfigSnapshot(SystemConfig):
+    """
+    Frozen copy of a resolved SystemConfig.
+
+    Snapshots are built from an already validated config, so creating or unpickling
+    one never touches the environment or the .env file. Pass them to worker processes
+    and install them with `install_config` to skip the settings parse on boot. The
+    nested `database` and `model` sections are frozen copies as well.
+    """
+    model_config = SettingsConfigDict(frozen=True)
+
+    database: _FrozenDatabaseConfig
+    model: _FrozenModelConfig
+
+
+_config: Optional[SystemConfig] = None
+_config_lock = threading.Lock()
+
+
+def _load_config() -> SystemConfig:
+    """Parse and validate the configuration, then initialize logging from it."""
+    try:
+        loaded = SystemConfig()
+    except ValidationError as e:
+        logging.basicConfig(level=logging.DEBUG, format=DEFAULT_LOG_FORMAT)
+        logging.error(f"Configuration validation failed: {e}")
+        raise
+    except Exception as e:
+        logging.basicConfig(level=logging.DEBUG, format=DEFAULT_LOG_FORMAT)
+        logging.error(f"Failed to load configuration: {e}")
+        raise
+
+    logging.basicConfig(level=loaded.log_level.value, format=loaded.log_format)
+    logging.info(f"Configuration loaded for environment: {loaded.environment}")
+    return loaded
+
+
+def get_config() -> SystemConfig:
+    """
+    Return the process-wide configuration, loading it on first use.
+
+    The environment and .env file are parsed at most once per process; later calls
+    return the cached instance.
+
+    Raises:
+        ValidationError: If the environment does not describe a valid configuration.
+    """
+    global _config
+    if _config is None:
+        with _config_lock:
+            if _config is None:
+                _config = _load_config()
+    return _config
+
+
+def snapshot_config() -> ConfigSnapshot:
+    """Return a frozen, picklable snapshot of the current configuration."""
+    current = get_config()
+    if isinstance(current, ConfigSnapshot):
+        return current
+    fields = {name: getattr(current, name) for name in SystemConfig.model_fields}
+    for name, frozen_type in (("database", _FrozenDatabaseConfig), ("model", _FrozenModelConfig)):
+        section = fields[name]
+        fields[name] = frozen_type.model_construct(
+            _fields_set=section.model_fields_set,
+            **{field: getattr(section, field) for field in type(section).model_fields},
+        )
+    return ConfigSnapshot.model_construct(_fields_set=current.model_fields_set, **fields)
+
+
+def install_config(snapshot: SystemConfig) -> None:
+    """
+    Use an existing configuration instead of parsing the environment.
+
+    Intended as a worker initializer, e.g.
+    `ProcessPoolExecutor(initializer=install_config, initargs=(snapshot_config(),))`.
+    """
+    global _config
+    with _config_lock:
+        _config = snapshot
+
+
+def reset_config() -> None:
+    """Drop the cached configuration so the next access reloads it."""
+    global _config
+    with _config_lock:
+        _config = None
+
+
+class _LazyConfig:
+    """Module-level proxy that resolves the configuration on first attribute access."""
+    __slots__ = ()
+
+    def __getattr__(self, name: str):
+        return getattr(get_config(), name)
+
+    def __repr__(self) -> str:
+        state = "loaded" if _config is not None else "not loaded"
+        return f"<lazy SystemConfig ({state})>"
+
+
+# Resolved lazily; importing this module does not read the environment
+config = _LazyConfig()
 
 
 # Public API
-__all__ = ['config', 'SystemConfig']
+__all__ = [
+    'config',
+    'SystemConfig',
+    'ModelConfig',
+    'LLMProvider',
+    'ConfigSnapshot',
+    'get_config',
+    'snapshot_config',
+    'install_config',
+    'reset_config',
+]
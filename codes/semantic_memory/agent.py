@@ -1,23 +1,41 @@
 # Import libraries
+import re
+import argparse
 import uuid
+import asyncio
+import functools
+from weakref import WeakKeyDictionary
 from typing import List, Optional
 from pydantic import BaseModel, Field
 
 from trustcall import create_extractor
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import PromptTemplate
 from langchain_core.runnables.config import RunnableConfig
-from langchain_core.messages import SystemMessage, HumanMessage
+from langchain_core.messages import AnyMessage, SystemMessage, HumanMessage
 
 from langgraph.store.base import BaseStore
 from langgraph.store.memory import InMemoryStore
-from langgraph.checkpoint.memory import InMemorySaver
 from langgraph.graph import StateGraph, START, END, MessagesState
 
-from codes.config.config import config
+from codes.config.config import LLMProvider
+from codes.utils.llm_factory import get_async_chat_model, get_chat_model
+from codes.utils.sqlite_store import SqliteStore
+from codes.utils.compacting_saver import CompactingSaver
+from codes.utils.graph_registry import get_compiled_graph, register_graph
+from codes.semantic_memory.memory_writer import MemoryWriter
+from codes.semantic_memory.profile_cache import (
+    PROFILE_KEY,
+    CachedProfile,
+    ProfileCache,
+    profile_namespace,
+)
+
+# LLM, created on first use so importing this module needs no configuration
+MODEL = (LLMProvider.OPENAI, "gpt-4o")
 
-# Initialize LLM
-llm = ChatOpenAI(api_key=config.openai_api_key.get_secret_value(), model="gpt-4o")
+
+def _llm():
+    return get_chat_model(*MODEL)
 
 
 # Long-Term memory schema
@@ -61,59 +79,173 @@ Based on chathistory below, update the memory and expand it if new information i
 )
 
 
+# Graph state
+class State(MessagesState):
+    # Id of the last message already considered by memory extraction
+    last_extracted_id: Optional[str]
+    # Version of the profile read at the start of this turn
+    profile_version: Optional[str]
+
+
+# Memory writers, built on first use and reused on every turn
+@functools.lru_cache(maxsize=1)
+def _memory_extractor():
+    return create_extractor(_llm(), tools=[UserProfile], tool_choice="UserProfile")
+
+
+# Async extractors per event loop: the async model's client belongs to the loop that
+# created it, and the background writer runs on its own loop
+_async_extractors: "WeakKeyDictionary[asyncio.AbstractEventLoop, object]" = WeakKeyDictionary()
+
+
+def _async_memory_extractor():
+    loop = asyncio.get_running_loop()
+    extractor = _async_extractors.get(loop)
+    if extractor is None:
+        extractor = _async_extractors[loop] = create_extractor(
+            get_async_chat_model(*MODEL), tools=[UserProfile], tool_choice="UserProfile"
+        )
+    return extractor
+
+
+@functools.lru_cache(maxsize=1)
+def _profile_writer():
+    return _llm().with_structured_output(UserProfile)
+
+
+# Cheap pre-screen for statements that can change the profile
+PROFILE_CUES = re.compile(
+    r"\b(?:my name|call me|i am|i'm|years? old|born in|"
+    r"i (?:really |also |do )?(?:like|love|enjoy|prefer|hate|dislike)|i don'?t (?:like|enjoy)|"
+    r"my favou?rite|interested in|i live|i work|my (?:job|hobby|hobbies)|"
+    r"pronouns?|male|female|woman|man)\b",
+    re.IGNORECASE,
+)
+
+
+# Profiles are read once per turn and shared by both nodes
+profile_cache = ProfileCache()
+
+
+# Helpers
+def messages_since(messages: List[AnyMessage], watermark: Optional[str]) -> List[AnyMessage]:
+    """Return the messages after the one with id `watermark` (all of them if not found)."""
+    if watermark:
+        for i in range(len(messages) - 1, -1, -1):
+            if messages[i].id == watermark:
+                return messages[i + 1:]
+    return list(messages)
+
+
+def is_profile_relevant(messages: List[AnyMessage]) -> bool:
+    """Return True if any new user message looks like it carries profile information."""
+    return any(
+        isinstance(m, HumanMessage) and PROFILE_CUES.search(m.text())
+        for m in messages
+    )
+
+
 # Nodes
-def assistant(state: MessagesState, config: RunnableConfig, store: BaseStore):
+def assistant(state: State, config: RunnableConfig, store: BaseStore):
     """This node is responsible for responding to the user's question."""
     user_id = config["configurable"]["user_id"]
 
-    # Retrieve the memory for the user
-    namespace = ("memory", user_id)
-    key = "user_profile"
-    existing_memory = store.get(namespace, key)
-
-    if existing_memory:
-        existing_memory_content = existing_memory.value
-    else:
-        existing_memory_content = "No memory available."
+    # Read the memory for the user (one store read per turn; update_memory reuses it)
+    profile = profile_cache.get(store, user_id)
 
     # Create a prompt for the assistant
-    system_prompt = assistant_system_message.format(memory=existing_memory_content)
+    system_prompt = profile.render("assistant", assistant_system_message)
 
     # Invoke the LLM
-    response = llm.invoke([SystemMessage(content=system_prompt)] + state["messages"])
-    print(existing_memory_content)
-    return {"messages": [response]}
+    response = _llm().invoke([SystemMessage(content=system_prompt)] + state["messages"])
+    print(profile.memory_text)
+    return {"messages": [response], "profile_version": profile.version}
 
 
-def update_memory(state: MessagesState, config: RunnableConfig, store: BaseStore):
+def update_memory(state: State, config: RunnableConfig, store: BaseStore):
     """This node is responsible for updating the user's memory."""
     user_id = config["configurable"]["user_id"]
+    mode = config["configurable"].get("extraction_mode", "incremental")
 
-    # Retrieve the memory for the user
-    namespace = ("memory", user_id)
-    key = "user_profile"
-    existing_memory = store.get(namespace, key)
+    if mode == "full":
+        return _full_update(state, store, user_id)
 
-    if existing_memory:
-        existing_memory_content = existing_memory.value
-    else:
-        existing_memory_content = "No memory available."
+    # Only look at what was said since the last extraction
+    new_messages = messages_since(state["messages"], state.get("last_extracted_id"))
 
-    # Create a prompt for the memory updater
-    system_prompt = update_memory_prompt.format(memory=existing_memory_content)
+    # Skip the LLM call when nothing profile-relevant appeared
+    if is_profile_relevant(new_messages):
+        profile = profile_cache.get(store, user_id, state.get("profile_version"))
+        apply_profile_update(store, user_id, new_messages, profile)
+    return _watermark(state)
 
-    # Add output structure to the LLM
-    llm_with_structure = llm.with_structured_output(UserProfile)
 
-    # Invoke the LLM
-    response = llm_with_structure.invoke([SystemMessage(content=system_prompt)] + state["messages"])
+def schedule_memory_update(state: State, config: RunnableConfig, store: BaseStore):
+    """Hand new messages to the background memory writer and return immediately."""
+    user_id = config["configurable"]["user_id"]
+
+    new_messages = messages_since(state["messages"], state.get("last_extracted_id"))
+    if is_profile_relevant(new_messages):
+        memory_writer.submit(store, user_id, new_messages)
+    return _watermark(state)
+
+
+def _watermark(state: State) -> dict:
+    return {"last_extracted_id": state["messages"][-1].id} if state["messages"] else {}
+
+
+def _full_update(state: State, store: BaseStore, user_id: str):
+    """Regenerate the whole profile from the entire history (original behaviour)."""
+    profile = profile_cache.get(store, user_id, state.get("profile_version"))
+    system_prompt = profile.render("update", update_memory_prompt)
+    response = _profile_writer().invoke([SystemMessage(content=system_prompt)] + state["messages"])
+    _save_profile(store, user_id, response.model_dump())
+    return _watermark(state)
+
+
+# Memory extraction
+def _extractor_inputs(profile: CachedProfile, new_messages: List[AnyMessage]) -> dict:
+    """Build a trustcall request that patches the existing profile with new messages."""
+    system_prompt = profile.render("update", update_memory_prompt)
+    inputs = {"messages": [SystemMessage(content=system_prompt)] + new_messages}
+    if profile.value is not None:
+        inputs["existing"] = {"UserProfile": profile.value}
+    return inputs
+
+
+def _save_profile(store: BaseStore, user_id: str, value: dict):
+    store.put(profile_namespace(user_id), PROFILE_KEY, value)
+    profile_cache.invalidate(user_id)
+
+
+def apply_profile_update(
+        store: BaseStore,
+        user_id: str,
+        new_messages: List[AnyMessage],
+        profile: Optional[CachedProfile] = None,
+):
+    """Patch the stored profile of `user_id` with information from `new_messages`."""
+    profile = profile or profile_cache.get(store, user_id)
+    result = _memory_extractor().invoke(_extractor_inputs(profile, new_messages))
+    if result["responses"]:
+        _save_profile(store, user_id, result["responses"][0].model_dump())
+
 
-    # Store the updated memory in the store
-    store.put(namespace, key, response)
+async def aapply_profile_update(store: BaseStore, user_id: str, new_messages: List[AnyMessage]):
+    """Async version of apply_profile_update, run by the background memory writer on its loop."""
+    profile = await profile_cache.aget(store, user_id)
+    result = await _async_memory_extractor().ainvoke(_extractor_inputs(profile, new_messages))
+    if result["responses"]:
+        await store.aput(profile_namespace(user_id), PROFILE_KEY, result["responses"][0].model_dump())
+        profile_cache.invalidate(user_id)
+
+
+# Background writer: coalesces pending turns per user into a single extraction
+memory_writer = MemoryWriter(aapply_profile_update)
 
 
 # Build graph
-builder = StateGraph(MessagesState)
+builder = StateGraph(State)
 
 builder.add_node("assistant", assistant)
 builder.add_node("update_memory", update_memory)
@@ -122,15 +254,40 @@ builder.add_edge(START, "assistant")
 builder.add_edge("assistant", "update_memory")
 builder.add_edge("update_memory", END)
 
+# Same graph with memory writes moved off the critical path
+background_builder = StateGraph(State)
+
+background_builder.add_node("assistant", assistant)
+background_builder.add_node("schedule_memory_update", schedule_memory_update)
+
+background_builder.add_edge(START, "assistant")
+background_builder.add_edge("assistant", "schedule_memory_update")
+background_builder.add_edge("schedule_memory_update", END)
+
+
+@register_graph("semantic-memory")
+def build_graph() -> StateGraph:
+    return builder
 
-def main():
-    """Main CLI function for the semantic memory agent."""
 
-    # Initialize the checkpointer for short-term memory
-    memory = InMemorySaver()
+@register_graph("semantic-memory-background")
+def build_background_graph() -> StateGraph:
+    return background_builder
+
+
+def main(background: bool = False, store_path: Optional[str] = None):
+    """Main CLI function for the semantic memory agent.
+
+    Args:
+        background: Write memory from the background writer instead of inside the turn.
+        store_path: SQLite file for long-term memory; in-memory (lost on exit) when omitted.
+    """
+
+    # Initialize the checkpointer for short-term memory (bounded per thread)
+    memory = CompactingSaver(keep_last=20, idle_ttl=3600)
 
     # Initialize the store for long-term memory
-    store = InMemoryStore()
+    store = SqliteStore(store_path, cache_size=1_000) if store_path else InMemoryStore()
 
     # Generate a user ID for this session
     user_id = str(uuid.uuid4())
@@ -139,7 +296,9 @@ def main():
     config_dict = {"configurable": {"thread_id": "test-1", "user_id": user_id}}
 
     # Compile the graph
-    graph = builder.compile(checkpointer=memory, store=store)
+    graph = get_compiled_graph(
+        "semantic-memory-background" if background else "semantic-memory", checkpointer=memory, store=store
+    )
 
     while True:
         user_input = input("You: ")
@@ -154,7 +313,17 @@ def main():
 
         print("Assistant:", messages[-1].content)
 
+    if background:
+        memory_writer.flush(timeout=30)
+        print("Memory writer:", memory_writer.stats())
+
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Semantic memory agent")
+    parser.add_argument("--background-memory", action="store_true",
+                        help="Update long-term memory off the response critical path")
+    parser.add_argument("--store", metavar="PATH",
+                        help="Persist long-term memory in this SQLite file")
+    args = parser.parse_args()
+    main(background=args.background_memory, store_path=args.store)
@@ -0,0 +1,189 @@
+"""
+Background writer for long-term memory.
+
+Moves profile extraction off the response critical path: nodes hand new messages to the
+writer and return immediately, and an async worker running on its own event loop (in a
+daemon thread) performs the extraction and commits it to the store.
+
+- Updates are queued per user; jobs for the same user never run concurrently.
+- Turns that arrive while a user's job is still waiting are coalesced into that job,
+  so a burst of N turns costs a single extraction.
+- Freshness lag (time from the first queued turn to the commit) is recorded so we can
+  see how stale memory reads can get.
+
+Usage:
+    writer = MemoryWriter(extract_fn)           # extract_fn(store, user_id, messages) coroutine
+    writer.submit(store, user_id, new_messages)
+    writer.flush(timeout=10)                    # e.g. before exit
+    print(writer.stats())
+"""
+# Import libraries
+import time
+import asyncio
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Optional
+
+from langchain_core.messages import AnyMessage
+from langgraph.store.base import BaseStore
+
+logger = logging.getLogger(__name__)
+
+ExtractFn = Callable[[BaseStore, str, list[AnyMessage]], Awaitable[None]]
+
+
+@dataclass
+class PendingUpdate:
+    """Messages waiting to be folded into one user's profile."""
+    store: BaseStore
+    messages: list[AnyMessage]
+    first_enqueued_at: float
+    turns: int = 1
+
+
+@dataclass
+class FreshnessStats:
+    """Memory-freshness lag and throughput counters."""
+    commits: int = 0
+    failures: int = 0
+    turns: int = 0
+    coalesced_turns: int = 0
+    last_lag: float = 0.0
+    max_lag: float = 0.0
+    total_lag: float = 0.0
+    lags: list[float] = field(default_factory=list, repr=False)
+
+    @property
+    def mean_lag(self) -> float:
+        return self.total_lag / self.commits if self.commits else 0.0
+
+    def record(self, lag: float, turns: int):
+        self.commits += 1
+        self.coalesced_turns += turns - 1
+        self.last_lag = lag
+        self.max_lag = max(self.max_lag, lag)
+        self.total_lag += lag
+        self.lags.append(lag)
+        del self.lags[:-1000]
+
+
+class MemoryWriter:
+    """
+    Per-user coalescing queue serviced by async workers on a background event loop.
+
+    Args:
+        extract: Coroutine that folds `messages` into the user's stored profile.
+        concurrency: Number of users whose updates may be extracted at the same time.
+    """
+
+    def __init__(self, extract: ExtractFn, concurrency: int = 4):
+        self._extract = extract
+        self._concurrency = concurrency
+        self._pending: dict[str, PendingUpdate] = {}
+        self._running: set[str] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._idle: Optional[asyncio.Event] = None
+        self._start_lock = threading.Lock()
+        self._stats = FreshnessStats()
+
+    # Lifecycle
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        if self._loop is not None:
+            return self._loop
+        with self._start_lock:
+            if self._loop is None:
+                ready = threading.Event()
+                thread = threading.Thread(
+                    target=self._run_loop, args=(ready,), name="memory-writer", daemon=True
+                )
+                thread.start()
+                ready.wait()
+        return self._loop
+
+    def _run_loop(self, ready: threading.Event):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._queue = asyncio.Queue()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        for i in range(self._concurrency):
+            loop.create_task(self._worker(), name=f"memory-writer-{i}")
+        self._loop = loop
+        ready.set()
+        loop.run_forever()
+
+    # Producer side (any thread)
+    def submit(self, store: BaseStore, user_id: str, messages: list[AnyMessage]) -> None:
+        """Queue new messages for `user_id`; returns without waiting for the extraction."""
+        if not messages:
+            return
+        loop = self._ensure_started()
+        loop.call_soon_threadsafe(self._enqueue, store, user_id, list(messages), time.monotonic())
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until every queued update is committed. Returns False on timeout."""
+        if self._loop is None:
+            return True
+        future = asyncio.run_coroutine_threadsafe(self._idle.wait(), self._loop)
+        try:
+            future.result(timeout)
+            return True
+        except TimeoutError:
+            future.cancel()
+            return False
+
+    def pending_users(self) -> int:
+        """Number of users with an update queued or in flight."""
+        return len(self._pending.keys() | self._running)
+
+    def stats(self) -> dict:
+        """Snapshot of freshness lag (seconds) and coalescing counters."""
+        s = self._stats
+        lags = sorted(s.lags)
+        p95 = lags[min(len(lags) - 1, int(len(lags) * 0.95))] if lags else 0.0
+        return {
+            "commits": s.commits,
+            "failures": s.failures,
+            "turns": s.turns,
+            "coalesced_turns": s.coalesced_turns,
+            "pending_users": self.pending_users(),
+            "last_lag_s": round(s.last_lag, 4),
+            "mean_lag_s": round(s.mean_lag, 4),
+            "p95_lag_s": round(p95, 4),
+            "max_lag_s": round(s.max_lag, 4),
+        }
+
+    # Consumer side (writer loop only)
+    def _enqueue(self, store: BaseStore, user_id: str, messages: list[AnyMessage], enqueued_at: float):
+        self._stats.turns += 1
+        self._idle.clear()
+        job = self._pending.get(user_id)
+        if job is not None:
+            # Not started yet: fold this turn into the waiting job
+            job.messages.extend(messages)
+            job.turns += 1
+            return
+        self._pending[user_id] = PendingUpdate(store, messages, enqueued_at)
+        if user_id not in self._running:
+            self._queue.put_nowait(user_id)
+
+    async def _worker(self):
+        while True:
+            user_id = await self._queue.get()
+            job = self._pending.pop(user_id)
+            self._running.add(user_id)
+            try:
+                await self._extract(job.store, user_id, job.messages)
+                self._stats.record(time.monotonic() - job.first_enqueued_at, job.turns)
+            except Exception:
+                self._stats.failures += 1
+                logger.exception(f"Memory update failed for user {user_id}")
+            finally:
+                self._running.discard(user_id)
+                # Turns that arrived while we were extracting get their own job now
+                if user_id in self._pending:
+                    self._queue.put_nowait(user_id)
+                elif not self._pending and not self._running:
+                    self._idle.set()
@@ -0,0 +1,143 @@
+"""
+Profile read cache for the semantic memory agent.
+
+Both graph nodes need the user's profile and a prompt rendered from it. Instead of each
+node calling `store.get` and re-formatting its template on every turn, they share a
+process-wide cache keyed by (user_id, profile version):
+
+- The first node of a turn reads the profile from the store once (`get` without a
+  version), so profiles written by other processes or external writers are seen on the
+  next turn. It hands the version on, and the second node reuses that read by pinning it.
+- While the profile version is unchanged, rendered prompt strings are reused as-is.
+- Writers call `invalidate(user_id)` after `store.put`.
+
+The version of a profile is its `updated_at` timestamp in the store.
+"""
+# Import libraries
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from langchain_core.prompts import PromptTemplate
+from langgraph.store.base import BaseStore, Item
+
+NO_MEMORY = "No memory available."
+PROFILE_KEY = "user_profile"
+
+
+def profile_namespace(user_id: str) -> tuple[str, str]:
+    return ("memory", user_id)
+
+
+@dataclass
+class CachedProfile:
+    """A profile as read from the store, plus prompts rendered from it."""
+    store_id: int
+    version: str
+    value: Optional[dict]
+    prompts: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def memory_text(self):
+        """What the prompts show for this profile."""
+        return self.value if self.value is not None else NO_MEMORY
+
+    def render(self, name: str, template: PromptTemplate) -> str:
+        """Format `template` with this profile, reusing the result while the version is unchanged."""
+        prompt = self.prompts.get(name)
+        if prompt is None:
+            prompt = self.prompts[name] = template.format(memory=self.memory_text)
+        return prompt
+
+
+def _version(item: Optional[Item]) -> str:
+    return item.updated_at.isoformat() if item is not None else "missing"
+
+
+class ProfileCache:
+    """
+    Process-scoped, size-bounded cache of user profiles and their rendered prompts.
+
+    Args:
+        max_users: Maximum number of profiles kept (least recently used are evicted).
+    """
+
+    def __init__(self, max_users: int = 10_000):
+        self.max_users = max_users
+        self._entries: OrderedDict[str, CachedProfile] = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by every invalidation so a read racing a write never caches the old profile
+        self._generation = 0
+        self.hits = 0
+        self.store_reads = 0
+
+    def _lookup(self, store: BaseStore, user_id: str, version: str) -> Optional[CachedProfile]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry.store_id != id(store) or entry.version != version:
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry
+
+    def _remember(self, store: BaseStore, user_id: str, item: Optional[Item], generation: int) -> CachedProfile:
+        """Entry for a profile just read: the cached one (with its prompts) if the version is unchanged."""
+        version = _version(item)
+        with self._lock:
+            self.store_reads += 1
+            entry = self._entries.get(user_id)
+            if entry is not None and entry.store_id == id(store) and entry.version == version:
+                self._entries.move_to_end(user_id)
+                return entry
+            entry = CachedProfile(
+                store_id=id(store),
+                version=version,
+                value=item.value if item is not None else None,
+            )
+            if generation == self._generation:
+                self._entries[user_id] = entry
+                self._entries.move_to_end(user_id)
+                while len(self._entries) > self.max_users:
+                    self._entries.popitem(last=False)
+        return entry
+
+    def get(self, store: BaseStore, user_id: str, version: Optional[str] = None) -> CachedProfile:
+        """
+        Return the profile of `user_id`.
+
+        Args:
+            store: Long-term memory store.
+            user_id: Owner of the profile.
+            version: Version read earlier in this turn; served from the cache when it is
+                still cached. Without it the store is read (once per turn).
+        """
+        entry = self._lookup(store, user_id, version) if version is not None else None
+        if entry is None:
+            generation = self._generation
+            item = store.get(profile_namespace(user_id), PROFILE_KEY)
+            entry = self._remember(store, user_id, item, generation)
+        return entry
+
+    async def aget(self, store: BaseStore, user_id: str, version: Optional[str] = None) -> CachedProfile:
+        """Async version of get."""
+        entry = self._lookup(store, user_id, version) if version is not None else None
+        if entry is None:
+            generation = self._generation
+            item = await store.aget(profile_namespace(user_id), PROFILE_KEY)
+            entry = self._remember(store, user_id, item, generation)
+        return entry
+
+    def invalidate(self, user_id: str) -> None:
+        """Forget the cached profile of `user_id`; call after every write."""
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        return {"users": len(self._entries), "hits": self.hits, "store_reads": self.store_reads}
@@ -0,0 +1,181 @@
+"""
+Local arithmetic fast path for the ReAct agent.
+
+"Add 3 and 4" costs two model calls (plan the tool call, then phrase the answer) for work
+the process can do in microseconds. The fast path is a pre-router node that answers such
+requests itself, with the agent's own tools, and otherwise hands the turn to `assistant`.
+
+Handled (whole message, case-insensitive):
+- "Add 3 and 4", "Add 3 to 4", "Sum 3 and 4"
+- "Multiply 3 by 4", "Multiply 3 and 4"
+- "Divide 10 by 2"
+- "What is 3 + 4?", "Calculate 6 * 7", "12 / 4", "3 plus 4", "3 times 4", "10 divided by 4"
+where an operand may refer to the previous result: "the output", "the result", "the
+answer", "it", "that" ("Multiply the output by 2").
+
+The previous result is the fast path's own last answer, or the single tool result the
+assistant ended its last turn with. Anything else is ambiguous and goes to the assistant:
+several results in the last turn, non-integer operands (the tools take ints), division by
+zero, extra words, or more than one operation.
+"""
+# Import libraries
+import re
+import threading
+from typing import Callable, Optional, Union
+
+from langchain_core.tools import BaseTool
+from langchain_core.messages import AIMessage, AnyMessage, HumanMessage, ToolMessage
+
+FAST_PATH_KEY = "fast_path_result"
+
+Number = Union[int, float]
+
+_OPERAND = r"(-?\d+(?:\.\d+)?|(?:the\s+)?(?:previous\s+|last\s+)?(?:output|result|answer)|it|that)"
+_PATTERNS = [
+    (re.compile(rf"^(?:add|sum)\s+{_OPERAND}\s+(?:and|to|with|plus)\s+{_OPERAND}$"), "add"),
+    (re.compile(rf"^multiply\s+{_OPERAND}\s+(?:by|and|with|times)\s+{_OPERAND}$"), "multiply"),
+    (re.compile(rf"^divide\s+{_OPERAND}\s+by\s+{_OPERAND}$"), "divide"),
+    (re.compile(
+        rf"^(?:(?:what\s+is|what's|calculate|compute)\s+)?{_OPERAND}\s*"
+        r"(\+|\*|/|x|plus|times|multiplied\s+by|divided\s+by)\s*"
+        rf"{_OPERAND}$"
+    ), None),
+]
+_OPERATORS = {
+    "+": "add", "plus": "add",
+    "*": "multiply", "x": "multiply", "times": "multiply", "multiplied by": "multiply",
+    "/": "divide", "divided by": "divide",
+}
+
+
+def _parse_number(text: str) -> Optional[Number]:
+    try:
+        value = float(text)
+    except (TypeError, ValueError):
+        return None
+    return int(value) if value.is_integer() else value
+
+
+def parse_request(text: str) -> Optional[tuple[str, str, str]]:
+    """Return (operation, left operand, right operand) for a pure arithmetic request, else None."""
+    text = re.sub(r"\s+", " ", text.strip().lower()).rstrip(".?!").strip()
+    text = re.sub(r"^please\s+|\s+please$", "", text)
+    for pattern, operation in _PATTERNS:
+        match = pattern.match(text)
+        if match is None:
+            continue
+        if operation is None:
+            left, operator, right = match.groups()
+            return _OPERATORS[re.sub(r"\s+", " ", operator)], left, right
+        return operation, match.group(1), match.group(2)
+    return None
+
+
+def previous_result(messages: list[AnyMessage]) -> Optional[Number]:
+    """The unambiguous numeric result of the turn before the latest human message, if any."""
+    humans = [i for i, m in enumerate(messages) if isinstance(m, HumanMessage)]
+    if len(humans) < 2:
+        return None
+    turn = messages[humans[-2] + 1:humans[-1]]
+
+    # The fast path answered the last turn itself
+    for message in reversed(turn):
+        if isinstance(message, AIMessage) and FAST_PATH_KEY in message.response_metadata:
+            return message.response_metadata[FAST_PATH_KEY]
+
+    # Otherwise: the tool results of the assistant's last tool-calling step, if there was exactly one
+    calls = [m for m in turn if isinstance(m, AIMessage) and m.tool_calls]
+    if not calls:
+        return None
+    ids = {c["id"] for c in calls[-1].tool_calls}
+    results = [m for m in turn if isinstance(m, ToolMessage) and m.tool_call_id in ids]
+    if len(results) != 1 or results[0].status == "error":
+        return None
+    return _parse_number(results[0].content)
+
+
+class FastPathStats:
+    """Counts of turns answered locally vs handed to the assistant (by reason)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.handled = 0
+        self.fallbacks: dict[str, int] = {}
+
+    def record(self, reason: Optional[str]):
+        with self._lock:
+            if reason is None:
+                self.handled += 1
+            else:
+                self.fallbacks[reason] = self.fallbacks.get(reason, 0) + 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            total = self.handled + sum(self.fallbacks.values())
+            return {
+                "turns": total,
+                "short_circuited": self.handled,
+                "short_circuit_rate": round(self.handled / total, 4) if total else 0.0,
+                "fallbacks": dict(self.fallbacks),
+            }
+
+
+fast_path_stats = FastPathStats()
+
+
+def _format(value: Number) -> str:
+    return str(int(value)) if isinstance(value, float) and value.is_integer() else str(value)
+
+
+def make_fast_path_node(operations: dict[str, BaseTool]) -> Callable:
+    """
+    Build the pre-router node.
+
+    Args:
+        operations: Tools to run for "add", "multiply" and "divide" (called with ints a and b).
+
+    Returns:
+        A node that appends a local answer, or returns no update to defer to the assistant.
+    """
+
+    def resolve(operand: str, messages: list[AnyMessage]) -> Optional[Number]:
+        number = _parse_number(operand)
+        return number if number is not None else previous_result(messages)
+
+    def fallback(reason: str) -> dict:
+        fast_path_stats.record(reason)
+        return {}
+
+    def fast_path(state) -> dict:
+        messages = state["messages"]
+        if not messages or not isinstance(messages[-1], HumanMessage) or not isinstance(messages[-1].content, str):
+            return fallback("not_text")
+        request = parse_request(messages[-1].content)
+        if request is None:
+            return fallback("not_arithmetic")
+
+        operation, left, right = request
+        a, b = resolve(left, messages), resolve(right, messages)
+        if a is None or b is None:
+            return fallback("no_previous_result")
+        if not isinstance(a, int) or not isinstance(b, int):
+            return fallback("non_integer")
+        if operation == "divide" and b == 0:
+            return fallback("division_by_zero")
+
+        result = operations[operation].invoke({"a": a, "b": b})
+        fast_path_stats.record(None)
+        return {"messages": [AIMessage(
+            content=f"The result is {_format(result)}.",
+            response_metadata={FAST_PATH_KEY: result},
+        )]}
+
+    return fast_path
+
+
+def route_after_fast_path(state) -> str:
+    """END when the fast path answered the turn, otherwise the assistant."""
+    last = state["messages"][-1]
+    if isinstance(last, AIMessage) and FAST_PATH_KEY in last.response_metadata:
+        return "__end__"
+    return "assistant"
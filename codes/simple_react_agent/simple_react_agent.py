@@ -5,16 +5,33 @@ The intuition behind ReAct agent architecture is:
 1- act: let the model call specific tool if needed.
 2- observe: pass the output back to the model.
 3- reason: decide what to do next (e.g., call another tool or just respond directly).
+
+By default the model calls one tool per turn and the prebuilt ToolNode runs it. The
+"simple-react-agent-parallel" graph (or `create_builder(parallel_tool_calls=True)`) lets the
+model request several tools in one turn and runs them concurrently, so independent steps
+cost one assistant<->tools round trip instead of one per tool.
+
+The "simple-react-agent-fast-path" graph (or `create_builder(fast_path=True)`) additionally
+answers pure arithmetic requests ("Add 3 and 4", "Multiply the output by 2") in a local
+pre-router node before the assistant is involved (see fast_path.py), and memoizes the pure
+arithmetic tools. Both are off in the default graph.
 """
 # Import libraries
-from langchain_core.tools import tool
-from langchain_google_genai import ChatGoogleGenerativeAI
+from typing import Optional, Sequence
+
+from langchain_core.tools import BaseTool, tool
+from langchain_core.language_models import BaseChatModel
 from langchain_core.messages import SystemMessage, HumanMessage
 from langgraph.prebuilt import ToolNode, tools_condition
 from langgraph.graph import MessagesState, StateGraph, START
-from langgraph.checkpoint.memory import MemorySaver
 
-from codes.config.config import config
+from codes.utils.llm_factory import get_chat_model
+from codes.simple_react_agent.fast_path import fast_path_stats, make_fast_path_node, route_after_fast_path
+from codes.utils.compacting_saver import CompactingSaver
+from codes.utils.parallel_tool_node import ParallelToolNode
+from codes.utils.tool_cache import memoize_tool
+from codes.utils.graph_diagram import render_diagram
+from codes.utils.graph_registry import get_compiled_graph, register_graph
 
 # Create graph state with prebuilt MessageState
 class GraphState(MessagesState):
@@ -53,50 +70,119 @@ def divide(a: int, b: int) -> float:
     return a / b
 
 
-# Create ChatModel and bind tool
-model = ChatGoogleGenerativeAI(model=config.model.model_name, api_key=config.model.api_key)
 tools = [add, multiply, divide]
-model_with_tool = model.bind_tools(tools, parallel_tool_calls=False)
 
+# Tool execution limits
+MAX_TOOL_CONCURRENCY = 8
+TOOL_TIMEOUT = 30.0
 
-# Create Node
-def assistant_node(state: GraphState) -> GraphState:
-    return {
-        "messages": [model_with_tool.invoke(state["messages"])]
-    }
+# Answer pure arithmetic locally instead of calling the model (opt-in)
+ARITHMETIC_FAST_PATH = False
+# Serve repeated calls of the (pure) tools from a cache across steps, turns and threads (opt-in)
+MEMOIZE_TOOLS = False
+FAST_PATH_OPERATIONS = ("add", "multiply", "divide")
 
-# Build Graph
-builder = StateGraph(GraphState)
 
-builder.add_node("assistant", assistant_node)
-builder.add_node("tools", ToolNode(tools))
-
-builder.add_edge(START, "assistant")
-builder.add_conditional_edges(
-    "assistant",
-    # If the latest message (result) from assistant is a tool call -> tools_condition routes to tools
-    # If the latest message (result) from assistant is a not a tool call -> tools_condition routes to END
-    tools_condition
-)
-builder.add_edge("tools", "assistant")
+# Build Graph
+def create_builder(
+        chat_model: Optional[BaseChatModel] = None,
+        graph_tools: Optional[Sequence[BaseTool]] = None,
+        parallel_tool_calls: bool = False,
+        max_concurrency: int = MAX_TOOL_CONCURRENCY,
+        tool_timeout: Optional[float] = TOOL_TIMEOUT,
+        fast_path: bool = ARITHMETIC_FAST_PATH,
+        memoize_tools: bool = MEMOIZE_TOOLS,
+) -> StateGraph:
+    """
+    Build the ReAct graph.
 
-# Create memory and compile
-memory = MemorySaver()
-graph = builder.compile(checkpointer=memory)
+    Args:
+        chat_model: Model driving the agent; defaults to the configured model (created
+            when the graph is built, not at import).
+        graph_tools: Tools offered to the model; defaults to add/multiply/divide.
+        parallel_tool_calls: Let the model request several tools per turn and run them concurrently
+            with ParallelToolNode; by default tools run one at a time in the prebuilt ToolNode.
+        max_concurrency: Maximum tools running at once (parallel mode only).
+        tool_timeout: Seconds a single tool may run before it is reported as failed (parallel mode only).
+        fast_path: Route turns through the local arithmetic fast path before the assistant;
+            ignored unless `graph_tools` has tools named add, multiply and divide.
+        memoize_tools: Wrap every tool with `memoize_tool`; only for tools whose result depends
+            on their arguments alone.
+    """
+    graph_tools = list(graph_tools or tools)
+    if memoize_tools:
+        graph_tools = [memoize_tool(t) for t in graph_tools]
+    model_with_tool = (chat_model or get_chat_model()).bind_tools(graph_tools, parallel_tool_calls=parallel_tool_calls)
+
+    # Create Node
+    def assistant_node(state: GraphState) -> GraphState:
+        return {
+            "messages": [model_with_tool.invoke(state["messages"])]
+        }
+
+    builder = StateGraph(GraphState)
+
+    builder.add_node("assistant", assistant_node)
+    if parallel_tool_calls:
+        builder.add_node("tools", ParallelToolNode(graph_tools, max_concurrency=max_concurrency, timeout=tool_timeout))
+    else:
+        builder.add_node("tools", ToolNode(graph_tools))
+
+    # The fast path answers with the graph's own add/multiply/divide tools, so it is only
+    # available when all three are among them
+    by_name = {t.name.lower(): t for t in graph_tools if isinstance(t, BaseTool)}
+    operations = {name: by_name[name] for name in FAST_PATH_OPERATIONS if name in by_name}
+    if fast_path and len(operations) == len(FAST_PATH_OPERATIONS):
+        builder.add_node("fast_path", make_fast_path_node(operations))
+        builder.add_edge(START, "fast_path")
+        builder.add_conditional_edges("fast_path", route_after_fast_path, ["assistant", "__end__"])
+    else:
+        builder.add_edge(START, "assistant")
+    builder.add_conditional_edges(
+        "assistant",
+        # If the latest message (result) from assistant is a tool call -> tools_condition routes to tools
+        # If the latest message (result) from assistant is a not a tool call -> tools_condition routes to END
+        tools_condition
+    )
+    builder.add_edge("tools", "assistant")
+    return builder
+
+
+@register_graph("simple-react-agent")
+def build_graph() -> StateGraph:
+    return create_builder()
+
+
+@register_graph("simple-react-agent-parallel")
+def build_parallel_graph() -> StateGraph:
+    return create_builder(parallel_tool_calls=True)
+
+
+@register_graph("simple-react-agent-fast-path")
+def build_fast_path_graph() -> StateGraph:
+    return create_builder(fast_path=True, memoize_tools=True)
+
+# Create memory (bounded per thread); the graph is compiled on first use
+memory = CompactingSaver(keep_last=20, idle_ttl=3600)
 
 
 # For Studio
 def get_graph():
-    return graph
+    return get_compiled_graph("simple-react-agent", checkpointer=memory)
+
+
+def __getattr__(name: str):
+    if name == "graph":
+        return get_graph()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Run the Graph
 if __name__ == "__main__":
+    graph = get_graph()
 
     # View the graph diagram
-    graph_image = graph.get_graph().draw_mermaid_png()
-    with open("simple_react_agent.png", "wb") as f:
-        f.write(graph_image)
-    print("Graph saved as graph.png")
+    render_diagram(graph, "simple_react_agent.svg")
+    print("Graph saved as simple_react_agent.svg")
 
     # Specify thread
     config = {"configurable": {"thread_id": "1"}}
@@ -108,9 +194,18 @@ if __name__ == "__main__":
     ]
     result = graph.invoke({"messages": messages}, config=config)
 
-    # Second turn
-    messages.append(HumanMessage(content="Multiply the output by 2."))
-    result2 = graph.invoke({"messages": messages}, config=config)
+    # Second turn: the checkpointer holds the history, so only the new message is sent
+    result2 = graph.invoke({"messages": [HumanMessage(content="Multiply the output by 2.")]}, config=config)
 
     for m in result2['messages']:
         m.pretty_print()
+
+    # Same conversation with the local fast path: both turns are answered without the model,
+    # the second one from the first turn's result
+    fast_graph = get_compiled_graph("simple-react-agent-fast-path", checkpointer=memory)
+    fast_config = {"configurable": {"thread_id": "2"}}
+    fast_graph.invoke({"messages": messages}, config=fast_config)
+    result3 = fast_graph.invoke({"messages": [HumanMessage(content="Multiply the output by 2.")]}, config=fast_config)
+
+    result3['messages'][-1].pretty_print()
+    print(fast_path_stats.snapshot())
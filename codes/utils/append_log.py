@@ -0,0 +1,153 @@
+"""
+Structurally shared, append-only list for accumulating state keys.
+
+`Annotated[list, operator.add]` builds `left + right` on every update: a key that collects
+n items one update at a time copies O(n^2) elements, and a checkpointer serialises a
+fresh full copy of the list at every step.
+
+AppendLog is an immutable list-like view over a shared, growing buffer:
+- Adding to the newest version appends to the shared buffer and returns a longer view,
+  O(len(right)); older versions stay valid because they only see their own prefix.
+  Adding to an older version (a fork, e.g. time travel) copies once and continues on a
+  new buffer.
+- Node code reads it like a list: len, indexing, slicing (returns a list), iteration,
+  `in`, equality with lists, `log + [x]` (an AppendLog) and `[x] + log` (a list).
+  It cannot be mutated in place.
+- It round-trips through LangGraph's serializer, and CompactingSaver stores each
+  checkpoint as a delta of the newly appended items (checked in O(1) via the shared buffer).
+
+It is a Sequence, not a list: `isinstance(value, list)` is False and `json.dumps` rejects
+it (use `list(value)`). The gain is only in the reducer: checkpoints are no smaller than
+CompactingSaver's plain-list deltas, and at the fan-in widths graphs actually run, the
+per-task framework overhead dominates (a Send fan-in graph measured slower with it).
+Use it for keys that collect many thousands of items one update at a time, and keep
+`operator.add` for ordinary list keys.
+
+Usage:
+    from codes.utils.append_log import append_log
+
+    class State(TypedDict):
+        context: Annotated[list[Document], append_log]
+"""
+# Import libraries
+import threading
+from itertools import islice
+from collections.abc import Sequence
+from typing import Any, Iterable, Iterator, Optional, Union
+
+
+class _Buffer:
+    """Items shared by every version of one append-only history."""
+    __slots__ = ("items", "lock")
+
+    def __init__(self, items: list):
+        self.items = items
+        self.lock = threading.Lock()
+
+
+class AppendLog(Sequence):
+    """
+    Immutable prefix view of a shared append-only buffer.
+
+    Args:
+        items: Initial items (copied).
+    """
+    __slots__ = ("_buffer", "_length")
+
+    def __init__(self, items: Iterable[Any] = ()):
+        self._buffer = _Buffer(list(items))
+        self._length = len(self._buffer.items)
+
+    @classmethod
+    def _view(cls, buffer: _Buffer, length: int) -> "AppendLog":
+        log = cls.__new__(cls)
+        log._buffer = buffer
+        log._length = length
+        return log
+
+    @classmethod
+    def of(cls, value: Optional[Iterable[Any]]) -> "AppendLog":
+        """`value` itself if it already is an AppendLog, else a new one holding its items."""
+        if isinstance(value, AppendLog):
+            return value
+        return cls(value or ())
+
+    # Versions
+    def extended(self, items: Iterable[Any]) -> "AppendLog":
+        """A new version with `items` appended; this version is unchanged."""
+        new = list(items)
+        if not new:
+            return self
+        buffer = self._buffer
+        with buffer.lock:
+            if len(buffer.items) == self._length:
+                buffer.items.extend(new)
+                return self._view(buffer, len(buffer.items))
+            prefix = buffer.items[:self._length]
+        # Someone already appended to this version: fork onto a new buffer
+        return AppendLog(prefix + new)
+
+    def extends(self, other: Sequence) -> bool:
+        """True if `other` is a prefix of this version (O(1) when they share a buffer)."""
+        if isinstance(other, AppendLog) and other._buffer is self._buffer:
+            return other._length <= self._length
+        if len(other) > self._length:
+            return False
+        return all(a is b or a == b for a, b in zip(other, self))
+
+    # Sequence protocol
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._length)
+            return self._buffer.items[start:stop:step]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("AppendLog index out of range")
+        return self._buffer.items[index]
+
+    def __iter__(self) -> Iterator[Any]:
+        return islice(self._buffer.items, self._length)
+
+    def __add__(self, other: Iterable[Any]) -> "AppendLog":
+        return self.extended(other)
+
+    def __radd__(self, other: Iterable[Any]) -> list:
+        return list(other) + list(self)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, AppendLog) and other._buffer is self._buffer:
+            return other._length == self._length
+        if not isinstance(other, (list, tuple, AppendLog)) or len(other) != self._length:
+            return False
+        return all(a == b for a, b in zip(self, other))
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"AppendLog({list(self)!r})"
+
+    # Serialisation: LangGraph's serializer stores objects exposing _asdict() as
+    # constructor keyword arguments, so checkpoints restore an AppendLog
+    def _asdict(self) -> dict[str, list]:
+        return {"items": list(self)}
+
+
+def append_log(left: Optional[Iterable[Any]], right: Optional[Iterable[Any]]) -> AppendLog:
+    """
+    Reducer appending `right` to `left` without copying `left`.
+
+    Same result as `operator.add` on list keys, but an AppendLog rather than a list (see
+    the module docstring). None on either side counts as empty, and a single non-list
+    update is appended as one item.
+    """
+    if right is not None and not isinstance(right, (list, tuple, AppendLog)):
+        right = [right]
+    return AppendLog.of(left).extended(right or ())
+
+
+# Public API
+__all__ = ['AppendLog', 'append_log']
@@ -0,0 +1,282 @@
+"""
+Asynchronous execution layer for BaseTool subclasses.
+
+A BaseTool whose `_arun` just calls `_run` blocks the event loop for as long as the tool
+runs, stalling every other coroutine of an async graph (parallel branches, streaming,
+other threads served by the same process). `OffloadedTool` gives such tools a real
+`_arun` driven by what the tool declares:
+
+- `execution`: "thread" (blocking I/O, the default) or "process" (CPU-bound work, the
+  tool must be picklable) run `_run` on a shared, bounded pool; "inline" keeps it on the
+  loop for work that is cheaper than a hand-off, and records it as blocking time.
+- `max_concurrency`: at most this many calls of the tool run at once per event loop;
+  further calls wait for a slot without holding a pool worker.
+- `timeout`: seconds a call may run. On timeout the call is cancelled and reported to
+  the model as an error (ToolException). Queued calls never start; a running thread
+  cannot be interrupted, but `_run` can poll `self.cancelled()` to stop early.
+- `stats()`: calls, timeouts, peak concurrency, queueing, run and blocking time.
+
+`LoopMonitor` measures event-loop responsiveness while a graph runs: a heartbeat task
+records how late it wakes up (lag), the total blocked time and each stall above a
+threshold, attributed to the inline tool runs that overlap it.
+
+The sync path (`invoke` / `_run`) is unchanged.
+
+Usage:
+    class SearchFilesTool(OffloadedTool):
+        name: str = "search_files"
+        ...
+        execution: Execution = "thread"
+        max_concurrency: int = 4
+        timeout: Optional[float] = 10.0
+
+        def _run(self, query: str, run_manager=None) -> str: ...
+
+    async with LoopMonitor() as monitor:
+        await graph.ainvoke(...)
+    print(monitor.stats())
+"""
+# Import libraries
+import os
+import time
+import atexit
+import asyncio
+import threading
+import functools
+import contextvars
+from collections import deque
+from weakref import WeakKeyDictionary
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Literal, Optional
+
+from pydantic import PrivateAttr
+from langchain_core.tools import BaseTool, ToolException
+from langchain_core.callbacks import AsyncCallbackManagerForToolRun
+
+Execution = Literal["thread", "process", "inline"]
+
+# Shared pools, created on first use
+THREAD_WORKERS = 32
+PROCESS_WORKERS = os.cpu_count() or 2
+
+_pools: dict[str, Executor] = {}
+_pools_lock = threading.Lock()
+
+# Recent inline runs (name, start, end) for attributing loop stalls
+_inline_runs: deque = deque(maxlen=1024)
+
+# Cancellation flag of the call running on the current worker thread
+_cancel_event: contextvars.ContextVar[Optional[threading.Event]] = contextvars.ContextVar(
+    "tool_cancel_event", default=None
+)
+
+
+def get_executor(execution: Execution) -> Executor:
+    """Process-wide bounded pool for thread or process execution."""
+    pool = _pools.get(execution)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(execution)
+            if pool is None:
+                if execution == "process":
+                    pool = ProcessPoolExecutor(PROCESS_WORKERS)
+                else:
+                    pool = ThreadPoolExecutor(THREAD_WORKERS, thread_name_prefix="tool-io")
+                _pools[execution] = pool
+    return pool
+
+
+@atexit.register
+def shutdown_executors() -> None:
+    """Stop the shared pools (queued calls are dropped)."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _run_with_event(event: threading.Event, fn: functools.partial) -> Any:
+    _cancel_event.set(event)
+    return fn()
+
+
+class OffloadedTool(BaseTool):
+    """
+    BaseTool whose async calls run `_run` off the event loop, within declared limits.
+
+    Attributes:
+        execution: "thread", "process" or "inline" (see module docstring).
+        max_concurrency: Concurrent calls per event loop.
+        timeout: Seconds a call may run; None for no limit.
+    """
+
+    execution: Execution = "thread"
+    max_concurrency: int = 4
+    timeout: Optional[float] = None
+    handle_tool_error: bool = True
+
+    _semaphores: WeakKeyDictionary = PrivateAttr(default_factory=WeakKeyDictionary)
+    _stats_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _in_flight: int = PrivateAttr(default=0)
+    _calls: int = PrivateAttr(default=0)
+    _timeouts: int = PrivateAttr(default=0)
+    _max_in_flight: int = PrivateAttr(default=0)
+    _wait_s: float = PrivateAttr(default=0.0)
+    _run_s: float = PrivateAttr(default=0.0)
+    _blocking_s: float = PrivateAttr(default=0.0)
+
+    def __getstate__(self) -> dict[str, Any]:
+        # Process execution pickles the tool; locks and per-loop semaphores stay behind
+        state = super().__getstate__()
+        state["__pydantic_private__"] = None
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        super().__setstate__(state)
+        self.__pydantic_private__ = None
+        self.model_post_init(None)
+
+    # Cancellation
+    def cancelled(self) -> bool:
+        """True inside `_run` once the current call timed out (thread execution only)."""
+        event = _cancel_event.get()
+        return event is not None and event.is_set()
+
+    # Limits
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+    def _enter(self, waited: float) -> None:
+        with self._stats_lock:
+            self._calls += 1
+            self._in_flight += 1
+            self._max_in_flight = max(self._max_in_flight, self._in_flight)
+            self._wait_s += waited
+
+    def _exit(self, elapsed: float, blocking: bool) -> None:
+        with self._stats_lock:
+            self._in_flight -= 1
+            self._run_s += elapsed
+            if blocking:
+                self._blocking_s += elapsed
+
+    # Execution
+    async def _execute(self, kwargs: dict[str, Any], run_manager: Optional[AsyncCallbackManagerForToolRun]) -> Any:
+        if self.execution == "inline":
+            start = time.perf_counter()
+            try:
+                return self._run(**kwargs, run_manager=run_manager.get_sync() if run_manager else None)
+            finally:
+                _inline_runs.append((self.name, start, time.perf_counter()))
+
+        loop = asyncio.get_running_loop()
+        if self.execution == "process":
+            return await loop.run_in_executor(get_executor("process"), functools.partial(self._run, **kwargs))
+
+        event = threading.Event()
+        call = functools.partial(self._run, **kwargs, run_manager=run_manager.get_sync() if run_manager else None)
+        context = contextvars.copy_context()
+        future = loop.run_in_executor(get_executor("thread"), context.run, _run_with_event, event, call)
+        try:
+            return await future
+        except asyncio.CancelledError:
+            event.set()
+            raise
+
+    async def _arun(
+            self,
+            *args: Any,
+            run_manager: Optional[AsyncCallbackManagerForToolRun] = None,
+            **kwargs: Any,
+    ) -> Any:
+        queued = time.perf_counter()
+        async with self._semaphore():
+            start = time.perf_counter()
+            self._enter(start - queued)
+            try:
+                return await asyncio.wait_for(self._execute(kwargs, run_manager), self.timeout)
+            except asyncio.TimeoutError:
+                with self._stats_lock:
+                    self._timeouts += 1
+                raise ToolException(f"Error: {self.name} timed out after {self.timeout:g}s") from None
+            finally:
+                self._exit(time.perf_counter() - start, blocking=self.execution == "inline")
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "execution": self.execution,
+            "calls": self._calls,
+            "timeouts": self._timeouts,
+            "max_in_flight": self._max_in_flight,
+            "max_concurrency": self.max_concurrency,
+            "wait_s": round(self._wait_s, 4),
+            "run_s": round(self._run_s, 4),
+            "blocking_s": round(self._blocking_s, 4),
+        }
+
+
+class LoopMonitor:
+    """
+    Heartbeat measuring how long the running event loop is blocked.
+
+    Args:
+        interval: Seconds between heartbeats.
+        threshold: Lag (seconds) counted as a stall and kept in `stalls`.
+    """
+
+    def __init__(self, interval: float = 0.01, threshold: float = 0.05):
+        self.interval = interval
+        self.threshold = threshold
+        self.beats = 0
+        self.blocked_s = 0.0
+        self.max_lag_s = 0.0
+        self.stalls: list[dict[str, Any]] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _heartbeat(self) -> None:
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.perf_counter()
+            lag = max(0.0, now - expected)
+            self.beats += 1
+            self.blocked_s += lag
+            self.max_lag_s = max(self.max_lag_s, lag)
+            if lag >= self.threshold:
+                started = expected - self.interval
+                suspects = sorted({name for name, start, end in list(_inline_runs) if start < now and end > started})
+                self.stalls.append({"lag_s": round(lag, 4), "tools": suspects})
+
+    async def __aenter__(self) -> "LoopMonitor":
+        self._task = asyncio.create_task(self._heartbeat())
+        await asyncio.sleep(0)
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    def stats(self) -> dict[str, Any]:
+        offenders: dict[str, int] = {}
+        for stall in self.stalls:
+            for name in stall["tools"] or ["unknown"]:
+                offenders[name] = offenders.get(name, 0) + 1
+        return {
+            "beats": self.beats,
+            "blocked_s": round(self.blocked_s, 4),
+            "max_lag_s": round(self.max_lag_s, 4),
+            "stalls": len(self.stalls),
+            "offenders": offenders,
+        }
+
+
+# Public API
+__all__ = ['Execution', 'LoopMonitor', 'OffloadedTool', 'get_executor', 'shutdown_executors']
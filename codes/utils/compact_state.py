@@ -0,0 +1,152 @@
+"""
+Compact graph state schemas with validation at the graph boundary.
+
+A Pydantic BaseModel state is validated every time LangGraph builds a node's input, so
+large states (lists of records) pay for validation on every super-step. TypedDicts and
+plain dataclasses skip validation entirely and keep a per-instance __dict__.
+
+- `compact_state`: turns an annotated class into a `__slots__` dataclass: no per-instance
+  __dict__, attribute access, reducers via Annotated as usual. Also usable for the
+  records nested in the state.
+- `StateValidator`: Pydantic validation for such a schema, run where it matters:
+  `validate_input` / `validate_output` at the graph boundary (`wrap(graph)` does both),
+  and optionally `sampled(node)` to check a fraction of node updates during development.
+
+Usage:
+    @compact_state
+    class State:
+        topic: str
+        analysts: Annotated[list[Analyst], operator.add] = field(default_factory=list)
+
+    validator = StateValidator(State, sample_rate=0.05)
+    builder = StateGraph(State)
+    builder.add_node("plan", validator.sampled(plan))
+    graph = validator.wrap(builder.compile())
+    graph.invoke({"topic": "LLM inference"})       # input and output validated once
+"""
+# Import libraries
+import random
+import inspect
+import functools
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Optional, get_type_hints
+
+from pydantic import TypeAdapter, ValidationError
+
+
+def compact_state(cls: Optional[type] = None, **dataclass_kwargs: Any):
+    """Decorator making `cls` a slots dataclass; usable as `@compact_state` or `@compact_state(frozen=True)`."""
+
+    def wrap(inner: type) -> type:
+        return dataclass(inner, slots=True, **dataclass_kwargs)
+
+    return wrap(cls) if cls is not None else wrap
+
+
+class StateValidator:
+    """
+    Boundary and sampled validation for a state schema.
+
+    Args:
+        schema: State class (a compact_state / dataclass, TypedDict or BaseModel).
+        sample_rate: Fraction of node updates validated by `sampled` nodes (0 disables).
+        seed: Seed for the sampling random generator.
+    """
+
+    def __init__(self, schema: type, sample_rate: float = 0.0, seed: Optional[int] = None):
+        self.schema = schema
+        self.sample_rate = sample_rate
+        self._adapter = TypeAdapter(schema)
+        self._fields = {name: TypeAdapter(hint) for name, hint in get_type_hints(schema).items()}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.input_checks = 0
+        self.output_checks = 0
+        self.sampled_checks = 0
+
+    # Validation
+    def validate_input(self, values: Any) -> Any:
+        """Validate a whole graph input and return it as a schema instance."""
+        self.input_checks += 1
+        if isinstance(values, self.schema):
+            values = {name: getattr(values, name) for name in self._fields if hasattr(values, name)}
+        return self._adapter.validate_python(values)
+
+    def validate_update(self, values: dict[str, Any]) -> dict[str, Any]:
+        """Validate the keys present in a partial state (a node update or a graph output)."""
+        unknown = set(values) - set(self._fields)
+        if unknown:
+            raise ValueError(f"{self.schema.__name__} has no fields {sorted(unknown)}")
+        return {name: self._fields[name].validate_python(value) for name, value in values.items()}
+
+    def validate_output(self, values: dict[str, Any]) -> dict[str, Any]:
+        """Validate a graph output; returned unchanged so callers see LangGraph's own value."""
+        self.output_checks += 1
+        self.validate_update(values)
+        return values
+
+    # Integration
+    def _should_sample(self) -> bool:
+        if self.sample_rate <= 0:
+            return False
+        with self._lock:
+            return self._random.random() < self.sample_rate
+
+    def _check(self, update: Any):
+        if isinstance(update, dict) and self._should_sample():
+            self.sampled_checks += 1
+            self.validate_update(update)
+
+    def sampled(self, node: Callable) -> Callable:
+        """Wrap a node so a `sample_rate` fraction of its updates is validated."""
+        if inspect.iscoroutinefunction(node):
+            @functools.wraps(node)
+            async def anode(*args, **kwargs):
+                update = await node(*args, **kwargs)
+                self._check(update)
+                return update
+
+            return anode
+
+        @functools.wraps(node)
+        def wrapped(*args, **kwargs):
+            update = node(*args, **kwargs)
+            self._check(update)
+            return update
+
+        return wrapped
+
+    def wrap(self, graph: Any) -> "ValidatedGraph":
+        """Compiled graph whose invoke/ainvoke validate the input and output once."""
+        return ValidatedGraph(graph, self)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "input_checks": self.input_checks,
+            "output_checks": self.output_checks,
+            "sampled_checks": self.sampled_checks,
+        }
+
+
+class ValidatedGraph:
+    """Compiled graph with input/output validation; other attributes pass through."""
+
+    def __init__(self, graph: Any, validator: StateValidator):
+        self.graph = graph
+        self.validator = validator
+
+    def invoke(self, input: Any, config: Optional[dict] = None, **kwargs: Any) -> Any:
+        output = self.graph.invoke(self.validator.validate_input(input), config, **kwargs)
+        return self.validator.validate_output(output) if isinstance(output, dict) else output
+
+    async def ainvoke(self, input: Any, config: Optional[dict] = None, **kwargs: Any) -> Any:
+        output = await self.graph.ainvoke(self.validator.validate_input(input), config, **kwargs)
+        return self.validator.validate_output(output) if isinstance(output, dict) else output
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.graph, name)
+
+
+# Public API
+__all__ = ['StateValidator', 'ValidatedGraph', 'ValidationError', 'compact_state']
@@ -0,0 +1,306 @@
+"""
+Bounded, compacting checkpointer for long-running threads.
+
+InMemorySaver keeps every checkpoint of every thread forever, and because the messages
+channel changes on every step it stores a fresh full copy of the history each time, so
+memory grows with turns^2 x threads. CompactingSaver is a drop-in replacement that adds:
+
+1. Deltas: list channels (e.g. `messages`, or AppendLog keys) that only grew since the
+   previous write are stored as "previous version + appended items". A full snapshot is written every
+   `snapshot_every` deltas to keep read chains short.
+2. Retention: keep the last `keep_last` checkpoints per thread, drop checkpoints older than
+   `max_age` seconds, and evict threads idle for longer than `idle_ttl` seconds.
+   The latest checkpoint of a thread is never dropped by keep_last/max_age.
+3. Compaction: when old checkpoints are dropped, retained deltas whose base disappeared are
+   materialised first, so time travel to any retained checkpoint keeps working.
+4. Reporting: `memory_report()` returns serialized bytes per thread for capacity planning.
+
+Usage:
+    from codes.utils.compacting_saver import CompactingSaver
+
+    memory = CompactingSaver(keep_last=20, idle_ttl=3600)
+    graph = builder.compile(checkpointer=memory)
+"""
+# Import libraries
+import time
+import threading
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import ChannelVersions, Checkpoint, CheckpointMetadata, CheckpointTuple
+from langgraph.checkpoint.memory import InMemorySaver
+
+from codes.utils.append_log import AppendLog
+
+_MISSING = object()
+
+
+@dataclass
+class _LastWrite:
+    """Most recent value written for one channel of one thread, used as the delta base."""
+    version: Any
+    items: Optional[list]
+    depth: int
+
+
+def _extends(old: list, new: list) -> bool:
+    """True if `new` starts with every item of `old` (identity first, then equality)."""
+    if isinstance(new, AppendLog):
+        return new.extends(old)
+    if len(new) < len(old):
+        return False
+    return all(a is b or a == b for a, b in zip(old, new))
+
+
+class CompactingSaver(InMemorySaver):
+    """
+    InMemorySaver with delta-encoded list channels and retention policies.
+
+    Args:
+        keep_last: Checkpoints kept per (thread, namespace); None keeps all.
+        max_age: Seconds after which a checkpoint is dropped; None disables.
+        idle_ttl: Seconds without reads or writes after which a whole thread is evicted.
+        snapshot_every: Write a full copy of a list channel after this many deltas.
+        compact_batch: Let this many extra checkpoints accumulate before compacting, so the
+            cost of materialising a base is paid once per batch instead of once per step.
+        sweep_interval: Minimum seconds between age/idle sweeps triggered by writes.
+    """
+
+    def __init__(
+            self,
+            *,
+            keep_last: Optional[int] = None,
+            max_age: Optional[float] = None,
+            idle_ttl: Optional[float] = None,
+            snapshot_every: int = 32,
+            compact_batch: int = 1,
+            sweep_interval: float = 30.0,
+            **kwargs: Any,
+    ):
+        super().__init__(**kwargs)
+        if keep_last is not None and keep_last < 1:
+            raise ValueError("keep_last must be at least 1")
+        self.keep_last = keep_last
+        self.max_age = max_age
+        self.idle_ttl = idle_ttl
+        self.snapshot_every = snapshot_every
+        self.compact_batch = max(1, compact_batch)
+        self.sweep_interval = sweep_interval
+
+        self._lock = threading.RLock()
+        # (thread, ns, channel) -> last write; (thread, ns) -> channel -> versions in write order
+        self._last: dict[tuple, _LastWrite] = {}
+        self._blob_order: dict[tuple, dict[str, list]] = {}
+        # (thread, ns, checkpoint id) -> channel versions / wall-clock creation time
+        self._versions: dict[tuple, ChannelVersions] = {}
+        self._created: dict[tuple, float] = {}
+        self._touched: dict[str, float] = {}
+        self._last_sweep = time.monotonic()
+        self.compactions = 0
+        self.evicted_threads = 0
+
+    # Blob encoding
+    def _encode(self, thread_id: str, ns: str, channel: str, version: Any, values: dict) -> tuple:
+        key = (thread_id, ns, channel)
+        self._blob_order.setdefault((thread_id, ns), {}).setdefault(channel, []).append(version)
+        if channel not in values:
+            self._last.pop(key, None)
+            return ("empty", b"")
+
+        value = values[channel]
+        last = self._last.get(key)
+        if (
+                isinstance(value, (list, AppendLog))
+                and last is not None
+                and last.items is not None
+                and last.depth < self.snapshot_every
+                and (thread_id, ns, channel, last.version) in self.blobs
+                and _extends(last.items, value)
+        ):
+            blob = ("delta", last.version, self.serde.dumps_typed(value[len(last.items):]))
+            depth = last.depth + 1
+        else:
+            blob = self.serde.dumps_typed(value)
+            depth = 0
+        # An AppendLog is an immutable view, so it can be kept as the next delta base as is
+        if isinstance(value, AppendLog):
+            items = value
+        else:
+            items = list(value) if isinstance(value, list) else None
+        self._last[key] = _LastWrite(version, items, depth)
+        return blob
+
+    def _load_value(self, thread_id: str, ns: str, channel: str, version: Any) -> Any:
+        deltas = []
+        blob = self.blobs.get((thread_id, ns, channel, version))
+        while blob is not None and blob[0] == "delta":
+            deltas.append(blob[2])
+            blob = self.blobs.get((thread_id, ns, channel, blob[1]))
+        if blob is None:
+            if deltas:
+                raise KeyError(f"Broken delta chain for {channel!r} in thread {thread_id!r}")
+            return _MISSING
+        if blob[0] == "empty":
+            return _MISSING
+
+        value = self.serde.loads_typed(blob)
+        if deltas:
+            appended = []
+            for delta in reversed(deltas):
+                appended.extend(self.serde.loads_typed(delta))
+            value = value.extended(appended) if isinstance(value, AppendLog) else list(value) + appended
+        return value
+
+    def _load_blobs(self, thread_id: str, checkpoint_ns: str, versions: ChannelVersions) -> dict[str, Any]:
+        channel_values = {}
+        for channel, version in versions.items():
+            value = self._load_value(thread_id, checkpoint_ns, channel, version)
+            if value is not _MISSING:
+                channel_values[channel] = value
+        return channel_values
+
+    # Saver API
+    def put(
+            self,
+            config: RunnableConfig,
+            checkpoint: Checkpoint,
+            metadata: CheckpointMetadata,
+            new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        ns = config["configurable"]["checkpoint_ns"]
+        values = checkpoint["channel_values"]
+        with self._lock:
+            for channel, version in new_versions.items():
+                self.blobs[(thread_id, ns, channel, version)] = self._encode(
+                    thread_id, ns, channel, version, values
+                )
+            # Blobs are written above; the parent only stores the checkpoint itself
+            result = super().put(config, checkpoint, metadata, {})
+
+            key = (thread_id, ns, checkpoint["id"])
+            self._versions[key] = dict(checkpoint["channel_versions"])
+            self._created[key] = time.time()
+            self._touched[thread_id] = time.monotonic()
+
+            self._enforce_retention(thread_id, ns)
+            if time.monotonic() - self._last_sweep >= self.sweep_interval:
+                self.sweep()
+        return result
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        with self._lock:
+            self._touched[config["configurable"]["thread_id"]] = time.monotonic()
+            return super().get_tuple(config)
+
+    def list(self, config: Optional[RunnableConfig], **kwargs: Any):
+        with self._lock:
+            if config:
+                self._touched[config["configurable"]["thread_id"]] = time.monotonic()
+            return iter(list(super().list(config, **kwargs)))
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            super().delete_thread(thread_id)
+            for index in (self._last, self._blob_order, self._versions, self._created):
+                for key in [k for k in index if k[0] == thread_id]:
+                    del index[key]
+            self._touched.pop(thread_id, None)
+
+    # Retention and compaction
+    def _enforce_retention(self, thread_id: str, ns: str):
+        checkpoints = self.storage[thread_id][ns]
+        over_limit = self.keep_last is not None and len(checkpoints) >= self.keep_last + self.compact_batch
+        if not over_limit and self.max_age is None:
+            return
+
+        ids = sorted(checkpoints)
+        drop = set(ids[:-self.keep_last]) if over_limit else set()
+        if self.max_age is not None:
+            cutoff = time.time() - self.max_age
+            drop.update(cid for cid in ids[:-1] if self._created.get((thread_id, ns, cid), 0) < cutoff)
+        if drop:
+            self._drop_checkpoints(thread_id, ns, drop)
+
+    def _drop_checkpoints(self, thread_id: str, ns: str, checkpoint_ids: set):
+        checkpoints = self.storage[thread_id][ns]
+        for cid in checkpoint_ids:
+            checkpoints.pop(cid, None)
+            self.writes.pop((thread_id, ns, cid), None)
+            self._versions.pop((thread_id, ns, cid), None)
+            self._created.pop((thread_id, ns, cid), None)
+
+        # Versions still referenced by a retained checkpoint, per channel
+        live: dict[str, set] = {}
+        for cid in checkpoints:
+            for channel, version in self._versions.get((thread_id, ns, cid), {}).items():
+                live.setdefault(channel, set()).add(version)
+
+        channels = self._blob_order.get((thread_id, ns), {})
+        for channel, order in channels.items():
+            keep = live.get(channel, set())
+            # Materialise retained deltas whose base is about to disappear (write order matters)
+            for version in order:
+                key = (thread_id, ns, channel, version)
+                blob = self.blobs.get(key)
+                if version in keep and blob is not None and blob[0] == "delta" and blob[1] not in keep:
+                    self.blobs[key] = self.serde.dumps_typed(self._load_value(*key))
+            for version in order:
+                if version not in keep:
+                    self.blobs.pop((thread_id, ns, channel, version), None)
+            channels[channel] = [v for v in order if v in keep]
+        self.compactions += 1
+
+    def sweep(self) -> None:
+        """Apply max_age and idle_ttl to every thread now."""
+        with self._lock:
+            now = time.monotonic()
+            self._last_sweep = now
+            if self.idle_ttl is not None:
+                for thread_id, touched in list(self._touched.items()):
+                    if now - touched > self.idle_ttl:
+                        self.delete_thread(thread_id)
+                        self.evicted_threads += 1
+            if self.max_age is not None:
+                for thread_id in list(self.storage):
+                    for ns in list(self.storage[thread_id]):
+                        self._enforce_retention(thread_id, ns)
+
+    # Reporting
+    def memory_report(self) -> dict[str, Any]:
+        """Serialized bytes held per thread (checkpoints, channel blobs, pending writes)."""
+        with self._lock:
+            threads: dict[str, dict[str, int]] = {}
+
+            def row(thread_id):
+                return threads.setdefault(thread_id, {
+                    "checkpoints": 0, "checkpoint_bytes": 0, "blob_bytes": 0, "write_bytes": 0,
+                })
+
+            for thread_id, namespaces in self.storage.items():
+                for checkpoints in namespaces.values():
+                    r = row(thread_id)
+                    r["checkpoints"] += len(checkpoints)
+                    for checkpoint, metadata, _ in checkpoints.values():
+                        r["checkpoint_bytes"] += len(checkpoint[1]) + len(metadata[1])
+            for (thread_id, *_), blob in self.blobs.items():
+                row(thread_id)["blob_bytes"] += len(blob[2][1]) if blob[0] == "delta" else len(blob[1])
+            for (thread_id, *_), writes in self.writes.items():
+                row(thread_id)["write_bytes"] += sum(len(w[2][1]) for w in writes.values())
+
+            for r in threads.values():
+                r["total_bytes"] = r["checkpoint_bytes"] + r["blob_bytes"] + r["write_bytes"]
+            total = sum(r["total_bytes"] for r in threads.values())
+            return {
+                "threads": threads,
+                "thread_count": len(threads),
+                "total_bytes": total,
+                "mean_bytes_per_thread": total // len(threads) if threads else 0,
+                "compactions": self.compactions,
+                "evicted_threads": self.evicted_threads,
+            }
+
+
+# Public API
+__all__ = ['CompactingSaver']
@@ -0,0 +1,178 @@
+"""
+Offline stand-ins for provider chat models.
+
+LocalChatModel behaves like a real chat model (invoke/ainvoke/stream/astream, bind_tools)
+without touching the network, so graphs can be exercised and benchmarked offline.
+It is what the LLM factory hands out when `MODEL__PROVIDER=local`.
+
+Usage:
+    from codes.utils.fake_models import LocalChatModel
+
+    llm = LocalChatModel(responses=["Hello!"], latency=0.2, token_latency=0.01)
+    llm.invoke("Hi")  # AIMessage(content="Hello!") after ~200 ms
+"""
+# Import libraries
+import re
+import json
+import zlib
+import time
+import asyncio
+import threading
+from typing import Any, Callable, Iterator, AsyncIterator, Optional, Sequence, Union
+
+from pydantic import Field, PrivateAttr
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+
+
+class LocalChatModel(BaseChatModel):
+    """
+    Scripted, latency-configurable chat model that never leaves the process.
+
+    Attributes:
+        model_name: Name reported in traces (mirrors the configured model).
+        responses: Scripted responses cycled in order; strings become AIMessages.
+        responder: Optional callable building the response from the input messages.
+            Takes precedence over `responses`.
+        latency: Seconds to wait before the first token (simulated time-to-first-token).
+        token_latency: Seconds to wait between streamed tokens.
+
+    With neither `responses` nor `responder`, the model echoes the last human message.
+    """
+    model_name: str = "local"
+    responses: list[Union[str, BaseMessage]] = Field(default_factory=list)
+    responder: Optional[Callable[[list[BaseMessage]], Union[str, BaseMessage]]] = None
+    latency: float = 0.0
+    token_latency: float = 0.0
+
+    _calls: int = PrivateAttr(default=0)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    @property
+    def _llm_type(self) -> str:
+        return "local-chat-model"
+
+    @property
+    def _identifying_params(self) -> dict[str, Any]:
+        return {"model_name": self.model_name}
+
+    @property
+    def calls(self) -> int:
+        """Number of completed model calls."""
+        return self._calls
+
+    def get_token_ids(self, text: str) -> list[int]:
+        """Approximate tokenizer (words and punctuation), so token counting works offline."""
+        return [zlib.crc32(token.encode()) & 0xFFFF for token in re.findall(r"\w+|[^\w\s]", text)]
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any):
+        """Accept tools like a provider model; scripted responses decide whether to call them."""
+        return self.bind(tools=[convert_to_openai_tool(t) for t in tools], **kwargs)
+
+    # Response selection
+    def _next_message(self, messages: list[BaseMessage]) -> AIMessage:
+        with self._lock:
+            index = self._calls
+            self._calls += 1
+
+        if self.responder is not None:
+            response = self.responder(messages)
+        elif self.responses:
+            response = self.responses[index % len(self.responses)]
+        else:
+            last_human = next((m for m in reversed(messages) if isinstance(m, HumanMessage)), None)
+            response = last_human.content if last_human else ""
+
+        if isinstance(response, str):
+            return AIMessage(content=response)
+        return AIMessage(**response.model_dump(exclude={"type"}))
+
+    @staticmethod
+    def _tokens(message: AIMessage) -> list[str]:
+        """Split content into whitespace-preserving tokens for streaming."""
+        if not isinstance(message.content, str) or not message.content:
+            return []
+        return [t for t in re.split(r"(\s+)", message.content) if t]
+
+    @staticmethod
+    def _tool_chunk(message: AIMessage) -> Optional[AIMessageChunk]:
+        if not message.tool_calls:
+            return None
+        return AIMessageChunk(
+            content="",
+            tool_call_chunks=[
+                {"name": c["name"], "args": json.dumps(c["args"]), "id": c["id"], "index": i}
+                for i, c in enumerate(message.tool_calls)
+            ],
+        )
+
+    # Sync paths
+    def _generate(
+            self,
+            messages: list[BaseMessage],
+            stop: Optional[list[str]] = None,
+            run_manager: Optional[CallbackManagerForLLMRun] = None,
+            **kwargs: Any,
+    ) -> ChatResult:
+        if self.latency:
+            time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._next_message(messages))])
+
+    def _stream(
+            self,
+            messages: list[BaseMessage],
+            stop: Optional[list[str]] = None,
+            run_manager: Optional[CallbackManagerForLLMRun] = None,
+            **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        if self.latency:
+            time.sleep(self.latency)
+        message = self._next_message(messages)
+        for i, token in enumerate(self._tokens(message)):
+            if i and self.token_latency:
+                time.sleep(self.token_latency)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token, id=message.id))
+            if run_manager:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+        if tool_chunk := self._tool_chunk(message):
+            yield ChatGenerationChunk(message=tool_chunk)
+
+    # Async paths
+    async def _agenerate(
+            self,
+            messages: list[BaseMessage],
+            stop: Optional[list[str]] = None,
+            run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+            **kwargs: Any,
+    ) -> ChatResult:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._next_message(messages))])
+
+    async def _astream(
+            self,
+            messages: list[BaseMessage],
+            stop: Optional[list[str]] = None,
+            run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+            **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        message = self._next_message(messages)
+        for i, token in enumerate(self._tokens(message)):
+            if i and self.token_latency:
+                await asyncio.sleep(self.token_latency)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token, id=message.id))
+            if run_manager:
+                await run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+        if tool_chunk := self._tool_chunk(message):
+            yield ChatGenerationChunk(message=tool_chunk)
+
@@ -0,0 +1,351 @@
+"""
+Sandboxed file backend for file-manager tools.
+
+All paths are resolved inside one root directory (symlinks included), and only files
+with an allowed extension can be read, written or deleted. Results handed back to the
+model are capped at a token budget (estimated as 4 characters per token).
+
+- Reads go through mmap, by byte range (`offset`, `length`) or line range (`start_line`,
+  `num_lines`), so a slice of a 1 GB log costs the slice, not the file. Line positions
+  are found by counting newlines chunk by chunk; line starts found on the way and at page
+  ends are remembered per file version (size + mtime), so paging on does not rescan.
+- Writes stream chunks into a temporary file next to the target, fsync it and rename it
+  over the target: readers see the old or the new file, never a partial one.
+- Directory listings are cached and reused while the directory's mtime is unchanged.
+
+Usage:
+    sandbox = FileSandbox("/srv/agent-files", max_tokens=2000)
+    page = sandbox.read("logs/app.txt", start_line=1_000_000, num_lines=50)
+    page.text, page.next_line          # continue from next_line
+    sandbox.write("notes/summary.md", chunks_of_text)
+"""
+# Import libraries
+import os
+import mmap
+import bisect
+import secrets
+import threading
+from pathlib import Path
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Iterable, Optional, Union
+
+ALLOWED_EXTENSIONS = ('.txt', '.md', '.json', '.csv')
+CHARS_PER_TOKEN = 4
+SCAN_CHUNK = 4 * 1024 * 1024  # bytes scanned at a time when seeking to a line
+NEAR_LINES = 64  # lines walked one by one from a known position instead of scanning a chunk
+
+# Temporary files are opened 0666 so the process umask applies as for a plain open();
+# the umask itself is never read or changed (that would race with other threads)
+_NEW_FILE_MODE = 0o666
+_TEMPORARY_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+
+
+class SandboxError(ValueError):
+    """Raised for paths outside the sandbox or with a disallowed extension."""
+
+
+def _create_temporary(path: Path) -> tuple[int, str]:
+    """Create and open a uniquely named temporary file next to `path`."""
+    while True:
+        temporary = str(path.parent / f".{path.name}.{secrets.token_hex(4)}.tmp")
+        try:
+            return os.open(temporary, _TEMPORARY_FLAGS, _NEW_FILE_MODE), temporary
+        except FileExistsError:
+            continue
+
+
+@dataclass
+class Page:
+    """
+    A slice of a file.
+
+    Attributes:
+        text: Decoded content (invalid UTF-8 replaced).
+        start: Byte offset of the slice.
+        end: Byte offset just after the slice.
+        size: File size in bytes.
+        truncated: True if the token budget cut the requested range short.
+        start_line: First line of the slice (line reads only, 0-based).
+        next_line: Line to continue from (line reads only), None at end of file.
+    """
+    text: str
+    start: int
+    end: int
+    size: int
+    truncated: bool = False
+    start_line: Optional[int] = None
+    next_line: Optional[int] = None
+
+    @property
+    def at_end(self) -> bool:
+        return self.end >= self.size
+
+
+@dataclass
+class Entry:
+    """One item of a directory listing."""
+    name: str
+    is_dir: bool
+    size: int
+
+
+class FileSandbox:
+    """
+    File operations confined to `root`.
+
+    Args:
+        root: Sandbox directory (created if missing).
+        allowed_extensions: File extensions that may be read, written and deleted.
+        max_tokens: Budget for one result (read page or listing).
+        max_cached_files: Files whose line checkpoints are remembered.
+    """
+
+    def __init__(
+            self,
+            root: Union[str, Path],
+            allowed_extensions: Iterable[str] = ALLOWED_EXTENSIONS,
+            max_tokens: int = 2000,
+            max_cached_files: int = 64,
+    ):
+        self.root = Path(root).resolve()
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.allowed_extensions = tuple(allowed_extensions)
+        self.max_tokens = max_tokens
+        self.max_cached_files = max_cached_files
+        self._lock = threading.Lock()
+        # (path, size, mtime_ns) -> sorted [(byte offset, line starting there)] seen so far
+        self._line_checkpoints: OrderedDict[tuple, list[tuple[int, int]]] = OrderedDict()
+        # directory -> (mtime_ns, entries)
+        self._listings: dict[Path, tuple[int, list[Entry]]] = {}
+
+    @property
+    def max_bytes(self) -> int:
+        return self.max_tokens * CHARS_PER_TOKEN
+
+    # Paths
+    def resolve(self, name: str, *, check_extension: bool = True) -> Path:
+        """Absolute path of `name` inside the sandbox, or SandboxError."""
+        path = (self.root / name).resolve()
+        if path != self.root and self.root not in path.parents:
+            raise SandboxError(f"{name} is outside the sandbox")
+        if check_extension and not path.name.endswith(self.allowed_extensions):
+            raise SandboxError(f"File type not allowed. Use: {', '.join(self.allowed_extensions)}")
+        return path
+
+    # Reads
+    def read(
+            self,
+            name: str,
+            *,
+            offset: int = 0,
+            length: Optional[int] = None,
+            start_line: Optional[int] = None,
+            num_lines: Optional[int] = None,
+    ) -> Page:
+        """
+        Read a byte range, or a line range if `start_line` or `num_lines` is given.
+
+        Args:
+            name: File path relative to the root.
+            offset: First byte (byte reads).
+            length: Bytes to read; defaults to the token budget.
+            start_line: First line, 0-based (line reads).
+            num_lines: Lines to read; defaults to as many as fit the token budget.
+
+        Returns:
+            The Page read, capped at the token budget.
+        """
+        path = self.resolve(name)
+        with open(path, "rb") as file:
+            stat = os.fstat(file.fileno())
+            if stat.st_size == 0:
+                return Page("", 0, 0, 0, start_line=start_line)
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if start_line is not None or num_lines is not None:
+                    key = (path, stat.st_size, stat.st_mtime_ns)
+                    return self._read_lines(mm, key, start_line or 0, num_lines)
+                return self._read_bytes(mm, offset, length)
+
+    def _read_bytes(self, mm: mmap.mmap, offset: int, length: Optional[int]) -> Page:
+        size = len(mm)
+        start = min(max(offset, 0), size)
+        wanted = size - start if length is None else max(length, 0)
+        end = min(start + min(wanted, self.max_bytes), size)
+        truncated = end < min(start + wanted, size)
+        return Page(mm[start:end].decode("utf-8", errors="replace"), start, end, size, truncated)
+
+    def _checkpoints(self, key: tuple) -> list[tuple[int, int]]:
+        with self._lock:
+            checkpoints = self._line_checkpoints.get(key)
+            if checkpoints is None:
+                checkpoints = self._line_checkpoints[key] = [(0, 0)]
+                while len(self._line_checkpoints) > self.max_cached_files:
+                    self._line_checkpoints.popitem(last=False)
+            self._line_checkpoints.move_to_end(key)
+            return checkpoints
+
+    def _remember(self, checkpoints: list[tuple[int, int]], position: int, lines: int) -> None:
+        """Record that line number `lines` starts at byte `position` (kept sorted)."""
+        with self._lock:
+            index = bisect.bisect_left(checkpoints, (position, lines))
+            if index == len(checkpoints) or checkpoints[index][0] != position:
+                checkpoints.insert(index, (position, lines))
+
+    def _seek_line(self, mm: mmap.mmap, key: tuple, line: int) -> int:
+        """Byte offset where `line` starts (the size of the file past its last line)."""
+        if line == 0:
+            return 0
+        checkpoints = self._checkpoints(key)
+        # Resume from the last known line start at or before `line`
+        with self._lock:
+            position, lines = checkpoints[bisect.bisect_right(checkpoints, line, key=lambda c: c[1]) - 1]
+        size = len(mm)
+        if line - lines <= NEAR_LINES:
+            # Close to a known position (e.g. the next page): walk the map directly
+            for _ in range(line - lines):
+                newline = mm.find(b"\n", position)
+                if newline == -1:
+                    return size
+                position = newline + 1
+            return position
+        while position < size:
+            end = min(position + SCAN_CHUNK, size)
+            chunk = mm[position:end]
+            count = chunk.count(b"\n")
+            if lines + count >= line:
+                return position + self._after_newline(chunk, line - lines)
+            if count:
+                self._remember(checkpoints, position + chunk.rfind(b"\n") + 1, lines + count)
+            position, lines = end, lines + count
+        return size
+
+    @staticmethod
+    def _after_newline(chunk: bytes, n: int) -> int:
+        """Index just after the n-th newline of `chunk` (which has at least n)."""
+        low, high = 0, len(chunk)
+        # Halve the window while it holds many lines, then walk the rest
+        while high - low > 4096:
+            middle = (low + high) // 2
+            before = chunk.count(b"\n", low, middle)
+            if before >= n:
+                high = middle
+            else:
+                low, n = middle, n - before
+        index = low - 1
+        for _ in range(n):
+            index = chunk.find(b"\n", index + 1)
+        return index + 1
+
+    def _read_lines(self, mm: mmap.mmap, key: tuple, start_line: int, num_lines: Optional[int]) -> Page:
+        size = len(mm)
+        start_line = max(start_line, 0)
+        start = self._seek_line(mm, key, start_line)
+        if start >= size or num_lines == 0:
+            return Page("", start, start, size, start_line=start_line, next_line=None if start >= size else start_line)
+
+        limit = min(start + self.max_bytes, size)
+        end, read = start, 0
+        while end < limit and (num_lines is None or read < num_lines):
+            newline = mm.find(b"\n", end, limit)
+            if newline != -1:
+                end = newline + 1
+            elif limit == size:
+                end = size  # last line, without a trailing newline
+            else:
+                break  # the next line does not fit the budget
+            read += 1
+
+        if read == 0:
+            # One line longer than the budget: return its first part, continue by byte offset
+            end = limit
+        truncated = end < size and (num_lines is None or read < num_lines)
+        next_line = start_line + read if end < size else None
+        if next_line is not None and read:
+            # The next page starts here: paging on needs no scan
+            self._remember(self._checkpoints(key), end, next_line)
+        text = mm[start:end].decode("utf-8", errors="replace")
+        return Page(text, start, end, size, truncated, start_line=start_line, next_line=next_line)
+
+    # Writes
+    def write(self, name: str, content: Union[str, bytes, Iterable[Union[str, bytes]]], append: bool = False) -> int:
+        """
+        Atomically replace (or append to) a file with streamed content.
+
+        Args:
+            name: File path relative to the root; parent directories are created.
+            content: Text, bytes, or an iterable of chunks (written as they come).
+            append: Keep the current content and add to it.
+
+        Returns:
+            Bytes written (excluding the preserved content when appending).
+        """
+        path = self.resolve(name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        chunks = [content] if isinstance(content, (str, bytes)) else content
+        written = 0
+        descriptor, temporary = _create_temporary(path)
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                if path.exists():
+                    os.chmod(temporary, path.stat().st_mode)
+                if append and path.exists():
+                    with open(path, "rb") as current:
+                        while block := current.read(SCAN_CHUNK):
+                            file.write(block)
+                for chunk in chunks:
+                    data = chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+                    file.write(data)
+                    written += len(data)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temporary, path)
+        except BaseException:
+            Path(temporary).unlink(missing_ok=True)
+            raise
+        return written
+
+    def delete(self, name: str) -> None:
+        self.resolve(name).unlink()
+
+    # Listings
+    def list(self, directory: str = ".") -> list[Entry]:
+        """Subdirectories and allowed files of `directory`, cached until its mtime changes."""
+        path = self.resolve(directory, check_extension=False)
+        mtime = path.stat().st_mtime_ns
+        with self._lock:
+            cached = self._listings.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        entries = []
+        with os.scandir(path) as scan:
+            for item in scan:
+                if item.name.startswith("."):
+                    continue
+                if item.is_symlink() and self.root not in Path(item.path).resolve().parents:
+                    continue  # points outside the sandbox
+                if item.is_dir():
+                    entries.append(Entry(item.name, True, 0))
+                elif item.name.endswith(self.allowed_extensions):
+                    entries.append(Entry(item.name, False, item.stat().st_size))
+        entries.sort(key=lambda entry: (not entry.is_dir, entry.name))
+        with self._lock:
+            self._listings[path] = (mtime, entries)
+        return entries
+
+    def format_listing(self, directory: str = ".") -> str:
+        """Listing as text, capped at the token budget."""
+        lines, used = [], 0
+        entries = self.list(directory)
+        for i, entry in enumerate(entries):
+            line = f"{entry.name}/" if entry.is_dir else f"{entry.name} ({entry.size:,} bytes)"
+            if used + len(line) + 1 > self.max_bytes:
+                lines.append(f"... {len(entries) - i} more")
+                break
+            lines.append(line)
+            used += len(line) + 1
+        return "\n".join(lines)
+
+
+# Public API
+__all__ = ['ALLOWED_EXTENSIONS', 'Entry', 'FileSandbox', 'Page', 'SandboxError']
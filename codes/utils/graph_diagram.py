@@ -0,0 +1,287 @@
+"""
+Offline, cached graph diagrams.
+
+`draw_mermaid_png()` sends the graph to an external rendering service on every call, which
+adds seconds to every run and fails without network access. `render_diagram` instead:
+
+1. Hashes the graph topology (nodes, edges, conditional flags) from `graph.get_graph()`,
+   together with RENDERER_VERSION, so a renderer change never serves old cached diagrams.
+2. Returns the cached diagram when that topology was rendered before (memory, then disk).
+3. Otherwise renders locally, with no network:
+   - "svg": built-in layered layout written as SVG (no dependencies),
+   - "mmd" / "dot": Mermaid or Graphviz source text,
+   - "png": Graphviz, when the `dot` executable is installed.
+
+A compiled graph that was already hashed is a dictionary lookup away, so repeated calls
+(e.g. on every script start) cost microseconds.
+
+Usage:
+    from codes.utils.graph_diagram import render_diagram
+
+    render_diagram(graph, "agent.svg")
+"""
+# Import libraries
+import os
+import shutil
+import hashlib
+import threading
+import subprocess
+import weakref
+from pathlib import Path
+from typing import Any, Optional
+from xml.sax.saxutils import escape
+
+FORMATS = ("svg", "png", "mmd", "dot")
+# Part of every cache key; bump it whenever rendered output changes
+RENDERER_VERSION = 2
+DEFAULT_CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "llm-engineering" / "diagrams"
+
+# Layout (pixels)
+_CHAR_WIDTH = 7.5
+_NODE_HEIGHT = 36
+_LAYER_GAP = 70
+_NODE_GAP = 40
+_MARGIN = 30
+
+_hashes: "weakref.WeakKeyDictionary[Any, str]" = weakref.WeakKeyDictionary()
+_rendered: dict[tuple[str, str], bytes] = {}
+_written: dict[str, str] = {}
+_lock = threading.Lock()
+
+
+# Topology
+def _drawable(graph):
+    """Accept a compiled graph or an already drawable graph (with `.nodes` / `.edges`)."""
+    return graph if hasattr(graph, "edges") and hasattr(graph, "nodes") else graph.get_graph()
+
+
+def topology_hash(graph) -> str:
+    """Stable hash of node ids and edges, independent of node implementations."""
+    try:
+        cached = _hashes.get(graph)
+    except TypeError:
+        cached = None
+    if cached is not None:
+        return cached
+
+    drawable = _drawable(graph)
+    parts = [f"v:{RENDERER_VERSION}"]
+    parts += [f"n:{node_id}:{drawable.nodes[node_id].name}" for node_id in sorted(drawable.nodes)]
+    parts += sorted(f"e:{e.source}>{e.target}:{int(e.conditional)}:{e.data or ''}" for e in drawable.edges)
+    digest = hashlib.sha256("\n".join(parts).encode()).hexdigest()[:24]
+    try:
+        _hashes[graph] = digest
+    except TypeError:
+        pass
+    return digest
+
+
+# Local renderers
+def _layers(drawable) -> tuple[dict[str, int], set]:
+    """Longest-path layering from __start__; edges closing a cycle are returned as back edges."""
+    children: dict[str, list[str]] = {node_id: [] for node_id in drawable.nodes}
+    for edge in drawable.edges:
+        children.setdefault(edge.source, []).append(edge.target)
+
+    back, state = set(), {}
+
+    def visit(node_id):
+        state[node_id] = "open"
+        for child in children.get(node_id, []):
+            if state.get(child) == "open":
+                back.add((node_id, child))
+            elif child not in state:
+                visit(child)
+        state[node_id] = "done"
+
+    roots = [n for n in ("__start__",) if n in children] + list(children)
+    for root in roots:
+        if root not in state:
+            visit(root)
+
+    layer = {node_id: 0 for node_id in children}
+    for node_id in _topological(children, back):
+        for child in children[node_id]:
+            if (node_id, child) not in back:
+                layer[child] = max(layer[child], layer[node_id] + 1)
+    if "__end__" in layer:
+        layer["__end__"] = max(layer.values())
+        if any(layer[n] == layer["__end__"] for n in layer if n != "__end__"):
+            layer["__end__"] += 1
+    return layer, back
+
+
+def _topological(children: dict[str, list[str]], back: set) -> list[str]:
+    indegree = {n: 0 for n in children}
+    for source, targets in children.items():
+        for target in targets:
+            if (source, target) not in back:
+                indegree[target] += 1
+    ready = [n for n in children if indegree[n] == 0]
+    order = []
+    while ready:
+        node_id = ready.pop(0)
+        order.append(node_id)
+        for child in children[node_id]:
+            if (node_id, child) not in back:
+                indegree[child] -= 1
+                if indegree[child] == 0:
+                    ready.append(child)
+    return order
+
+
+def render_svg(graph) -> str:
+    """Render the graph as a top-down SVG flowchart."""
+    drawable = _drawable(graph)
+    layer, back = _layers(drawable)
+    rows: dict[int, list[str]] = {}
+    for node_id in drawable.nodes:
+        rows.setdefault(layer[node_id], []).append(node_id)
+
+    label = {node_id: node.name for node_id, node in drawable.nodes.items()}
+    width_of = {node_id: max(80, len(text) * _CHAR_WIDTH + 30) for node_id, text in label.items()}
+    row_width = {r: sum(width_of[n] for n in ids) + _NODE_GAP * (len(ids) - 1) for r, ids in rows.items()}
+    canvas_width = max(row_width.values()) + 2 * _MARGIN + 140
+    canvas_height = (max(rows) + 1) * (_NODE_HEIGHT + _LAYER_GAP) - _LAYER_GAP + 2 * _MARGIN
+
+    box: dict[str, tuple[float, float, float]] = {}
+    for r, ids in rows.items():
+        x = (canvas_width - row_width[r]) / 2
+        y = _MARGIN + r * (_NODE_HEIGHT + _LAYER_GAP)
+        for node_id in ids:
+            box[node_id] = (x, y, width_of[node_id])
+            x += width_of[node_id] + _NODE_GAP
+
+    out = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{canvas_width:.0f}" height="{canvas_height:.0f}" '
+        f'font-family="sans-serif" font-size="13">',
+        '<defs><marker id="arrow" viewBox="0 0 10 10" refX="10" refY="5" markerWidth="7" markerHeight="7" '
+        'orient="auto-start-reverse"><path d="M0,0 L10,5 L0,10 z" fill="#333"/></marker></defs>',
+    ]
+    for edge in drawable.edges:
+        sx, sy, sw = box[edge.source]
+        tx, ty, tw = box[edge.target]
+        dash = ' stroke-dasharray="5,4"' if edge.conditional else ""
+        if (edge.source, edge.target) in back:
+            # Loop back on the right-hand side
+            x1, y1 = sx + sw, sy + _NODE_HEIGHT / 2
+            x2, y2 = tx + tw, ty + _NODE_HEIGHT / 2
+            bend = max(x1, x2) + 50
+            path = f"M{x1:.0f},{y1:.0f} C{bend:.0f},{y1:.0f} {bend:.0f},{y2:.0f} {x2:.0f},{y2:.0f}"
+        elif layer[edge.target] - layer[edge.source] > 1:
+            # Skip over the layers in between on the left-hand side instead of crossing their nodes
+            x1, y1 = sx, sy + _NODE_HEIGHT / 2
+            x2, y2 = tx, ty + _NODE_HEIGHT / 2
+            bend = min(box[n][0] for n in box if layer[edge.source] < layer[n] < layer[edge.target]) - 50
+            bend = min(bend, x1 - 50, x2 - 50)
+            path = f"M{x1:.0f},{y1:.0f} C{bend:.0f},{y1:.0f} {bend:.0f},{y2:.0f} {x2:.0f},{y2:.0f}"
+        else:
+            x1, y1 = sx + sw / 2, sy + _NODE_HEIGHT
+            x2, y2 = tx + tw / 2, ty
+            path = f"M{x1:.0f},{y1:.0f} L{x2:.0f},{y2:.0f}"
+        out.append(f'<path d="{path}" fill="none" stroke="#333"{dash} marker-end="url(#arrow)"/>')
+        if edge.data:
+            out.append(
+                f'<text x="{(x1 + x2) / 2:.0f}" y="{(y1 + y2) / 2:.0f}" text-anchor="middle" '
+                f'fill="#555">{escape(str(edge.data))}</text>'
+            )
+    for node_id, (x, y, w) in box.items():
+        terminal = node_id in ("__start__", "__end__")
+        fill = "#bfb6fc" if node_id == "__end__" else ("#ffffff" if terminal else "#f2f0ff")
+        radius = _NODE_HEIGHT / 2 if terminal else 6
+        out.append(
+            f'<rect x="{x:.0f}" y="{y:.0f}" width="{w:.0f}" height="{_NODE_HEIGHT}" rx="{radius:.0f}" '
+            f'fill="{fill}" stroke="#6b5fd3"/>'
+        )
+        out.append(
+            f'<text x="{x + w / 2:.0f}" y="{y + _NODE_HEIGHT / 2 + 4:.0f}" text-anchor="middle">'
+            f'{escape(label[node_id])}</text>'
+        )
+    out.append("</svg>")
+    return "\n".join(out)
+
+
+def _dot_string(text: Any) -> str:
+    """Quoted Graphviz string, with backslashes, quotes and newlines escaped."""
+    escaped = str(text).replace("\\", "\\\\").replace('"', '\\"').replace("\r", "").replace("\n", "\\n")
+    return f'"{escaped}"'
+
+
+def render_dot(graph) -> str:
+    """Graphviz source for the graph."""
+    drawable = _drawable(graph)
+    lines = ["digraph G {", "  node [shape=box, style=\"rounded,filled\", fillcolor=\"#f2f0ff\"];"]
+    for node_id, node in drawable.nodes.items():
+        shape = ", shape=oval" if node_id in ("__start__", "__end__") else ""
+        lines.append(f"  {_dot_string(node_id)} [label={_dot_string(node.name)}{shape}];")
+    for edge in drawable.edges:
+        attrs = ["style=dashed"] if edge.conditional else []
+        if edge.data:
+            attrs.append(f"label={_dot_string(edge.data)}")
+        lines.append(
+            f"  {_dot_string(edge.source)} -> {_dot_string(edge.target)}"
+            + (f" [{', '.join(attrs)}]" if attrs else "") + ";"
+        )
+    lines.append("}")
+    return "\n".join(lines)
+
+
+def _render(graph, fmt: str) -> bytes:
+    if fmt == "svg":
+        return render_svg(graph).encode()
+    if fmt == "mmd":
+        return _drawable(graph).draw_mermaid().encode()
+    if fmt == "dot":
+        return render_dot(graph).encode()
+    dot = shutil.which("dot")
+    if dot is None:
+        raise RuntimeError("PNG diagrams need the Graphviz `dot` executable; use an .svg path instead")
+    return subprocess.run([dot, "-Tpng"], input=render_dot(graph).encode(), capture_output=True, check=True).stdout
+
+
+# Public API
+def render_diagram(
+        graph,
+        path: Optional[str] = None,
+        fmt: Optional[str] = None,
+        cache_dir: Optional[Path] = DEFAULT_CACHE_DIR,
+) -> bytes:
+    """
+    Return (and optionally write) the diagram of `graph`, rendering only when its topology changed.
+
+    Args:
+        graph: Compiled graph, or the drawable graph from `graph.get_graph()`.
+        path: File to write; skipped when it already holds this topology's diagram.
+        fmt: One of "svg", "png", "mmd", "dot"; taken from the path suffix when omitted.
+        cache_dir: Directory of the on-disk cache shared across runs; None disables it.
+
+    Returns:
+        The diagram bytes.
+    """
+    fmt = (fmt or (Path(path).suffix.lstrip(".") if path else "svg")).lower()
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported diagram format {fmt!r}; expected one of {FORMATS}")
+
+    digest = topology_hash(graph)
+    data = _rendered.get((digest, fmt))
+    if data is None:
+        cached = Path(cache_dir) / f"{digest}.{fmt}" if cache_dir else None
+        if cached is not None and cached.exists():
+            data = cached.read_bytes()
+        else:
+            data = _render(graph, fmt)
+            if cached is not None:
+                cached.parent.mkdir(parents=True, exist_ok=True)
+                tmp = cached.with_suffix(f".{os.getpid()}.tmp")
+                tmp.write_bytes(data)
+                os.replace(tmp, cached)
+        with _lock:
+            _rendered[(digest, fmt)] = data
+
+    if path is not None:
+        key = os.path.abspath(path)
+        if _written.get(key) != f"{digest}.{fmt}" or not os.path.exists(key):
+            Path(path).write_bytes(data)
+            with _lock:
+                _written[key] = f"{digest}.{fmt}"
+    return data
@@ -0,0 +1,132 @@
+"""
+Registry of the project's LangGraph graphs.
+
+Graph modules only *register* a builder at import time: no compilation, no diagram
+rendering, no demo runs, no model clients. A graph is compiled on first use and the
+compiled graph is cached per (graph, checkpointer, store), so importing a module stays
+cheap and cannot fail on the network or a missing configuration, and repeated lookups
+reuse the same compiled graph.
+
+The cache is keyed by the checkpointer and store objects themselves (by identity) and
+bounded: beyond MAX_COMPILED_GRAPHS entries the least recently used one is dropped, so
+graphs compiled for short-lived checkpointers or stores do not pile up.
+
+Usage:
+    # In a graph module
+    @register_graph("chat-bot")
+    def build_graph() -> StateGraph:
+        ...
+        return workflow
+
+    # Anywhere else (imports the defining module on demand)
+    graph = get_compiled_graph("chat-bot", checkpointer=memory, store=store)
+"""
+# Import libraries
+import importlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+from langgraph.graph import StateGraph
+from langgraph.graph.state import CompiledStateGraph
+
+GraphBuilder = Callable[[], StateGraph]
+
+# Where each graph is defined, so it can be looked up without importing the module first
+GRAPH_MODULES = {
+    "agent-with-search": "codes.agent_with_search.main",
+    "simple-react-agent": "codes.simple_react_agent.simple_react_agent",
+    "simple-react-agent-parallel": "codes.simple_react_agent.simple_react_agent",
+    "simple-react-agent-fast-path": "codes.simple_react_agent.simple_react_agent",
+    "semantic-memory": "codes.semantic_memory.agent",
+    "semantic-memory-background": "codes.semantic_memory.agent",
+    "chat-bot": "notes.langgraph_components.professional_message_handling",
+    "messages-reduce": "notes.langgraph_components.managing_messages",
+    "messages-filter": "notes.langgraph_components.managing_messages",
+    "messages-trim": "notes.langgraph_components.managing_messages",
+    "state-private": "notes.langgraph_components.state_management",
+    "state-input-output": "notes.langgraph_components.state_management",
+}
+
+# Compiled graphs kept at once (least recently used are dropped)
+MAX_COMPILED_GRAPHS = 32
+
+
+class _Identity:
+    """Cache key part matching one object by identity (holding it, so its id stays unique)."""
+    __slots__ = ("obj",)
+
+    def __init__(self, obj: Any):
+        self.obj = obj
+
+    def __hash__(self) -> int:
+        return id(self.obj)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _Identity) and other.obj is self.obj
+
+
+_builders: dict[str, GraphBuilder] = {}
+# (name, checkpointer, store) -> compiled graph, in least recently used order
+_compiled: OrderedDict[tuple[str, _Identity, _Identity], CompiledStateGraph] = OrderedDict()
+_lock = threading.RLock()
+
+
+def register_graph(name: str) -> Callable[[GraphBuilder], GraphBuilder]:
+    """Decorator registering `builder` (returns an uncompiled StateGraph) under `name`."""
+
+    def decorator(builder: GraphBuilder) -> GraphBuilder:
+        with _lock:
+            _builders[name] = builder
+            # A re-registered builder (e.g. module reload) must not serve stale graphs
+            for key in [k for k in _compiled if k[0] == name]:
+                del _compiled[key]
+        return builder
+
+    return decorator
+
+
+def _builder(name: str) -> GraphBuilder:
+    builder = _builders.get(name)
+    if builder is None and name in GRAPH_MODULES:
+        importlib.import_module(GRAPH_MODULES[name])
+        builder = _builders.get(name)
+    if builder is None:
+        raise KeyError(f"Unknown graph: {name!r}. Registered graphs: {sorted(registered_graphs())}")
+    return builder
+
+
+def get_compiled_graph(name: str, checkpointer: Any = None, store: Any = None) -> CompiledStateGraph:
+    """
+    Return graph `name` compiled with `checkpointer` and `store`, compiling it on first use.
+
+    Args:
+        name: Registered graph name.
+        checkpointer: Checkpointer to compile with (None for no persistence).
+        store: Long-term memory store to compile with.
+
+    Returns:
+        The cached compiled graph for this combination.
+    """
+    key = (name, _Identity(checkpointer), _Identity(store))
+    with _lock:
+        graph = _compiled.get(key)
+        if graph is None:
+            graph = _compiled[key] = _builder(name)().compile(checkpointer=checkpointer, store=store)
+            while len(_compiled) > MAX_COMPILED_GRAPHS:
+                _compiled.popitem(last=False)
+        else:
+            _compiled.move_to_end(key)
+    return graph
+
+
+def registered_graphs() -> list[str]:
+    """Names of all graphs, registered or known by module."""
+    return sorted(set(_builders) | set(GRAPH_MODULES))
+
+
+def clear_graph_cache(name: Optional[str] = None) -> None:
+    """Drop cached compiled graphs (of one graph, or all)."""
+    with _lock:
+        for key in [k for k in _compiled if name is None or k[0] == name]:
+            del _compiled[key]
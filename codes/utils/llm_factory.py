@@ -0,0 +1,277 @@
+"""
+Shared chat model factory.
+
+Hands out cached chat model instances keyed on (provider, model_name, temperature), with
+defaults taken from `config.model`. All instances of one provider share a single
+keep-alive connection pool, so graphs and sessions reuse warm connections instead of
+repeating TCP/TLS setup on every new client.
+
+- get_chat_model():        sync-friendly instance, shared across threads.
+- get_async_chat_model():  instance whose async transport is bound to the running event loop.
+- MODEL__PROVIDER=local:   offline LocalChatModel stand-in, no network and no API key needed.
+- configure_local_models(): script the local stand-ins (responder, latency, ...) without
+  reaching into the modules that use them.
+- close_clients() / aclose_clients(): close the sync pools, or the running loop's async pools.
+
+Pool size and timeout come from `config.model.pool_size` / `config.model.request_timeout`
+(MODEL__POOL_SIZE / MODEL__REQUEST_TIMEOUT).
+
+Usage:
+    from codes.utils.llm_factory import get_chat_model
+
+    llm = get_chat_model()                                 # provider/model from config
+    gpt = get_chat_model(LLMProvider.OPENAI, "gpt-4o")     # explicit override
+"""
+# Import libraries
+import asyncio
+import inspect
+import threading
+import weakref
+from typing import Any, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+
+from codes.config.config import LLMProvider, get_config
+
+ModelKey = tuple[LLMProvider, str, float]
+
+_lock = threading.Lock()
+_sync_models: dict[ModelKey, BaseChatModel] = {}
+_sync_pools: dict[LLMProvider, Any] = {}
+_async_models: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[ModelKey, BaseChatModel]]" = (
+    weakref.WeakKeyDictionary()
+)
+_async_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[LLMProvider, Any]]" = (
+    weakref.WeakKeyDictionary()
+)
+# LocalChatModel fields set through configure_local_models()
+_local_settings: dict[str, Any] = {}
+
+
+def _resolve_key(
+        provider: Optional[LLMProvider],
+        model_name: Optional[str],
+        temperature: Optional[float],
+) -> ModelKey:
+    """Fill unspecified parts of the cache key from config.model."""
+    model_config = get_config().model
+    provider = LLMProvider(provider) if provider is not None else model_config.provider
+    # Local mode swaps every model for the offline stand-in, including explicit overrides
+    if model_config.provider == LLMProvider.LOCAL:
+        provider = LLMProvider.LOCAL
+    if model_name is None:
+        model_name = model_config.model_name
+    if temperature is None:
+        temperature = model_config.temperature
+    return provider, model_name, float(temperature)
+
+
+def _api_key(provider: LLMProvider):
+    """
+    Pick the API key for a provider.
+
+    config.model.api_key belongs to config.model.provider only; any other provider uses
+    its own setting (OPENAI_API_KEY / GOOGLE_API_KEY).
+
+    Raises:
+        ValueError: If no key is configured for the provider.
+    """
+    system_config = get_config()
+    if provider == system_config.model.provider:
+        return system_config.model.api_key
+    provider_keys = {
+        LLMProvider.OPENAI: ("OPENAI_API_KEY", system_config.openai_api_key),
+        LLMProvider.GOOGLE: ("GOOGLE_API_KEY", system_config.google_api_key),
+    }
+    setting, key = provider_keys.get(provider, (None, None))
+    if key is None:
+        raise ValueError(
+            f"No API key for {provider.value}: config.model is set up for "
+            f"{system_config.model.provider.value}"
+            + (f"; set {setting} to use {provider.value} models" if setting else "")
+        )
+    return key
+
+
+def _httpx_limits():
+    import httpx
+
+    pool_size = get_config().model.pool_size
+    return httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+
+
+def _build_model(key: ModelKey, pools: dict[LLMProvider, Any], is_async: bool) -> BaseChatModel:
+    """Create a chat model for `key`, attaching it to the provider's shared pool."""
+    provider, model_name, temperature = key
+    timeout = get_config().model.request_timeout
+
+    if provider == LLMProvider.LOCAL:
+        from codes.utils.fake_models import LocalChatModel
+
+        return LocalChatModel(model_name=model_name, **_local_settings)
+
+    if provider == LLMProvider.OPENAI:
+        import httpx
+        from langchain_openai import ChatOpenAI
+
+        if provider not in pools:
+            client_cls = httpx.AsyncClient if is_async else httpx.Client
+            pools[provider] = client_cls(limits=_httpx_limits(), timeout=timeout)
+        pool_kwarg = "http_async_client" if is_async else "http_client"
+        return ChatOpenAI(
+            model=model_name,
+            temperature=temperature,
+            api_key=_api_key(provider),
+            timeout=timeout,
+            **{pool_kwarg: pools[provider]},
+        )
+
+    if provider == LLMProvider.GOOGLE:
+        from langchain_google_genai import ChatGoogleGenerativeAI
+
+        llm = ChatGoogleGenerativeAI(
+            model=model_name,
+            temperature=temperature,
+            api_key=_api_key(provider),
+            timeout=timeout,
+        )
+        # The generative service client is not tied to a model, so one client (and its
+        # channel) serves every Gemini model/temperature combination.
+        if is_async:
+            if provider not in pools:
+                pools[provider] = llm.async_client
+            llm.async_client_running = pools[provider]
+        else:
+            if provider not in pools:
+                pools[provider] = llm.client
+            llm.client = pools[provider]
+        return llm
+
+    raise ValueError(f"Unsupported LLM provider: {provider}")
+
+
+def get_chat_model(
+        provider: Optional[LLMProvider] = None,
+        model_name: Optional[str] = None,
+        temperature: Optional[float] = None,
+) -> BaseChatModel:
+    """
+    Return the shared chat model for (provider, model_name, temperature).
+
+    Args:
+        provider: LLM provider, defaults to config.model.provider.
+        model_name: Model identifier, defaults to config.model.model_name.
+        temperature: Sampling temperature, defaults to config.model.temperature.
+
+    Returns:
+        BaseChatModel: A cached instance; repeated calls with the same key return the same object.
+    """
+    key = _resolve_key(provider, model_name, temperature)
+    llm = _sync_models.get(key)
+    if llm is None:
+        with _lock:
+            llm = _sync_models.get(key)
+            if llm is None:
+                llm = _sync_models[key] = _build_model(key, _sync_pools, is_async=False)
+    return llm
+
+
+def get_async_chat_model(
+        provider: Optional[LLMProvider] = None,
+        model_name: Optional[str] = None,
+        temperature: Optional[float] = None,
+) -> BaseChatModel:
+    """
+    Return the shared chat model for the running event loop.
+
+    Async HTTP clients are bound to the loop that created them, so models and pools are
+    cached per loop and released when the loop is garbage collected.
+
+    Raises:
+        RuntimeError: If called outside a running event loop.
+    """
+    loop = asyncio.get_running_loop()
+    key = _resolve_key(provider, model_name, temperature)
+    with _lock:
+        models = _async_models.setdefault(loop, {})
+        llm = models.get(key)
+        if llm is None:
+            pools = _async_pools.setdefault(loop, {})
+            llm = models[key] = _build_model(key, pools, is_async=True)
+    return llm
+
+
+def configure_local_models(**fields: Any) -> None:
+    """
+    Set LocalChatModel fields (responder, responses, latency, token_latency) in local mode.
+
+    Applies to the local models already handed out, sync and per loop, and to those
+    created later.
+    """
+    with _lock:
+        _local_settings.update(fields)
+        for models in [_sync_models, *_async_models.values()]:
+            for (provider, _, _), llm in models.items():
+                if provider == LLMProvider.LOCAL:
+                    for name, value in fields.items():
+                        setattr(llm, name, value)
+
+
+def close_clients() -> None:
+    """
+    Close the shared sync pools and forget the cached sync models.
+
+    Async pools belong to their event loop and can only be closed from it: await
+    `aclose_clients()` on each loop that used `get_async_chat_model`.
+    """
+    with _lock:
+        pools = list(_sync_pools.values())
+        _sync_pools.clear()
+        _sync_models.clear()
+    for pool in pools:
+        close = getattr(pool, "close", None)
+        if callable(close):
+            close()
+
+
+async def _aclose_pool(pool: Any) -> None:
+    """Close an async pool: an httpx.AsyncClient, or a Gemini client via its transport."""
+    close = getattr(pool, "aclose", None)
+    if not callable(close):
+        close = getattr(getattr(pool, "transport", None), "close", None)
+    if callable(close):
+        result = close()
+        if inspect.isawaitable(result):
+            await result
+
+
+async def aclose_clients() -> None:
+    """Close the running event loop's async pools and forget the models bound to them."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        pools = list(_async_pools.pop(loop, {}).values())
+        _async_models.pop(loop, None)
+    for pool in pools:
+        await _aclose_pool(pool)
+
+
+def pool_stats() -> dict:
+    """Report how many models and pools are cached, for debugging connection reuse."""
+    with _lock:
+        return {
+            "sync_models": len(_sync_models),
+            "sync_pools": sorted(p.value for p in _sync_pools),
+            "event_loops": len(_async_models),
+            "async_models": sum(len(m) for m in _async_models.values()),
+        }
+
+
+# Public API
+__all__ = [
+    'get_chat_model',
+    'get_async_chat_model',
+    'configure_local_models',
+    'close_clients',
+    'aclose_clients',
+    'pool_stats',
+]
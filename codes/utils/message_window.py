@@ -0,0 +1,89 @@
+"""
+Bounded message-window reducer for chat graphs.
+
+Keeping only the recent messages usually means a node returning one RemoveMessage per old
+message, which add_messages then resolves one by one against the whole history, and
+which the history has to grow to before it shrinks again. `message_window` is a drop-in
+replacement for add_messages that bounds the list itself:
+
+- `max_messages`: the channel never holds more than this many messages; the oldest are
+  evicted as new ones arrive, so the work per update depends on the window size, not on
+  how long the conversation has been running.
+- `keep_last(n)`: a node can shrink the window with one instruction instead of n
+  RemoveMessage objects (e.g. after summarising).
+- `on_evict`: optional callback receiving the evicted messages, oldest first, for
+  summarisation or archival. It runs inside the reducer, so keep it quick (hand off to a
+  queue or background writer) and idempotent (a retried step evicts again).
+
+The value is still a plain list of messages with add_messages semantics (ids, updates,
+RemoveMessage), so MessagesState consumers (ToolNode, tools_condition, checkpointers)
+work unchanged.
+
+Usage:
+    class State(MessagesState):
+        messages: Annotated[list[AnyMessage], message_window(max_messages=20)]
+
+    def summarize(state):
+        ...
+        return {"summary": summary, "messages": keep_last(2)}
+"""
+# Import libraries
+from dataclasses import dataclass
+from typing import Callable, Optional, Sequence, Union
+
+from langchain_core.messages import AnyMessage, BaseMessage
+from langgraph.graph.message import Messages, add_messages
+
+EvictCallback = Callable[[list[BaseMessage]], None]
+
+
+@dataclass(frozen=True)
+class KeepLast:
+    """State update that keeps only the `count` most recent messages."""
+    count: int
+
+
+def keep_last(count: int) -> KeepLast:
+    """Update for a message_window channel dropping all but the `count` newest messages."""
+    if count < 0:
+        raise ValueError("count must be non-negative")
+    return KeepLast(count)
+
+
+def message_window(
+        max_messages: Optional[int] = None,
+        on_evict: Optional[EvictCallback] = None,
+) -> Callable[[Messages, Union[Messages, KeepLast]], list[AnyMessage]]:
+    """
+    Build a messages reducer bounded to `max_messages`.
+
+    Args:
+        max_messages: Window size; None keeps everything unless a node sends keep_last(n).
+        on_evict: Called with the messages leaving the window.
+
+    Returns:
+        A reducer for `Annotated[list[AnyMessage], ...]` state keys.
+    """
+    if max_messages is not None and max_messages < 1:
+        raise ValueError("max_messages must be at least 1")
+
+    def evict(messages: Sequence[BaseMessage], limit: int) -> list[AnyMessage]:
+        if len(messages) <= limit:
+            return list(messages)
+        cut = len(messages) - limit
+        if on_evict is not None:
+            on_evict(list(messages[:cut]))
+        return list(messages[cut:])
+
+    def reduce(left: Messages, right: Union[Messages, KeepLast]) -> list[AnyMessage]:
+        left = left or []
+        if isinstance(right, KeepLast):
+            return evict(left, right.count)
+        merged = add_messages(left, right)
+        return evict(merged, max_messages) if max_messages is not None else merged
+
+    return reduce
+
+
+# Public API
+__all__ = ['KeepLast', 'keep_last', 'message_window']
@@ -0,0 +1,182 @@
+"""
+ToolNode that runs the tool calls of one model turn concurrently, with limits.
+
+When the model emits several tool calls in one message (parallel tool calling), they are
+independent and can run at the same time. ParallelToolNode keeps ToolNode's behaviour
+(error handling, ToolMessage/Command outputs, results in call order) and adds:
+
+- One shared, bounded thread pool for sync runs instead of a new pool per step.
+- `max_concurrency`: at most this many tools run at once (across concurrent graph runs
+  for the sync pool, per step for the async path).
+- `timeout`: per-tool time limit, either one value or a {tool name: seconds} mapping.
+  A tool that misses it is reported to the model as an error ToolMessage. Async tools are
+  cancelled; a sync tool cannot be interrupted, so its worker finishes in the background
+  and its late result is dropped. On the sync pool each call has its own deadline: it
+  gets `timeout` seconds to reach a worker and, once started, `timeout` seconds to run.
+
+Sync tools run in a copy of the caller's context, so context variables (the runnable
+config, `get_store()`, the stream writer, callbacks) are visible inside them.
+
+Usage:
+    model_with_tool = model.bind_tools(tools)  # parallel tool calls enabled
+    builder.add_node("tools", ParallelToolNode(tools, max_concurrency=8, timeout=10.0))
+"""
+# Import libraries
+import time
+import asyncio
+import threading
+import contextvars
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Optional, Sequence, Union
+
+from langchain_core.messages import ToolMessage
+from langchain_core.runnables import RunnableConfig
+from langchain_core.runnables.config import get_config_list
+from langchain_core.tools import BaseTool
+from langgraph.prebuilt import ToolNode
+from langgraph.store.base import BaseStore
+
+
+class ParallelToolNode(ToolNode):
+    """
+    ToolNode with a shared bounded pool, a concurrency limit and per-tool timeouts.
+
+    Args:
+        tools: Tools available to the model.
+        max_concurrency: Maximum number of tools running at the same time.
+        timeout: Seconds a tool may run, as one value for all tools or per tool name
+            (tools missing from the mapping have no limit); None disables timeouts.
+        **kwargs: Passed to ToolNode (name, tags, handle_tool_errors, messages_key).
+    """
+
+    def __init__(
+            self,
+            tools: Sequence[Union[BaseTool, Callable]],
+            *,
+            max_concurrency: int = 8,
+            timeout: Union[float, dict[str, float], None] = None,
+            **kwargs: Any,
+    ):
+        super().__init__(tools, **kwargs)
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._in_flight = 0
+        self.calls = 0
+        self.timeouts = 0
+        self.max_in_flight = 0
+
+    # Limits
+    def _timeout_for(self, name: str) -> Optional[float]:
+        if isinstance(self.timeout, dict):
+            return self.timeout.get(name)
+        return self.timeout
+
+    @property
+    def pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(self.max_concurrency, thread_name_prefix="tool")
+        return self._pool
+
+    def _enter(self):
+        with self._stats_lock:
+            self.calls += 1
+            self._in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+
+    def _exit(self):
+        with self._stats_lock:
+            self._in_flight -= 1
+
+    def _timed_out(self, call: dict, seconds: float) -> ToolMessage:
+        with self._stats_lock:
+            self.timeouts += 1
+        return ToolMessage(
+            content=f"Error: {call['name']} timed out after {seconds:g}s",
+            name=call["name"],
+            tool_call_id=call["id"],
+            status="error",
+        )
+
+    # Sync path
+    def _submit(self, fn: Callable, *args: Any) -> Future:
+        """Run `fn` on the pool in a copy of the current context."""
+        return self.pool.submit(contextvars.copy_context().run, fn, *args)
+
+    def _result(self, future: Future, call: dict, submitted: float, started_at: Callable[[], Optional[float]]):
+        """Wait for `future` until its deadline: `timeout` to reach a worker, then `timeout` to run."""
+        timeout = self._timeout_for(call["name"])
+        if timeout is None:
+            return future.result()
+        while True:
+            start = started_at()
+            deadline = (submitted if start is None else start) + timeout
+            try:
+                return future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except FutureTimeoutError:
+                if started_at() != start:
+                    continue  # started meanwhile: its run deadline applies now
+                future.cancel()  # drops it if still queued
+                return self._timed_out(call, timeout)
+
+    def _func(self, input: Any, config: RunnableConfig, *, store: Optional[BaseStore]) -> Any:
+        tool_calls, input_type = self._parse_input(input, store)
+        config_list = get_config_list(config, len(tool_calls))
+        started_at: list[Optional[float]] = [None] * len(tool_calls)
+
+        def run(index: int):
+            started_at[index] = time.monotonic()
+            self._enter()
+            try:
+                return self._run_one(tool_calls[index], input_type, config_list[index])
+            finally:
+                self._exit()
+
+        if len(tool_calls) == 1 and self._timeout_for(tool_calls[0]["name"]) is None:
+            # A lone call without a limit runs inline; a limit needs a worker to wait on
+            return self._combine_tool_outputs([run(0)], input_type)
+
+        submitted = time.monotonic()
+        futures = [self._submit(run, i) for i in range(len(tool_calls))]
+        outputs = [
+            self._result(futures[i], call, submitted, lambda i=i: started_at[i])
+            for i, call in enumerate(tool_calls)
+        ]
+        return self._combine_tool_outputs(outputs, input_type)
+
+    # Async path
+    async def _afunc(self, input: Any, config: RunnableConfig, *, store: Optional[BaseStore]) -> Any:
+        tool_calls, input_type = self._parse_input(input, store)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run(call: dict):
+            async with semaphore:
+                timeout = self._timeout_for(call["name"])
+                self._enter()
+                try:
+                    return await asyncio.wait_for(self._arun_one(call, input_type, config), timeout)
+                except asyncio.TimeoutError:
+                    return self._timed_out(call, timeout)
+                finally:
+                    self._exit()
+
+        outputs = await asyncio.gather(*(run(call) for call in tool_calls))
+        return self._combine_tool_outputs(list(outputs), input_type)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "timeouts": self.timeouts,
+            "max_in_flight": self.max_in_flight,
+            "max_concurrency": self.max_concurrency,
+        }
+
+
+# Public API
+__all__ = ['ParallelToolNode']
@@ -0,0 +1,348 @@
+"""
+TTL/LRU cache for retrieval results (web search, Wikipedia, ...).
+
+Repeated or near-identical questions should not hit upstream search APIs again. Results
+are cached per (source, normalised query), where normalisation folds case, whitespace and
+sentence punctuation at word edges ("What is Bitcoin?" == "what is   bitcoin"). Symbols
+are kept, so "C++", "C#" and "C" stay distinct, and so do "U.S. law" and "u s law".
+
+- Memory tier: size-bounded LRU with a TTL per source.
+- Disk tier (optional): a SqliteStore file, so results survive restarts. Expired entries
+  are deleted when a lookup finds them, and a sweep every `sweep_interval` seconds (run
+  after a disk write, the first one on the first write) deletes the rest.
+- Single flight: concurrent misses for the same key share one upstream call. The shared
+  call is shielded, so a caller giving up (e.g. on a deadline) does not cancel it for the others.
+- Counters: memory/disk hits, misses, deduplicated waits and upstream latency via `stats()`.
+
+Usage:
+    cache = RetrievalCache(ttls={"web": 600, "wikipedia": 86400}, disk_path="retrieval.db")
+    docs = await cache.aget_or_fetch("web", question, lambda: tavily.aretrieve(question))
+"""
+# Import libraries
+import time
+import asyncio
+import logging
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Optional
+
+from langchain_core.documents import Document
+from langgraph.store.base import PutOp
+
+logger = logging.getLogger(__name__)
+
+DISK_NAMESPACE = "retrieval"
+SWEEP_BATCH = 500  # expired disk entries deleted per transaction
+
+# Stripped from the edges of each word only; symbols inside or around words (+ # / .) stay
+_SENTENCE_PUNCTUATION = "?!.,;:'\""
+
+
+def normalize_query(query: str) -> str:
+    """Fold case, whitespace and sentence punctuation so near-identical questions share a key."""
+    words = (word.strip(_SENTENCE_PUNCTUATION) for word in query.casefold().split())
+    return " ".join(word for word in words if word)
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    deduplicated: int = 0
+    upstream_calls: int = 0
+    upstream_errors: int = 0
+    upstream_seconds: float = 0.0
+    disk_expired: int = 0
+    per_source: dict = field(default_factory=dict)
+
+    def count(self, source: str, event: str):
+        row = self.per_source.setdefault(source, {"hits": 0, "misses": 0})
+        if event in row:
+            row[event] += 1
+
+
+class RetrievalCache:
+    """
+    Two-tier cache of retrieval results.
+
+    Args:
+        max_entries: Memory-tier capacity (least recently used entries are evicted).
+        ttls: Seconds a result stays fresh, per source name.
+        default_ttl: TTL for sources not listed in `ttls`.
+        disk_path: SQLite file for the persistent tier; None keeps the cache in memory only.
+        sweep_interval: Seconds between sweeps deleting expired entries from the disk tier.
+    """
+
+    def __init__(
+            self,
+            max_entries: int = 1024,
+            ttls: Optional[dict[str, float]] = None,
+            default_ttl: float = 3600.0,
+            disk_path: Optional[str] = None,
+            sweep_interval: float = 3600.0,
+    ):
+        self.max_entries = max_entries
+        self.ttls = dict(ttls or {})
+        self.default_ttl = default_ttl
+        self._memory: OrderedDict[tuple[str, str], tuple[float, list[Document]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight: dict[tuple[int, str, str], asyncio.Task] = {}
+        self._disk = None
+        if disk_path:
+            from codes.utils.sqlite_store import SqliteStore
+
+            self._disk = SqliteStore(disk_path)
+        self.sweep_interval = sweep_interval
+        self._next_sweep = 0.0
+        self._sweeps: set[asyncio.Task] = set()
+        self._stats = CacheStats()
+
+    # Tiers
+    def _ttl(self, source: str) -> float:
+        return self.ttls.get(source, self.default_ttl)
+
+    @staticmethod
+    def _disk_key(normalized: str) -> str:
+        return hashlib.sha1(normalized.encode()).hexdigest()
+
+    def _memory_get(self, key: tuple[str, str]) -> Optional[list[Document]]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            expires_at, documents = entry
+            if expires_at < time.time():
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            return documents
+
+    def _memory_put(self, key: tuple[str, str], documents: list[Document], expires_at: float):
+        with self._lock:
+            self._memory[key] = (expires_at, documents)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    @staticmethod
+    def _expired(item) -> bool:
+        return item.value["expires_at"] < time.time()
+
+    def _decode_disk(self, item) -> tuple[float, list[Document]]:
+        documents = [Document(page_content=d["page_content"], metadata=d["metadata"]) for d in item.value["documents"]]
+        return item.value["expires_at"], documents
+
+    def _encode_disk(self, source: str, normalized: str, documents: list[Document], expires_at: float) -> dict:
+        return {
+            "source": source,
+            "query": normalized,
+            "expires_at": expires_at,
+            "documents": [{"page_content": d.page_content, "metadata": d.metadata} for d in documents],
+        }
+
+    # Disk tier
+    def _disk_get(self, source: str, normalized: str) -> Optional[tuple[float, list[Document]]]:
+        """Fresh disk entry for the key, deleting it if it expired."""
+        namespace, key = (DISK_NAMESPACE, source), self._disk_key(normalized)
+        item = self._disk.get(namespace, key)
+        if item is None:
+            return None
+        if self._expired(item):
+            self._disk.delete(namespace, key)
+            self._stats.disk_expired += 1
+            return None
+        return self._decode_disk(item)
+
+    async def _adisk_get(self, source: str, normalized: str) -> Optional[tuple[float, list[Document]]]:
+        namespace, key = (DISK_NAMESPACE, source), self._disk_key(normalized)
+        item = await self._disk.aget(namespace, key)
+        if item is None:
+            return None
+        if self._expired(item):
+            await self._disk.adelete(namespace, key)
+            self._stats.disk_expired += 1
+            return None
+        return self._decode_disk(item)
+
+    def _sweep_due(self) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            if now < self._next_sweep:
+                return False
+            self._next_sweep = now + self.sweep_interval
+            return True
+
+    def _sweep_done(self, sweep: asyncio.Task) -> None:
+        self._sweeps.discard(sweep)
+        if not sweep.cancelled() and sweep.exception() is not None:
+            logger.warning("Retrieval cache sweep failed: %s", sweep.exception())
+
+    def _expired_deletes(self, items) -> list[PutOp]:
+        return [PutOp(item.namespace, item.key, None) for item in items]
+
+    def purge_expired(self) -> int:
+        """Delete every expired entry from the disk tier; returns how many were removed."""
+        if self._disk is None:
+            return 0
+        removed = 0
+        while True:
+            expired = self._disk.search(
+                (DISK_NAMESPACE,), filter={"expires_at": {"$lt": time.time()}}, limit=SWEEP_BATCH
+            )
+            if expired:
+                self._disk.batch(self._expired_deletes(expired))
+                removed += len(expired)
+            if len(expired) < SWEEP_BATCH:
+                break
+        self._stats.disk_expired += removed
+        return removed
+
+    async def apurge_expired(self) -> int:
+        """Async version of purge_expired."""
+        if self._disk is None:
+            return 0
+        removed = 0
+        while True:
+            expired = await self._disk.asearch(
+                (DISK_NAMESPACE,), filter={"expires_at": {"$lt": time.time()}}, limit=SWEEP_BATCH
+            )
+            if expired:
+                await self._disk.abatch(self._expired_deletes(expired))
+                removed += len(expired)
+            if len(expired) < SWEEP_BATCH:
+                break
+        self._stats.disk_expired += removed
+        return removed
+
+    # Async API
+    async def aget_or_fetch(
+            self,
+            source: str,
+            query: str,
+            fetch: Callable[[], Awaitable[list[Document]]],
+    ) -> list[Document]:
+        """Return cached documents for (source, query), calling `fetch` once on a miss."""
+        normalized = normalize_query(query)
+        key = (source, normalized)
+
+        documents = self._memory_get(key)
+        if documents is not None:
+            self._stats.hits += 1
+            self._stats.count(source, "hits")
+            return list(documents)
+
+        loop_key = (id(asyncio.get_running_loop()), source, normalized)
+        task = self._inflight.get(loop_key)
+        if task is not None:
+            self._stats.deduplicated += 1
+        else:
+            task = asyncio.ensure_future(self._afill(key, fetch))
+            self._inflight[loop_key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(loop_key, None))
+        return list(await asyncio.shield(task))
+
+    async def _afill(self, key: tuple[str, str], fetch) -> list[Document]:
+        source, normalized = key
+        if self._disk is not None:
+            hit = await self._adisk_get(source, normalized)
+            if hit is not None:
+                self._stats.disk_hits += 1
+                self._stats.count(source, "hits")
+                self._memory_put(key, hit[1], hit[0])
+                return hit[1]
+
+        self._stats.misses += 1
+        self._stats.count(source, "misses")
+        start = time.perf_counter()
+        try:
+            documents = await fetch()
+        except Exception:
+            self._stats.upstream_errors += 1
+            raise
+        finally:
+            self._stats.upstream_calls += 1
+            self._stats.upstream_seconds += time.perf_counter() - start
+
+        expires_at = time.time() + self._ttl(source)
+        self._memory_put(key, documents, expires_at)
+        if self._disk is not None:
+            await self._disk.aput(
+                (DISK_NAMESPACE, source), self._disk_key(normalized),
+                self._encode_disk(source, normalized, documents, expires_at),
+            )
+            if self._sweep_due():
+                # In the background: the waiting callers need the documents, not the sweep
+                sweep = asyncio.ensure_future(self.apurge_expired())
+                self._sweeps.add(sweep)
+                sweep.add_done_callback(self._sweep_done)
+        return documents
+
+    # Sync API
+    def get_or_fetch(self, source: str, query: str, fetch: Callable[[], list[Document]]) -> list[Document]:
+        """Sync version of aget_or_fetch for sync callers (no single-flight across threads)."""
+        normalized = normalize_query(query)
+        key = (source, normalized)
+        documents = self._memory_get(key)
+        if documents is not None:
+            self._stats.hits += 1
+            self._stats.count(source, "hits")
+            return list(documents)
+
+        if self._disk is not None:
+            hit = self._disk_get(source, normalized)
+            if hit is not None:
+                self._stats.disk_hits += 1
+                self._stats.count(source, "hits")
+                self._memory_put(key, hit[1], hit[0])
+                return list(hit[1])
+
+        self._stats.misses += 1
+        self._stats.count(source, "misses")
+        start = time.perf_counter()
+        try:
+            documents = fetch()
+        except Exception:
+            self._stats.upstream_errors += 1
+            raise
+        finally:
+            self._stats.upstream_calls += 1
+            self._stats.upstream_seconds += time.perf_counter() - start
+
+        expires_at = time.time() + self._ttl(source)
+        self._memory_put(key, documents, expires_at)
+        if self._disk is not None:
+            self._disk.put(
+                (DISK_NAMESPACE, source), self._disk_key(normalized),
+                self._encode_disk(source, normalized, documents, expires_at),
+            )
+            if self._sweep_due():
+                self.purge_expired()
+        return list(documents)
+
+    # Maintenance
+    def invalidate(self, source: Optional[str] = None) -> None:
+        """Drop memory-tier entries (of one source, or all)."""
+        with self._lock:
+            for key in [k for k in self._memory if source is None or k[0] == source]:
+                del self._memory[key]
+
+    def stats(self) -> dict:
+        s = self._stats
+        lookups = s.hits + s.disk_hits + s.misses + s.deduplicated
+        return {
+            "hits": s.hits,
+            "disk_hits": s.disk_hits,
+            "misses": s.misses,
+            "deduplicated": s.deduplicated,
+            "hit_rate": round((lookups - s.misses) / lookups, 4) if lookups else 0.0,
+            "upstream_calls": s.upstream_calls,
+            "upstream_errors": s.upstream_errors,
+            "upstream_mean_latency_s": round(s.upstream_seconds / s.upstream_calls, 4) if s.upstream_calls else 0.0,
+            "upstream_calls_saved": lookups - s.upstream_calls,
+            "disk_expired_removed": s.disk_expired,
+            "entries": len(self._memory),
+            "per_source": s.per_source,
+        }
@@ -0,0 +1,362 @@
+"""
+Safe, compiled arithmetic expressions for calculator tools.
+
+`eval(expression)` on model-generated text runs arbitrary Python, and re-parses the same
+formula on every call. `Calculator` instead:
+
+- Parses an expression into an AST and accepts only arithmetic: numbers, + - * / // % **,
+  unary +/-, parentheses, the constants pi/e/tau, whitelisted math functions (sqrt, log,
+  sin, ...) and free variables. Attributes, subscripts, lambdas, comprehensions, names
+  starting with "_" and keyword arguments are rejected with `UnsafeExpressionError`.
+- Guards `**` against huge integer results (e.g. `9**9**9`), limits round()'s `ndigits`
+  (`round(1, -10**9)` would build 10**(10**9) inside CPython) and caps expression length.
+- Compiles each accepted expression once and keeps it in an LRU keyed by its text, so a
+  repeated formula costs one dictionary lookup.
+- Evaluates with exact Python semantics (`evaluate`), or vectorised with NumPy (float64):
+  `evaluate_batch` runs one expression over arrays of variable bindings, and
+  `evaluate_many` runs many expressions, grouping those with the same shape (e.g. "2*3+1"
+  and "4*5+2") into one vectorised evaluation over their numbers. In the NumPy paths an
+  invalid result is inf or nan (division by zero, log of a negative, ...) instead of an error.
+
+Usage:
+    from codes.utils.safe_calculator import default_calculator
+
+    default_calculator.evaluate("2 * (3 + 4) ** 2")                  # 98
+    default_calculator.evaluate("r * sqrt(x)", r=2, x=9)             # 6.0
+    default_calculator.evaluate_batch("a * x + b", {"a": 2, "b": 1, "x": np.arange(1e6)})
+    default_calculator.evaluate_many(["2+2", "10*5", "3+4"])         # array([4., 50., 7.])
+"""
+# Import libraries
+import re
+import ast
+import math
+import threading
+from functools import reduce
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Iterable, Mapping, Union
+
+import numpy as np
+
+Number = Union[int, float]
+
+MAX_EXPRESSION_LENGTH = 1000
+MAX_POWER_BITS = 100_000  # largest integer result of ** (about 30k digits)
+MAX_ROUND_DIGITS = 100  # largest |ndigits| of round()
+
+CONSTANTS = {"pi": math.pi, "e": math.e, "tau": math.tau}
+
+# name: (scalar implementation, NumPy implementation)
+FUNCTIONS = {
+    "abs": (abs, np.abs),
+    "round": (lambda number, ndigits=None: _checked_round(number, ndigits),
+              lambda values, decimals=0: _checked_vector_round(values, decimals)),
+    "min": (min, lambda *args: reduce(np.minimum, args)),
+    "max": (max, lambda *args: reduce(np.maximum, args)),
+    "sqrt": (math.sqrt, np.sqrt),
+    "exp": (math.exp, np.exp),
+    "log": (math.log, np.log),
+    "log10": (math.log10, np.log10),
+    "log2": (math.log2, np.log2),
+    "sin": (math.sin, np.sin),
+    "cos": (math.cos, np.cos),
+    "tan": (math.tan, np.tan),
+    "asin": (math.asin, np.arcsin),
+    "acos": (math.acos, np.arccos),
+    "atan": (math.atan, np.arctan),
+    "floor": (math.floor, np.floor),
+    "ceil": (math.ceil, np.ceil),
+    "hypot": (math.hypot, np.hypot),
+}
+
+_BIN_OPS = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow)
+_UNARY_OPS = (ast.UAdd, ast.USub)
+_POW = "_pow"
+
+# Numeric literals, for grouping expressions by shape in evaluate_many
+_NUMBER = re.compile(r"(?<![\w.])(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?")
+_LEADING_ZERO = re.compile(r"(?<![\w.])0\d")
+
+
+class UnsafeExpressionError(ValueError):
+    """Raised for expressions outside the calculator's arithmetic subset."""
+
+
+def _checked_pow(base: Number, exponent: Number) -> Number:
+    if isinstance(base, int) and isinstance(exponent, int) and exponent > 0:
+        if abs(base).bit_length() * exponent > MAX_POWER_BITS:
+            raise OverflowError("power result too large")
+    return base ** exponent
+
+
+def _checked_round(number: Number, ndigits: Any = None) -> Number:
+    # round(int, -n) computes 10**n without going through **, so it needs its own bound
+    if ndigits is not None and abs(ndigits) > MAX_ROUND_DIGITS:
+        raise OverflowError(f"round() digits beyond {MAX_ROUND_DIGITS}")
+    return round(number, ndigits)
+
+
+def _checked_vector_round(values: Any, decimals: Any = 0) -> Any:
+    decimals = np.asarray(decimals)
+    if np.any(np.abs(decimals) > MAX_ROUND_DIGITS):
+        raise OverflowError(f"round() digits beyond {MAX_ROUND_DIGITS}")
+    if np.any(decimals != np.trunc(decimals)):
+        raise TypeError("round() digits must be integers")
+    if decimals.ndim == 0:
+        return np.round(values, int(decimals))
+    # np.round takes one digit count: round each group of equal digits (evaluate_many)
+    values, decimals = np.broadcast_arrays(np.asarray(values, dtype=np.float64), decimals)
+    rounded = np.empty(values.shape)
+    for digits in np.unique(decimals):
+        mask = decimals == digits
+        rounded[mask] = np.round(values[mask], int(digits))
+    return rounded
+
+
+_SCALAR_NAMESPACE = {**CONSTANTS, **{name: impl[0] for name, impl in FUNCTIONS.items()}, _POW: _checked_pow}
+_VECTOR_NAMESPACE = {**CONSTANTS, **{name: impl[1] for name, impl in FUNCTIONS.items()}, _POW: np.power}
+
+
+class _Validator(ast.NodeTransformer):
+    """Reject anything but arithmetic; rewrite `a ** b` to the guarded `_pow(a, b)`."""
+
+    def __init__(self, placeholders: int = 0):
+        self.variables: set[str] = set()
+        # `_c0, _c1, ...` stand for the numbers of a templated expression (see evaluate_many)
+        self.placeholders = {f"_c{i}" for i in range(placeholders)}
+
+    def generic_visit(self, node: ast.AST) -> ast.AST:
+        raise UnsafeExpressionError(f"{type(node).__name__} is not allowed in an expression")
+
+    def visit_Expression(self, node: ast.Expression) -> ast.AST:
+        node.body = self.visit(node.body)
+        return node
+
+    def visit_Constant(self, node: ast.Constant) -> ast.AST:
+        if type(node.value) not in (int, float):
+            raise UnsafeExpressionError(f"unsupported literal {node.value!r}")
+        return node
+
+    def visit_Name(self, node: ast.Name) -> ast.AST:
+        if node.id in self.placeholders:
+            return node
+        if node.id.startswith("_"):
+            raise UnsafeExpressionError(f"name {node.id!r} is not allowed")
+        if node.id in FUNCTIONS:
+            raise UnsafeExpressionError(f"{node.id} is a function, call it as {node.id}(...)")
+        if node.id not in CONSTANTS:
+            self.variables.add(node.id)
+        return node
+
+    def visit_UnaryOp(self, node: ast.UnaryOp) -> ast.AST:
+        if not isinstance(node.op, _UNARY_OPS):
+            raise UnsafeExpressionError(f"operator {type(node.op).__name__} is not allowed")
+        node.operand = self.visit(node.operand)
+        return node
+
+    def visit_BinOp(self, node: ast.BinOp) -> ast.AST:
+        if isinstance(node.op, ast.BitXor):
+            raise UnsafeExpressionError("'^' is not a power operator, use '**'")
+        if not isinstance(node.op, _BIN_OPS):
+            raise UnsafeExpressionError(f"operator {type(node.op).__name__} is not allowed")
+        left, right = self.visit(node.left), self.visit(node.right)
+        if isinstance(node.op, ast.Pow):
+            return ast.copy_location(ast.Call(ast.Name(_POW, ast.Load()), [left, right], []), node)
+        node.left, node.right = left, right
+        return node
+
+    def visit_Call(self, node: ast.Call) -> ast.AST:
+        if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS:
+            name = node.func.id if isinstance(node.func, ast.Name) else type(node.func).__name__
+            raise UnsafeExpressionError(f"function {name!r} is not allowed")
+        if node.keywords or any(isinstance(arg, ast.Starred) for arg in node.args):
+            raise UnsafeExpressionError("only positional arguments are allowed")
+        node.args = [self.visit(arg) for arg in node.args]
+        return node
+
+
+def _parse(expression: str, placeholders: int = 0) -> tuple[ast.Expression, frozenset[str]]:
+    if len(expression) > MAX_EXPRESSION_LENGTH:
+        raise UnsafeExpressionError(f"expression longer than {MAX_EXPRESSION_LENGTH} characters")
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+    except SyntaxError as e:
+        raise UnsafeExpressionError(f"invalid expression: {e.msg}") from None
+    validator = _Validator(placeholders)
+    tree = ast.fix_missing_locations(validator.visit(tree))
+    return tree, frozenset(validator.variables)
+
+
+@dataclass(frozen=True)
+class CompiledExpression:
+    """A validated expression compiled to a code object."""
+    expression: str
+    variables: frozenset[str]
+    code: Any
+
+    def __call__(self, **variables: Any) -> Any:
+        missing = self.variables - variables.keys()
+        if missing:
+            raise UnsafeExpressionError(f"missing values for {sorted(missing)}")
+        return eval(self.code, {"__builtins__": {}}, {**variables, **_SCALAR_NAMESPACE})
+
+    def vectorized(self, **variables: Any) -> np.ndarray:
+        """Evaluate with NumPy over array-valued variables (broadcast, float64)."""
+        missing = self.variables - variables.keys()
+        if missing:
+            raise UnsafeExpressionError(f"missing values for {sorted(missing)}")
+        arrays = {name: np.asarray(value, dtype=np.float64) for name, value in variables.items()}
+        with np.errstate(all="ignore"):
+            return np.asarray(eval(self.code, {"__builtins__": {}}, {**arrays, **_VECTOR_NAMESPACE}), dtype=np.float64)
+
+
+class Calculator:
+    """
+    Safe expression evaluator with an LRU of compiled expressions.
+
+    Args:
+        max_entries: Compiled expressions kept in the LRU (and as many expression shapes).
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._compiled: OrderedDict[str, CompiledExpression] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _lookup(cache: OrderedDict, key: str) -> Any:
+        value = cache.get(key)
+        if value is not None:
+            cache.move_to_end(key)
+        return value
+
+    def _store(self, cache: OrderedDict, key: str, value: Any):
+        cache[key] = value
+        if len(cache) > self.max_entries:
+            cache.popitem(last=False)
+
+    def compile(self, expression: str) -> CompiledExpression:
+        """Validated, compiled form of `expression` (cached by its text)."""
+        with self._lock:
+            compiled = self._lookup(self._compiled, expression)
+            if compiled is not None:
+                self.hits += 1
+                return compiled
+            self.misses += 1
+        tree, variables = _parse(expression)
+        compiled = CompiledExpression(expression, variables, compile(tree, "<calculator>", "eval"))
+        with self._lock:
+            self._store(self._compiled, expression, compiled)
+        return compiled
+
+    def evaluate(self, expression: str, **variables: Number) -> Number:
+        """Evaluate with Python semantics (exact integers, errors raised)."""
+        return self.compile(expression)(**variables)
+
+    def evaluate_batch(
+            self,
+            expression: str,
+            bindings: Union[Mapping[str, Any], Iterable[Mapping[str, Number]]],
+    ) -> np.ndarray:
+        """
+        Evaluate one expression over many variable bindings with NumPy.
+
+        Args:
+            expression: Expression using the bound variables.
+            bindings: Either columns ({name: array or scalar}, broadcast together) or rows
+                (an iterable of {name: value} dicts).
+
+        Returns:
+            float64 array with one result per binding (inf/nan where the result is invalid).
+        """
+        if not isinstance(bindings, Mapping):
+            rows = list(bindings)
+            names = self.compile(expression).variables
+            bindings = {name: [row[name] for row in rows] for name in names}
+        return self.compile(expression).vectorized(**bindings)
+
+    def _constant(self, expression: str) -> tuple[CompiledExpression, list[float]]:
+        compiled = self.compile(expression)
+        if compiled.variables:
+            raise UnsafeExpressionError(f"unbound variables {sorted(compiled.variables)} in {expression!r}")
+        return compiled, []
+
+    def _template(self, expression: str) -> tuple[CompiledExpression, list[float]]:
+        """Compiled shape of a constant expression and its numbers, e.g. "_c0 * _c1", [2.0, 3.0]."""
+        if "_" in expression or _LEADING_ZERO.search(expression):
+            # "1_000", "007" or names like "_c0" would not template by text: compile it as is
+            return self._constant(expression)
+
+        constants = []
+
+        def placeholder(match: re.Match) -> str:
+            constants.append(float(match.group()))
+            return f"_c{len(constants) - 1}"
+
+        shape = _NUMBER.sub(placeholder, expression)
+        with self._lock:
+            compiled = self._lookup(self._compiled, shape)
+        if compiled is None:
+            try:
+                tree, variables = _parse(shape, placeholders=len(constants))
+            except UnsafeExpressionError:
+                # Other literal forms ("0x1f", "2j") or an invalid expression: report on the original
+                return self._constant(expression)
+            if variables:
+                raise UnsafeExpressionError(f"unbound variables {sorted(variables)} in {expression!r}")
+            names = frozenset(f"_c{i}" for i in range(len(constants)))
+            compiled = CompiledExpression(shape, names, compile(tree, "<calculator>", "eval"))
+            with self._lock:
+                self._store(self._compiled, shape, compiled)
+        return compiled, constants
+
+    def evaluate_many(self, expressions: Iterable[str]) -> np.ndarray:
+        """
+        Evaluate many constant expressions with NumPy, one vectorised pass per shape.
+
+        Returns:
+            float64 array aligned with `expressions` (inf/nan where the result is invalid).
+        """
+        expressions = list(expressions)
+        groups: dict[int, tuple[CompiledExpression, list[int], list[list[float]]]] = {}
+        for i, expression in enumerate(expressions):
+            compiled, constants = self._template(expression)
+            _, indices, rows = groups.setdefault(id(compiled), (compiled, [], []))
+            indices.append(i)
+            rows.append(constants)
+
+        results = np.empty(len(expressions), dtype=np.float64)
+        for compiled, indices, rows in groups.values():
+            columns = np.asarray(rows, dtype=np.float64).reshape(len(rows), -1)
+            values = {f"_c{j}": columns[:, j] for j in range(columns.shape[1])}
+            results[indices] = np.broadcast_to(compiled.vectorized(**values), len(indices))
+        return results
+
+    def stats(self) -> dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            "compiled": len(self._compiled),
+        }
+
+
+default_calculator = Calculator()
+
+
+def safe_eval(expression: str, **variables: Number) -> Number:
+    """`eval` replacement for arithmetic, using the shared default calculator."""
+    return default_calculator.evaluate(expression, **variables)
+
+
+# Public API
+__all__ = [
+    'Calculator',
+    'CompiledExpression',
+    'UnsafeExpressionError',
+    'default_calculator',
+    'safe_eval',
+]
@@ -0,0 +1,329 @@
+"""
+File-backed long-term memory store.
+
+SqliteStore is a drop-in replacement for InMemoryStore that survives restarts and keeps
+the working set on disk instead of in the Python heap.
+
+- One table indexed on (namespace, key); namespace prefix listing is a range scan on that index.
+- Puts inside one batch() call are written in a single transaction.
+- WAL mode + busy timeout, so several worker processes on one host can share a file.
+- Optional LRU read cache; it is dropped whenever another connection commits (detected
+  with `PRAGMA data_version`) and when a thread's connection first reads through it, so
+  cached reads never go stale across processes.
+
+Semantic (vector) search is not supported; SearchOp with a `query` is served as a filtered scan.
+
+Usage:
+    from codes.utils.sqlite_store import SqliteStore
+
+    store = SqliteStore("memory.db", cache_size=10_000)
+    graph = builder.compile(checkpointer=memory, store=store)
+"""
+# Import libraries
+import json
+import asyncio
+import sqlite3
+import threading
+from pathlib import Path
+from datetime import datetime, timezone
+from collections import OrderedDict
+from typing import Any, Iterable, Optional, Union
+
+from langgraph.store.base import (
+    BaseStore,
+    GetOp,
+    Item,
+    ListNamespacesOp,
+    Op,
+    PutOp,
+    Result,
+    SearchItem,
+    SearchOp,
+)
+from langgraph.store.memory import _compare_values, _does_match
+
+# Namespace parts are joined with the ASCII unit separator, which cannot appear in labels
+# typed by users and sorts before every printable character (so prefix scans are ranges).
+SEP = "\x1f"
+_UPPER = chr(ord(SEP) + 1)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS store (
+    namespace  TEXT NOT NULL,
+    key        TEXT NOT NULL,
+    value      TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (namespace, key)
+) WITHOUT ROWID
+"""
+
+_MISSING = object()
+
+
+def _encode_namespace(namespace: tuple[str, ...]) -> str:
+    return SEP.join(namespace)
+
+
+def _decode_namespace(text: str) -> tuple[str, ...]:
+    return tuple(text.split(SEP)) if text else ()
+
+
+def _prefix_clause(prefix: tuple[str, ...]) -> tuple[str, list]:
+    """SQL condition selecting `prefix` itself and every namespace below it."""
+    if not prefix:
+        return "1", []
+    encoded = _encode_namespace(prefix)
+    return (
+        "(namespace = ? OR (namespace >= ? AND namespace < ?))",
+        [encoded, encoded + SEP, encoded + _UPPER],
+    )
+
+
+class SqliteStore(BaseStore):
+    """
+    SQLite-backed BaseStore.
+
+    Args:
+        path: Database file (created if missing). ":memory:" is allowed for tests.
+        cache_size: Entries kept in the LRU read cache; 0 disables it.
+        timeout: Seconds to wait for a lock held by another process before failing.
+    """
+
+    def __init__(self, path: Union[str, Path], *, cache_size: int = 0, timeout: float = 30.0):
+        self.path = str(path)
+        self.cache_size = cache_size
+        self.timeout = timeout
+        self._local = threading.local()
+        self._cache: OrderedDict[tuple[str, str], Optional[Item]] = OrderedDict()
+        self._cache_lock = threading.Lock()
+        # Bumped on every invalidation so a read racing a write never caches the old row
+        self._cache_generation = 0
+        self._shared_conn: Optional[sqlite3.Connection] = None
+        if self.path == ":memory:":
+            # Every connection to ":memory:" is a separate database, so share one
+            self._shared_conn = self._connect()
+            self._shared_lock = threading.Lock()
+        else:
+            self._conn()
+
+    # Connections
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.path, timeout=self.timeout, isolation_level=None, check_same_thread=False
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={int(self.timeout * 1000)}")
+        conn.execute(SCHEMA)
+        return conn
+
+    def _conn(self) -> sqlite3.Connection:
+        """Connection owned by the calling thread."""
+        if self._shared_conn is not None:
+            return self._shared_conn
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def close(self) -> None:
+        """Close the calling thread's connection."""
+        conn = getattr(self._local, "conn", None) or self._shared_conn
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # BaseStore API
+    def batch(self, ops: Iterable[Op]) -> list[Result]:
+        ops = list(ops)
+        results: list[Result] = [None] * len(ops)
+        conn = self._conn()
+        lock = getattr(self, "_shared_lock", None)
+        if lock is not None:
+            with lock:
+                self._run_batch(conn, ops, results)
+        else:
+            self._run_batch(conn, ops, results)
+        return results
+
+    async def abatch(self, ops: Iterable[Op]) -> list[Result]:
+        return await asyncio.get_running_loop().run_in_executor(None, self.batch, list(ops))
+
+    def _run_batch(self, conn: sqlite3.Connection, ops: list[Op], results: list[Result]):
+        # Like InMemoryStore, reads see the state before this batch's writes
+        puts = []
+        for i, op in enumerate(ops):
+            if isinstance(op, GetOp):
+                results[i] = self._get(conn, op.namespace, op.key)
+            elif isinstance(op, SearchOp):
+                results[i] = self._search(conn, op)
+            elif isinstance(op, ListNamespacesOp):
+                results[i] = self._list_namespaces(conn, op)
+            elif isinstance(op, PutOp):
+                puts.append(op)
+            else:
+                raise ValueError(f"Unknown operation type: {type(op)}")
+
+        # All writes of the batch go into one transaction
+        if puts:
+            self._apply_puts(conn, puts)
+
+    # Writes
+    def _apply_puts(self, conn: sqlite3.Connection, puts: list[PutOp]):
+        # Last write wins for repeated (namespace, key) pairs within a batch
+        latest: dict[tuple[str, str], PutOp] = {}
+        for op in puts:
+            latest[(_encode_namespace(op.namespace), op.key)] = op
+
+        now = datetime.now(timezone.utc).isoformat()
+        upserts = [
+            (ns, key, json.dumps(op.value), now, now)
+            for (ns, key), op in latest.items() if op.value is not None
+        ]
+        deletes = [(ns, key) for (ns, key), op in latest.items() if op.value is None]
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if upserts:
+                conn.executemany(
+                    "INSERT INTO store (namespace, key, value, created_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT(namespace, key) DO UPDATE SET "
+                    "value = excluded.value, updated_at = excluded.updated_at",
+                    upserts,
+                )
+            if deletes:
+                conn.executemany("DELETE FROM store WHERE namespace = ? AND key = ?", deletes)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+        if self.cache_size:
+            with self._cache_lock:
+                self._cache_generation += 1
+                for cache_key in latest:
+                    self._cache.pop(cache_key, None)
+
+    # Reads
+    def _sync_cache(self, conn: sqlite3.Connection):
+        """Drop the read cache if another connection committed since we last looked."""
+        # data_version is per connection and its values cannot be compared across
+        # connections, so track the last value seen by each thread. A thread's first look
+        # has nothing to compare with: another process may have committed after the other
+        # threads last checked, so the cache is dropped then too.
+        version = conn.execute("PRAGMA data_version").fetchone()[0]
+        if version != getattr(self._local, "data_version", None):
+            self._cache.clear()
+            self._cache_generation += 1
+            self._local.data_version = version
+
+    def _get(self, conn: sqlite3.Connection, namespace: tuple[str, ...], key: str) -> Optional[Item]:
+        cache_key = (_encode_namespace(namespace), key)
+        if self.cache_size:
+            with self._cache_lock:
+                self._sync_cache(conn)
+                cached = self._cache.get(cache_key, _MISSING)
+                if cached is not _MISSING:
+                    self._cache.move_to_end(cache_key)
+                    return cached
+                generation = self._cache_generation
+
+        row = conn.execute(
+            "SELECT value, created_at, updated_at FROM store WHERE namespace = ? AND key = ?",
+            cache_key,
+        ).fetchone()
+        item = None
+        if row is not None:
+            item = Item(
+                value=json.loads(row[0]), key=key, namespace=namespace,
+                created_at=row[1], updated_at=row[2],
+            )
+
+        if self.cache_size:
+            with self._cache_lock:
+                if generation == self._cache_generation:
+                    self._cache[cache_key] = item
+                    if len(self._cache) > self.cache_size:
+                        self._cache.popitem(last=False)
+        return item
+
+    def _search(self, conn: sqlite3.Connection, op: SearchOp) -> list[SearchItem]:
+        clause, params = _prefix_clause(op.namespace_prefix)
+        sql = f"SELECT namespace, key, value, created_at, updated_at FROM store WHERE {clause} ORDER BY namespace, key"
+        if not op.filter:
+            sql += " LIMIT ? OFFSET ?"
+            params += [op.limit, op.offset]
+
+        items = []
+        skipped = 0
+        for ns, key, value, created_at, updated_at in conn.execute(sql, params):
+            value = json.loads(value)
+            if op.filter:
+                if not all(_compare_values(value.get(k), v) for k, v in op.filter.items()):
+                    continue
+                if skipped < op.offset:
+                    skipped += 1
+                    continue
+            items.append(SearchItem(
+                namespace=_decode_namespace(ns), key=key, value=value,
+                created_at=created_at, updated_at=updated_at,
+            ))
+            if len(items) >= op.limit:
+                break
+        return items
+
+    def _list_namespaces(self, conn: sqlite3.Connection, op: ListNamespacesOp) -> list[tuple[str, ...]]:
+        # A literal prefix (up to the first wildcard) narrows the scan through the index
+        literal: tuple[str, ...] = ()
+        for condition in op.match_conditions or ():
+            if condition.match_type == "prefix":
+                for part in condition.path:
+                    if part == "*":
+                        break
+                    literal += (part,)
+                break
+
+        namespaces = []
+        seen = set()
+        for ns in self._distinct_namespaces(conn, literal):
+            namespace = _decode_namespace(ns)
+            if op.match_conditions and not all(_does_match(c, namespace) for c in op.match_conditions):
+                continue
+            if op.max_depth is not None:
+                namespace = namespace[:op.max_depth]
+            if namespace not in seen:
+                seen.add(namespace)
+                namespaces.append(namespace)
+        return namespaces[op.offset:op.offset + op.limit]
+
+    @staticmethod
+    def _distinct_namespaces(conn: sqlite3.Connection, prefix: tuple[str, ...]) -> Iterable[str]:
+        """Yield distinct namespaces under `prefix` with one index seek per namespace (skip scan)."""
+        encoded = _encode_namespace(prefix)
+        upper = encoded + _UPPER if prefix else None
+        sql = "SELECT MIN(namespace) FROM store WHERE namespace {} ?" + (" AND namespace < ?" if upper else "")
+        params = [encoded] + ([upper] if upper else [])
+
+        row = conn.execute(sql.format(">="), params).fetchone()
+        while row and row[0] is not None:
+            ns = row[0]
+            if not prefix or ns == encoded or ns.startswith(encoded + SEP):
+                yield ns
+            params[0] = ns
+            row = conn.execute(sql.format(">"), params).fetchone()
+
+    # Introspection
+    def count(self, namespace_prefix: tuple[str, ...] = ()) -> int:
+        """Number of items stored under `namespace_prefix`."""
+        clause, params = _prefix_clause(namespace_prefix)
+        return self._conn().execute(f"SELECT COUNT(*) FROM store WHERE {clause}", params).fetchone()[0]
+
+    def put_many(self, namespace: tuple[str, ...], items: dict[str, Any]) -> None:
+        """Write many items of one namespace in a single transaction."""
+        self.batch(PutOp(namespace, key, value) for key, value in items.items())
+
+
+# Public API
+__all__ = ['SqliteStore']
@@ -0,0 +1,159 @@
+"""
+Cached, incremental token accounting for message histories.
+
+`trim_messages(..., token_counter=model)` recounts the whole history on every call, through
+the provider's tokenizer, so keeping a chat within budget costs O(history) per turn.
+This module counts each message once and keeps the budget window in graph state:
+
+- TokenCounter: per-message counts cached by (message id, content hash), in an LRU.
+  Approximate mode (default) is offline (~4 characters per token); exact mode delegates
+  to a chat model's tokenizer (e.g. tiktoken for OpenAI models). A TokenCounter is also
+  a drop-in `token_counter` for `trim_messages`.
+- trim_to_budget: keeps a running total of the newest messages that fit in `max_tokens`
+  in a small `token_window` state value. A turn counts only the messages added since the
+  last turn and drops only the messages that fell out of the window: O(new + removed).
+
+Usage:
+    from codes.utils.token_accounting import TokenCounter, TokenWindowState, trim_to_budget
+
+    counter = TokenCounter()                       # or TokenCounter(model=get_chat_model(...))
+
+    def chat_model_node(state: TokenWindowState):
+        messages, window = trim_to_budget(state["messages"], state.get("token_window"), 1000, counter)
+        return {"messages": [llm.invoke(messages)], "token_window": window}
+"""
+# Import libraries
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Sequence
+
+from langchain_core.messages import BaseMessage, AIMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from langchain_core.language_models import BaseLanguageModel
+from langgraph.graph import MessagesState
+
+
+def message_key(message: BaseMessage) -> Hashable:
+    """Cache key for a message: its id plus a hash of everything that is counted."""
+    content = message.content
+    content_hash = hash(content) if isinstance(content, str) else hash(repr(content))
+    tool_calls = repr(message.tool_calls) if isinstance(message, AIMessage) and message.tool_calls else None
+    return message.id, message.type, message.name, content_hash, hash(tool_calls)
+
+
+class TokenCounter:
+    """
+    Per-message token counter with an LRU cache.
+
+    Args:
+        model: Chat model whose tokenizer gives exact counts; None for the offline
+            approximation.
+        chars_per_token: Characters per token in approximate mode.
+        max_entries: Cached message counts.
+    """
+
+    def __init__(
+            self,
+            model: Optional[BaseLanguageModel] = None,
+            chars_per_token: float = 4.0,
+            max_entries: int = 100_000,
+    ):
+        self.model = model
+        self.chars_per_token = chars_per_token
+        self.max_entries = max_entries
+        self._cache: OrderedDict[Hashable, int] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def mode(self) -> str:
+        return "approximate" if self.model is None else "exact"
+
+    def _count_uncached(self, message: BaseMessage) -> int:
+        if self.model is None:
+            return count_tokens_approximately([message], chars_per_token=self.chars_per_token)
+        return self.model.get_num_tokens_from_messages([message])
+
+    def count(self, message: BaseMessage) -> int:
+        """Tokens of one message, counted at most once per (id, content)."""
+        key = message_key(message)
+        with self._lock:
+            tokens = self._cache.get(key)
+            if tokens is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return tokens
+            self.misses += 1
+        tokens = self._count_uncached(message)
+        with self._lock:
+            self._cache[key] = tokens
+            if len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return tokens
+
+    def __call__(self, messages: Sequence[BaseMessage]) -> int:
+        """Total tokens of `messages`; lets the counter serve as trim_messages' token_counter."""
+        return sum(self.count(m) for m in messages)
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "mode": self.mode,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": len(self._cache),
+        }
+
+
+class TokenWindowState(MessagesState):
+    # {"start", "counted", "tokens", "last_id"}: see trim_to_budget
+    token_window: Optional[dict]
+
+
+def trim_to_budget(
+        messages: Sequence[BaseMessage],
+        window: Optional[dict],
+        max_tokens: int,
+        counter: TokenCounter,
+) -> tuple[list[BaseMessage], dict]:
+    """
+    Newest messages that fit in `max_tokens` (like trim_messages with strategy="last" and
+    allow_partial=False), using and updating the running total in `window`.
+
+    Args:
+        messages: Full message history from state.
+        window: The previous turn's window, or None on the first turn.
+        max_tokens: Token budget of the returned messages.
+        counter: Counter used for every message.
+
+    Returns:
+        The trimmed messages and the window to store back in state:
+        start (index of the oldest kept message), counted (messages accounted for),
+        tokens (total of messages[start:counted]) and last_id (id of messages[counted - 1]).
+    """
+    start, counted, tokens = 0, 0, 0
+    if window:
+        counted = window["counted"]
+        # The history must still extend the accounted prefix; if messages were removed or
+        # replaced, fall back to counting from scratch
+        if counted <= len(messages) and (counted == 0 or messages[counted - 1].id == window["last_id"]):
+            start, tokens = window["start"], window["tokens"]
+        else:
+            counted = 0
+
+    for message in messages[counted:]:
+        tokens += counter.count(message)
+    counted = len(messages)
+
+    while start < counted and tokens > max_tokens:
+        tokens -= counter.count(messages[start])
+        start += 1
+
+    window = {"start": start, "counted": counted, "tokens": tokens, "last_id": messages[-1].id if messages else None}
+    return list(messages[start:]), window
+
+
+# Public API
+__all__ = ['TokenCounter', 'TokenWindowState', 'message_key', 'trim_to_budget']
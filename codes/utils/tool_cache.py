@@ -0,0 +1,202 @@
+"""
+Opt-in result memoization for LangChain tools.
+
+Pure tools (arithmetic) and slowly changing lookups (weather, database, search) are called
+with identical arguments again and again, across agent steps, turns and threads.
+`memoize_tool` wraps such a tool so repeated calls are served from a process-wide cache:
+
+- Key: the validated arguments the model supplies, canonicalised as sorted JSON. Injected
+  arguments (InjectedToolArg, InjectedState, InjectedToolCallId, ...) are passed to the tool
+  but left out of the key, since they differ on every call.
+- Bounded LRU (`max_entries`) per tool, and a TTL per tool (None = pure, never expires).
+- Works for both sync (`invoke` / `_run`) and async (`ainvoke` / `_arun`) calls.
+- Exceptions are not cached, so a failing call is retried next time.
+- `stats()` per wrapper and `tool_cache_stats()` for all live wrappers: hits, misses, hit rate.
+
+Only memoize tools whose result depends on their model-supplied arguments alone (within the TTL).
+Tools taking an InjectedToolCallId build output for one specific call and are rejected.
+
+Usage:
+    from codes.utils.tool_cache import memoize_tool
+
+    @memoize_tool                 # pure: cached until evicted
+    @tool
+    def add(a: int, b: int) -> int: ...
+
+    weather = memoize_tool(weather_checker, ttl=600)   # refreshed every 10 minutes
+"""
+# Import libraries
+import json
+import time
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Union
+
+from pydantic import PrivateAttr
+from langchain_core.tools import BaseTool, InjectedToolCallId
+from langchain_core.tools.base import _is_injected_arg_type, get_all_basemodel_annotations
+from langchain_core.callbacks import AsyncCallbackManagerForToolRun, CallbackManagerForToolRun
+from langchain_core.utils.pydantic import get_fields
+
+_MISSING = object()
+_memoized: "weakref.WeakValueDictionary[int, MemoizedTool]" = weakref.WeakValueDictionary()
+
+
+def canonical_key(arguments: Any) -> str:
+    """Order-independent key for validated tool arguments."""
+    return json.dumps(arguments, sort_keys=True, separators=(",", ":"), default=repr)
+
+
+def _takes_tool_call_id(tool: BaseTool) -> bool:
+    """True if the tool receives the id of the tool call that runs it."""
+    schema = tool.get_input_schema()
+    return any(
+        _is_injected_arg_type(annotation, injected_type=InjectedToolCallId)
+        for annotation in get_all_basemodel_annotations(schema).values()
+    )
+
+
+def _tool_call_fields(tool: BaseTool) -> frozenset[str]:
+    """Names of the arguments the model supplies, i.e. the tool's fields minus injected ones."""
+    schema = tool.tool_call_schema
+    if isinstance(schema, dict):
+        return frozenset(schema.get("properties", {}))
+    return frozenset(get_fields(schema))
+
+
+class MemoizedTool(BaseTool):
+    """
+    Wrapper serving repeated calls of `tool` from an LRU/TTL cache.
+
+    Attributes:
+        tool: The wrapped tool; its name, description and schema are exposed unchanged.
+        ttl: Seconds a result stays valid; None for pure tools.
+        max_entries: Maximum cached results for this tool.
+    """
+    tool: BaseTool
+    ttl: Optional[float] = None
+    max_entries: int = 1024
+
+    _cache: OrderedDict = PrivateAttr(default_factory=OrderedDict)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _hits: int = PrivateAttr(default=0)
+    _misses: int = PrivateAttr(default=0)
+    _evictions: int = PrivateAttr(default=0)
+    _key_fields: Optional[frozenset[str]] = PrivateAttr(default=None)
+
+    def model_post_init(self, context: Any) -> None:
+        super().model_post_init(context)
+        _memoized[id(self)] = self
+
+    # Cache
+    def _cache_key(self, args: tuple, kwargs: dict[str, Any]) -> str:
+        if args:
+            return canonical_key(list(args))
+        if self._key_fields is None:
+            self._key_fields = _tool_call_fields(self.tool)
+        return canonical_key({name: value for name, value in kwargs.items() if name in self._key_fields})
+
+    def _lookup(self, key: str) -> Any:
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._cache.move_to_end(key)
+                    self._hits += 1
+                    return value
+                del self._cache[key]
+            self._misses += 1
+            return _MISSING
+
+    def _remember(self, key: str, value: Any) -> None:
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._cache[key] = (expires_at, value)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+                self._evictions += 1
+
+    # Tool API
+    def _run(self, *args: Any, run_manager: Optional[CallbackManagerForToolRun] = None, **kwargs: Any) -> Any:
+        key = self._cache_key(args, kwargs)
+        value = self._lookup(key)
+        if value is _MISSING:
+            tool_input = args[0] if args else kwargs
+            value = self.tool.invoke(tool_input, {"callbacks": run_manager.get_child() if run_manager else None})
+            self._remember(key, value)
+        return value
+
+    async def _arun(
+            self,
+            *args: Any,
+            run_manager: Optional[AsyncCallbackManagerForToolRun] = None,
+            **kwargs: Any,
+    ) -> Any:
+        key = self._cache_key(args, kwargs)
+        value = self._lookup(key)
+        if value is _MISSING:
+            tool_input = args[0] if args else kwargs
+            value = await self.tool.ainvoke(tool_input, {"callbacks": run_manager.get_child() if run_manager else None})
+            self._remember(key, value)
+        return value
+
+    # Maintenance
+    def clear_cache(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self._hits + self._misses
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+            "entries": len(self._cache),
+            "evictions": self._evictions,
+        }
+
+
+def memoize_tool(
+        tool: Optional[BaseTool] = None,
+        *,
+        ttl: Optional[float] = None,
+        max_entries: int = 1024,
+) -> Union[MemoizedTool, Callable[[BaseTool], MemoizedTool]]:
+    """
+    Wrap `tool` in a MemoizedTool; usable as `memoize_tool(t)`, `@memoize_tool` or `@memoize_tool(ttl=60)`.
+
+    Args:
+        tool: Tool to memoize.
+        ttl: Seconds results stay valid; None declares the tool pure.
+        max_entries: LRU capacity for this tool.
+
+    Raises:
+        ValueError: If the tool takes an InjectedToolCallId (its output belongs to one call).
+    """
+
+    def wrap(inner: BaseTool) -> MemoizedTool:
+        if _takes_tool_call_id(inner):
+            raise ValueError(
+                f"Tool {inner.name!r} takes an InjectedToolCallId, so its output is tied to one "
+                f"tool call and cannot be memoized"
+            )
+        return MemoizedTool(
+            tool=inner,
+            name=inner.name,
+            description=inner.description,
+            args_schema=inner.args_schema,
+            return_direct=inner.return_direct,
+            response_format=inner.response_format,
+            ttl=ttl,
+            max_entries=max_entries,
+        )
+
+    return wrap(tool) if tool is not None else wrap
+
+
+def tool_cache_stats() -> list[tuple[MemoizedTool, dict[str, Any]]]:
+    """Cache metrics of every live memoized tool, one (wrapper, stats) pair per wrapper."""
+    return [(memoized, memoized.stats()) for memoized in list(_memoized.values())]
@@ -17,6 +17,8 @@ from langchain.tools import tool
 from langchain_openai import ChatOpenAI
 from langchain_google_genai import ChatGoogleGenerativeAI
 
+from codes.utils.safe_calculator import safe_eval
+
 
 ######### Method 1: with_structured_output() #########
 """
@@ -52,7 +54,7 @@ Essential for building agents and interactive applications.
 def calculator(expression: str) -> str:
     """Perform mathematical calculations"""
     try:
-        result = eval(expression)
+        result = safe_eval(expression)
         return f"Result: {result}"
     except:
         return "Invalid expression"
@@ -8,13 +8,15 @@ For tools creation, there are mainly 3 methods to implement:
 Each has its own control level, below there is full description of each.
 """
 # Import libraries
+import os
+import asyncio
+import tempfile
 from typing import Optional, Type
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 from langchain_core.tools import tool, StructuredTool, BaseTool
-from langchain_core.callbacks import (
-    AsyncCallbackManagerForToolRun,
-    CallbackManagerForToolRun,
-)
+from langchain_core.callbacks import CallbackManagerForToolRun
+
+from codes.utils.safe_calculator import safe_eval
 
 ######### Method 1: @tool decorator #########
 """
@@ -29,7 +31,7 @@ Best used for quick prototyping and simple tools.
 def calculator(expression: str) -> str:
     """Calculate mathematical expressions like '2+2' or '10*5'"""
     try:
-        result = eval(expression)
+        result = safe_eval(expression)  # never eval() model output: arithmetic only, compiled once
         return f"Result: {result}"
     except Exception as e:
         return f"Error: {e}"
@@ -76,6 +78,10 @@ print(f"Calculator: {calc_result}")
 print(f"Weather: {weather_result}")
 print(f"Analysis: {analysis_result}")
 
+# Only arithmetic is evaluated; code and runaway integers come back as errors
+for expression in ["__import__('os').getcwd()", "9**9**9", "round(1, -10**9)"]:
+    print(f"Calculator({expression}): {calculator.invoke({'expression': expression})}")
+
 ######### Method 2: StructuredTool.from_function #########
 """
 StructuredTool.from_function provides more control over tool configuration.
@@ -141,7 +147,14 @@ BaseTool subclass provides maximum control over tool implementation.
 You can implement both sync (_run) and async (_arun) methods.
 Supports custom error handling, callbacks, and complex validation logic.
 Best used when you need complete control over tool behavior and lifecycle.
+
+An _arun that just calls _run blocks the event loop of an async graph while the tool runs.
+Subclassing OffloadedTool instead of BaseTool gives a real _arun: _run is offloaded to a
+bounded thread pool (I/O) or process pool (CPU-bound), with a per-tool concurrency limit and
+timeout, as the tool declares in its `execution`, `max_concurrency` and `timeout` fields.
 """
+from codes.utils.async_tools import Execution, LoopMonitor, OffloadedTool
+from codes.utils.file_sandbox import ALLOWED_EXTENSIONS, FileSandbox, Page
 
 
 class CalculatorInput(BaseModel):
@@ -153,7 +166,7 @@ class CalculatorInput(BaseModel):
     )
 
 
-class AdvancedCalculatorTool(BaseTool):
+class AdvancedCalculatorTool(OffloadedTool):
     """Advanced calculator with full error handling and validation"""
 
     name: str = "advanced_calculator"
@@ -164,6 +177,10 @@ class AdvancedCalculatorTool(BaseTool):
     args_schema: Type[BaseModel] = CalculatorInput
     return_direct: bool = False
 
+    # Async execution: a few microseconds of arithmetic are cheaper than any hand-off,
+    # so it runs on the event loop (and LoopMonitor would report it if that changes)
+    execution: Execution = "inline"
+
     def _run(
             self,
             first_number: float,
@@ -196,86 +213,112 @@ class AdvancedCalculatorTool(BaseTool):
         except Exception as e:
             return f"Calculation error: {str(e)}"
 
-    async def _arun(
-            self,
-            first_number: float,
-            second_number: float,
-            operation: str,
-            run_manager: Optional[AsyncCallbackManagerForToolRun] = None,
-    ) -> str:
-        """Execute the tool asynchronously"""
-
-        # For this example, async version is same as sync
-        # In real scenarios, you might have async I/O operations
-        return self._run(first_number, second_number, operation, None)
-
 
 class FileManagerInput(BaseModel):
     """Input schema for file manager tool"""
     action: str = Field(description="Action to perform: read, write, delete, list")
-    filename: str = Field(description="Name of the file to operate on")
+    filename: str = Field(description="Name of the file to operate on (the directory for list, '.' for the root)")
     content: Optional[str] = Field(default=None, description="Content for write operations")
+    start_line: Optional[int] = Field(default=None, description="First line to read (0-based), for paging")
+    num_lines: Optional[int] = Field(default=None, description="Number of lines to read")
+    offset: Optional[int] = Field(default=None, description="First byte to read, for paging by bytes")
+    length: Optional[int] = Field(default=None, description="Number of bytes to read")
 
 
-class FileManagerTool(BaseTool):
-    """File management tool with comprehensive functionality"""
+class FileManagerTool(OffloadedTool):
+    """File management tool backed by a sandboxed directory"""
 
     name: str = "file_manager"
     description: str = (
         "Manage files in the system. Can read, write, delete, and list files. "
+        "Large files are returned a page at a time: pass start_line/num_lines (or offset/length) "
+        "to read a slice and follow the continuation hint to read on. "
         "Use with caution as this can modify the file system."
     )
     args_schema: Type[BaseModel] = FileManagerInput
 
+    # All files live under root; each result is capped at max_tokens
+    root: str = os.environ.get("FILE_MANAGER_ROOT", os.path.join(tempfile.gettempdir(), "file_manager"))
+    max_tokens: int = 2000
+
+    # Async execution: blocking file I/O runs on the shared thread pool, 4 calls at a time
+    execution: Execution = "thread"
+    max_concurrency: int = 4
+    timeout: Optional[float] = 10.0
+
+    _sandbox: Optional[FileSandbox] = PrivateAttr(default=None)
+
+    @property
+    def sandbox(self) -> FileSandbox:
+        if self._sandbox is None:
+            self._sandbox = FileSandbox(self.root, ALLOWED_EXTENSIONS, max_tokens=self.max_tokens)
+        return self._sandbox
+
     def _run(
             self,
             action: str,
             filename: str,
             content: Optional[str] = None,
+            start_line: Optional[int] = None,
+            num_lines: Optional[int] = None,
+            offset: Optional[int] = None,
+            length: Optional[int] = None,
             run_manager: Optional[CallbackManagerForToolRun] = None,
     ) -> str:
         """Execute file operations"""
 
-        # Security check - only allow certain file types
-        allowed_extensions = ['.txt', '.md', '.json', '.csv']
-        if not any(filename.endswith(ext) for ext in allowed_extensions):
+        # Security check - only allow certain file types (list takes a directory)
+        allowed_extensions = list(ALLOWED_EXTENSIONS)
+        if action != "list" and not any(filename.endswith(ext) for ext in allowed_extensions):
             return f"Error: File type not allowed. Use: {', '.join(allowed_extensions)}"
 
         try:
             if action == "read":
-                # Simulate file reading
-                return f"Contents of {filename}: [File content would be here]"
+                page = self.sandbox.read(
+                    filename, offset=offset or 0, length=length, start_line=start_line, num_lines=num_lines
+                )
+                return self._format_page(filename, page)
 
             elif action == "write":
                 if content is None:
                     return "Error: Content is required for write operations"
-                # Simulate file writing
-                return f"Successfully wrote {len(content)} characters to {filename}"
+                written = self.sandbox.write(filename, content)
+                return f"Successfully wrote {len(content)} characters ({written} bytes) to {filename}"
 
             elif action == "delete":
-                # Simulate file deletion
+                self.sandbox.delete(filename)
                 return f"Successfully deleted {filename}"
 
             elif action == "list":
-                # Simulate directory listing
-                return "Files in directory: file1.txt, file2.md, data.json"
+                listing = self.sandbox.format_listing(filename)
+                return f"Files in {filename}:\n{listing}" if listing else f"No files in {filename}"
 
             else:
                 return f"Error: Unknown action '{action}'. Use: read, write, delete, list"
 
+        except FileNotFoundError:
+            return f"Error: {filename} does not exist"
+
         except Exception as e:
             return f"File operation error: {str(e)}"
 
-    async def _arun(
-            self,
-            action: str,
-            filename: str,
-            content: Optional[str] = None,
-            run_manager: Optional[AsyncCallbackManagerForToolRun] = None,
-    ) -> str:
-        """Async version of file operations"""
-        # In real implementation, use async file I/O
-        return self._run(action, filename, content, None)
+    @staticmethod
+    def _format_page(filename: str, page: Page) -> str:
+        """Page text with its position and, if there is more, how to continue."""
+        if page.start_line is None:
+            where = f"bytes {page.start}-{page.end}"
+            more = None if page.at_end else f"offset={page.end}"
+        elif page.next_line is None:
+            where, more = f"lines {page.start_line}-end", None
+        elif page.next_line == page.start_line:
+            # One line longer than a page: continue by bytes
+            where, more = f"part of line {page.start_line}", f"offset={page.end}"
+        else:
+            where, more = f"lines {page.start_line}-{page.next_line - 1}", f"start_line={page.next_line}"
+
+        header = f"Contents of {filename} ({where} of {page.size:,} bytes):"
+        footer = f"\n[More available: continue with {more}]" if more else ""
+        return f"{header}\n{page.text}{footer}"
 
 
 # Create instances of custom tools
@@ -299,6 +342,19 @@ print("\nBaseTool subclass results:")
 print(f"Advanced Calculator: {calc_result}")
 print(f"File Manager: {file_result}")
 
+
+# Async calls run concurrently without stalling the event loop; LoopMonitor measures that
+async def run_tools_concurrently():
+    async with LoopMonitor() as monitor:
+        await asyncio.gather(
+            advanced_calc.ainvoke({"first_number": 1, "second_number": 2, "operation": "add"}),
+            *(file_manager.ainvoke({"action": "read", "filename": "test.txt", "start_line": 0}) for _ in range(8)),
+        )
+    return monitor.stats()
+
+print(f"Event loop while running tools: {asyncio.run(run_tools_concurrently())}")
+print(f"File Manager async stats: {file_manager.stats()}")
+
 ######### Tool Information and Schema Access #########
 """
 All tools provide access to their metadata and schema information.
@@ -321,6 +377,30 @@ print_tool_info(calculator, "@tool decorator")
 print_tool_info(database_tool, "StructuredTool.from_function")
 print_tool_info(advanced_calc, "BaseTool subclass")
 
+######### Memoizing Pure Tools #########
+"""
+Agents often call the same tool with the same arguments again (the next step, the next turn,
+another thread). When a tool's result depends only on its arguments, we can wrap it with
+memoize_tool so repeated calls are served from a cache instead of re-running the tool:
+- pure tools (e.g. calculators) are cached until evicted from the LRU,
+- lookups that change slowly (weather, database, search) get a TTL.
+It works with all three tool types and for both invoke and ainvoke.
+"""
+from codes.utils.tool_cache import memoize_tool, tool_cache_stats
+
+cached_weather_checker = memoize_tool(weather_checker, ttl=600)
+cached_database_tool = memoize_tool(database_tool, ttl=60)
+cached_advanced_calc = memoize_tool(advanced_calc)
+
+for _ in range(3):
+    cached_weather_checker.invoke({"city": "London"})
+    cached_database_tool.invoke({"query": "user data", "table": "users", "limit": 5})
+    cached_advanced_calc.invoke({"first_number": 25, "second_number": 4, "operation": "multiply"})
+
+print("\nMemoized tool stats:")
+for memoized, stats in tool_cache_stats():
+    print(f"  - {memoized.name}: {stats['hits']} hits, {stats['misses']} misses")
+
 ######### Integration with Models #########
 """
 All three tool types work identically when binding to language models.
@@ -335,8 +415,8 @@ model = ChatOpenAI(model="gpt-4")
 # All tool types can be bound together
 all_tools = [
     calculator,  # @tool decorator
-    database_tool,  # StructuredTool.from_function
-    advanced_calc,  # BaseTool subclass
+    cached_database_tool,  # StructuredTool.from_function (memoized)
+    cached_advanced_calc,  # BaseTool subclass (memoized)
     file_manager  # BaseTool subclass
 ]
 
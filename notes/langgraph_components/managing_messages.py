@@ -2,69 +2,81 @@
 When we are building Chat Bots, we need to manage messages to keep the costs optimized.
 
 In langgraph, there are mainly 3 ways to do this:
-1- is to have a filter node to only keep desired number of messages in state and remove the rest.
+1- is to only keep desired number of messages in state and remove the rest.
 2- we can only pass the last message to llm while we invoke.
 3- we can trim the history based on tokens of message history.
 """
 # Import libraries
-from langchain_openai import ChatOpenAI
-from langchain_core.messages import RemoveMessage, trim_messages
+from typing import Annotated
+
+from langchain_core.messages import AnyMessage
 from langgraph.graph import MessagesState, StateGraph, START, END
 
-llm = ChatOpenAI()
+from codes.config.config import LLMProvider
+from codes.utils.llm_factory import get_chat_model
+from codes.utils.graph_registry import register_graph
+from codes.utils.message_window import message_window
+from codes.utils.token_accounting import TokenCounter, TokenWindowState, trim_to_budget
+
+
+# The shared model is created on first use, so importing this module needs no configuration
+def _llm():
+    return get_chat_model(LLMProvider.OPENAI, "gpt-3.5-turbo")
 
 
 ####### Method 1: Reduce #######
-# Nodes
-def filter_messages(state: MessagesState):
-    # Delete all but the 2 most recent messages
-    delete_messages = [RemoveMessage(id=m.id) for m in state["messages"][:-2]]
-    return {"messages": delete_messages}
+# State: the messages channel itself keeps only the 2 most recent messages, evicting the
+# oldest as new ones arrive (no RemoveMessage per old message, no filter step)
+class ReduceState(MessagesState):
+    messages: Annotated[list[AnyMessage], message_window(max_messages=2)]
 
-def chat_model_node(state: MessagesState):
-    return {"messages": [llm.invoke(state["messages"])]}
+# Node
+def reduce_chat_model_node(state: ReduceState):
+    return {"messages": [_llm().invoke(state["messages"])]}
 
 # Build graph
-builder = StateGraph(MessagesState)
-builder.add_node("filter", filter_messages)
-builder.add_node("chat_model", chat_model_node)
-builder.add_edge(START, "filter")
-builder.add_edge("filter", "chat_model")
-builder.add_edge("chat_model", END)
-graph = builder.compile()
+@register_graph("messages-reduce")
+def build_reduce_graph() -> StateGraph:
+    builder = StateGraph(ReduceState)
+    builder.add_node("chat_model", reduce_chat_model_node)
+    builder.add_edge(START, "chat_model")
+    builder.add_edge("chat_model", END)
+    return builder
 
 
 ####### Method 2: Filter #######
 # Node
-def chat_model_node(state: MessagesState):
-    return {"messages": [llm.invoke(state["messages"][-1:])]}
+def filter_chat_model_node(state: MessagesState):
+    return {"messages": [_llm().invoke(state["messages"][-1:])]}
 
 # Build graph
-builder = StateGraph(MessagesState)
-builder.add_node("chat_model", chat_model_node)
-builder.add_edge(START, "chat_model")
-builder.add_edge("chat_model", END)
-graph2 = builder.compile()
+@register_graph("messages-filter")
+def build_filter_graph() -> StateGraph:
+    builder = StateGraph(MessagesState)
+    builder.add_node("chat_model", filter_chat_model_node)
+    builder.add_edge(START, "chat_model")
+    builder.add_edge("chat_model", END)
+    return builder
 
 
 ####### Method 3: Trim #######
+# Each message is counted once (cached by id and content) and the running total of the
+# kept window lives in state, so a turn only counts new messages and drops old ones.
+# Approximate (offline) counts; use TokenCounter(model=get_chat_model(LLMProvider.OPENAI, "gpt-4o"))
+# for the model's exact tokenizer.
+token_counter = TokenCounter()
 
 # Node
-def chat_model_node(state: MessagesState):
-    messages = trim_messages(
-            state["messages"],
-            max_tokens=100,
-            strategy="last",
-            token_counter=ChatOpenAI(model="gpt-4o"),
-            allow_partial=False,
-        )
-    return {"messages": [llm.invoke(messages)]}
+def trim_chat_model_node(state: TokenWindowState):
+    messages, window = trim_to_budget(state["messages"], state.get("token_window"), max_tokens=100,
+                                      counter=token_counter)
+    return {"messages": [_llm().invoke(messages)], "token_window": window}
 
 # Build graph
-builder = StateGraph(MessagesState)
-builder.add_node("chat_model", chat_model_node)
-builder.add_edge(START, "chat_model")
-builder.add_edge("chat_model", END)
-graph3 = builder.compile()
-
-
+@register_graph("messages-trim")
+def build_trim_graph() -> StateGraph:
+    builder = StateGraph(TokenWindowState)
+    builder.add_node("chat_model", trim_chat_model_node)
+    builder.add_edge(START, "chat_model")
+    builder.add_edge("chat_model", END)
+    return builder
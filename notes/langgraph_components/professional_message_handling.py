@@ -2,108 +2,194 @@
 When we are dealing with Chat Bots, one of the biggest challenges is to manage messages history in a way that
 we keep context of the conversation, with reasonable llm costs.
 
-To do so, we need a more professional method. This script shows how to do it.
+To do so, we need a more professional method. This script shows how to do it:
+- The llm sees the rolling summary plus the newest messages that fit in a token budget.
+- Messages that fall out of that window are summarised once enough of them piled up (a token
+  budget, not a message count), and only those messages are sent with the previous summary.
+- Summarisation runs on a background writer, so no turn waits for it. A finished summary is
+  picked up by the next turn, and the messages it covers are then dropped from state.
+- Summaries live in the graph's store, so the graph must be compiled with one
+  (`get_graph()` uses `summary_store`).
+
+Prompt size and per-turn latency therefore stay flat however long the chat runs.
 """
 # Import libraries
-from typing_extensions import Annotated, TypedDict, Literal
+from typing import Optional
+from typing_extensions import Annotated, Literal
 
-from IPython.display import Image, display
-from langgraph.checkpoint.memory import MemorySaver
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langgraph.graph import StateGraph, START, END, add_messages, MessagesState
-from langchain_core.messages import AnyMessage, SystemMessage, HumanMessage, RemoveMessage
+from langgraph.store.base import BaseStore
+from langgraph.store.memory import InMemoryStore
+from langgraph.graph import StateGraph, START, END, MessagesState
+from langchain_core.messages import AnyMessage, SystemMessage, HumanMessage
+from langchain_core.runnables import RunnableConfig
 
-from codes.config.config import config
+from codes.utils.llm_factory import get_async_chat_model, get_chat_model
+from codes.utils.graph_diagram import render_diagram
+from codes.utils.graph_registry import get_compiled_graph, register_graph
+from codes.utils.message_window import keep_last, message_window
+from codes.utils.token_accounting import TokenCounter, trim_to_budget
+from codes.semantic_memory.memory_writer import MemoryWriter
 
 
-# Create ChatModel instance
-llm = ChatGoogleGenerativeAI(
-    model=config.model.model_name,
-    api_key=config.model.api_key
-)
+# Token budgets
+WINDOW_TOKENS = 1000        # newest messages sent to the llm verbatim
+SUMMARY_TRIGGER_TOKENS = 500  # messages out of the window that trigger a summary update
+
+token_counter = TokenCounter()
+
+# Store of the graph served by get_graph(); other graphs bring their own
+summary_store = InMemoryStore()
+SUMMARY_NAMESPACE = ("summary",)
+
 
 # Create graph state
 class State(MessagesState):
+    # add_messages plus keep_last(n), so summarised messages are dropped in one update
+    messages: Annotated[list[AnyMessage], message_window()]
     summary: str
+    # Running token total of the window (see trim_to_budget)
+    token_window: Optional[dict]
+    # Id of the last message handed to the summariser
+    summarized_id: Optional[str]
+
+
+# Helpers
+def _thread_id(config: RunnableConfig) -> str:
+    return config["configurable"].get("thread_id", "default")
+
+
+def _pending(state: State) -> list[AnyMessage]:
+    """Messages that left the window and were not handed to the summariser yet."""
+    messages, window = state["messages"], state.get("token_window") or {}
+    start, summarized_id = window.get("start", 0), state.get("summarized_id")
+    offset = 0
+    if summarized_id:
+        for i in range(start - 1, -1, -1):
+            if messages[i].id == summarized_id:
+                offset = i + 1
+                break
+    return messages[offset:start]
+
+
+def _require_store(store: Optional[BaseStore]) -> BaseStore:
+    if store is None:
+        raise ValueError(
+            "The chat-bot graph keeps summaries in its store: compile it with one, "
+            "e.g. get_compiled_graph('chat-bot', store=InMemoryStore())"
+        )
+    return store
 
 
-# Create Nodes
-def llm_call(state: State):
+# Background summariser
+async def extend_summary(store: BaseStore, thread_id: str, new_messages: list[AnyMessage]):
+    """Fold `new_messages` into the thread's stored summary (runs on the writer's loop)."""
+    item = await store.aget(SUMMARY_NAMESPACE, thread_id)
+    summary = item.value["summary"] if item else ""
 
-    # Get summary if exists
-    summary = state.get("summary", "")
-
-    # If summary exists, then we add it to system message
+    # Create our summarization prompt
     if summary:
-        system_message = f"summary of conversation earlier: {summary}"
-        messages = [SystemMessage(content=system_message)] + state["messages"]
+        # A summary already exists
+        summary_message = (
+            f"This is summary of the conversation to date: {summary}\n\n"
+            "Extend the summary by taking into account the new messages above:"
+        )
 
     else:
-        messages = state["messages"]
+        summary_message = "Create a summary of the conversation above:"
 
+    # Async model owned by the loop this coroutine runs on
+    response = await get_async_chat_model().ainvoke(new_messages + [HumanMessage(content=summary_message)])
+    await store.aput(SUMMARY_NAMESPACE, thread_id, {"summary": response.content, "through_id": new_messages[-1].id})
 
-    response = llm.invoke(messages)
-    return {"messages": response}
 
+summary_writer = MemoryWriter(extend_summary)
 
-def summarize_conversation(state: State):
 
-    # First, we get any existing summary
-    summary = state.get("summary", "")
+# Create Nodes
+def llm_call(state: State, config: RunnableConfig, store: Optional[BaseStore]):
+    """Answer from the stored summary plus the newest messages; the graph's store is required."""
 
-    # Create our summarization prompt
+    # Pick up the latest summary written in the background
+    item = _require_store(store).get(SUMMARY_NAMESPACE, _thread_id(config))
+    summary = item.value["summary"] if item else state.get("summary", "")
+
+    # Keep the newest messages that fit in the window budget
+    window_messages, window = trim_to_budget(
+        state["messages"], state.get("token_window"), WINDOW_TOKENS, token_counter
+    )
+
+    # If summary exists, then we add it to system message
     if summary:
-        # A summary already exists
-        summary_message = (
-            f"This is summary of the conversation to date: {summary}\n\n"
-            "Extend the summary by taking into account the new messages above:"
-        )
+        system_message = f"summary of conversation earlier: {summary}"
+        messages = [SystemMessage(content=system_message)] + window_messages
 
     else:
-        summary_message = "Create a summary of the conversation above:"
+        messages = window_messages
+
+    # The shared model is created on first use, not at import
+    response = get_chat_model().invoke(messages)
+    return {"messages": response, "summary": summary, "token_window": window}
+
+
+def summarize_conversation(state: State, config: RunnableConfig, store: Optional[BaseStore]):
+    """Queue the messages that left the window for summarising; the graph's store is required."""
+    store = _require_store(store)
+    thread_id = _thread_id(config)
 
-    # Add prompt to our history
-    messages = state["messages"] + [HumanMessage(content=summary_message)]
-    response = llm.invoke(messages)
+    # Hand the messages that left the window to the background summariser
+    pending = _pending(state)
+    summary_writer.submit(store, thread_id, pending)
+    update = {"summarized_id": pending[-1].id}
 
-    # Delete all but the 2 most recent messages
-    delete_messages = [RemoveMessage(id=m.id) for m in state["messages"][:-2]]
-    return {"summary": response.content, "messages": delete_messages}
+    # Drop the messages a finished summary already covers, shifting the window to match
+    item = store.get(SUMMARY_NAMESPACE, thread_id)
+    messages, window = state["messages"], state["token_window"]
+    covered = next((i + 1 for i in range(window["start"] - 1, -1, -1)
+                    if messages[i].id == item.value["through_id"]), 0) if item else 0
+    if covered:
+        update["messages"] = keep_last(len(messages) - covered)
+        update["token_window"] = {**window, "start": window["start"] - covered, "counted": window["counted"] - covered}
+    return update
 
 
 # Create router
 def router(state: State) -> Literal['summarize_conversation', 'END']:
     """Return the next node to execute."""
 
-    # Check if there are any messages first
-    if not state["messages"]:
-        return "END"
+    # Summarise once enough tokens fell out of the window
+    pending_tokens = token_counter(_pending(state))
+    return "summarize_conversation" if pending_tokens >= SUMMARY_TRIGGER_TOKENS else "END"
 
-    return "summarize_conversation" if len(state["messages"]) > 6 else "END"
 
+@register_graph("chat-bot")
+def build_graph() -> StateGraph:
+    workflow = StateGraph(State)
 
-workflow = StateGraph(State)
+    workflow.add_node("conversation", llm_call)
+    workflow.add_node("summarize_conversation", summarize_conversation)
 
-workflow.add_node("conversation", llm_call)
-workflow.add_node("summarize_conversation", summarize_conversation)
+    workflow.add_edge(START, "conversation")
+    workflow.add_conditional_edges("conversation", router,
+                                   {
+                                       "summarize_conversation": "summarize_conversation",
+                                       "END": END
+                                   }
+    )
+    workflow.add_edge("summarize_conversation", END)
+    return workflow
 
-workflow.add_edge(START, "conversation")
-workflow.add_conditional_edges("conversation", router,
-                               {
-                                   "summarize_conversation": "summarize_conversation",
-                                   "END": END
-                               }
-)
-workflow.add_edge("summarize_conversation", END)
 
-# Compile
-graph = workflow.compile()
-graph_image = graph.get_graph().draw_mermaid_png()
-with open("chat_bot.png", "wb") as f:
-    f.write(graph_image)
-print("Graph saved as graph.png")
+# For Studio (langgraph.json); compiled on first use, not at import
+def get_graph():
+    return get_compiled_graph("chat-bot", store=summary_store)
 
 
-# For Studio
-def get_graph():
-    return graph
+def __getattr__(name: str):
+    if name == "graph":
+        return get_graph()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+if __name__ == "__main__":
+    render_diagram(get_graph(), "chat_bot.svg")
+    print("Graph saved as chat_bot.svg")
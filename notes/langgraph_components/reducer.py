@@ -60,3 +60,19 @@ def reduce_list(left: list | None, right: list | None) -> list:
 
 class CustomReducerState(TypedDict):
     foo: Annotated[list[int], reduce_list]
+
+
+"""
+Both `operator.add` and `reduce_list` copy the whole list on every update, so a key that collects n items one
+update at a time costs O(n^2), and every checkpoint stores a full copy of the list.
+
+`append_log` returns an `AppendLog` instead: versions share one append-only buffer, so an update only costs the
+new items. Nodes read it like a list (len, index, slice, iterate), but it is not a list: `isinstance(x, list)` is
+False and `json.dumps` needs `list(x)` first. It only pays off for keys that collect many thousands of items, so
+ordinary list keys keep `operator.add`.
+"""
+from codes.utils.append_log import append_log
+
+
+class SharedListState(TypedDict):
+    foo: Annotated[list[int], append_log]
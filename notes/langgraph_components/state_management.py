@@ -5,6 +5,9 @@ for state of the graph, there are mainly 3 methods to implement:
 2. Use a DataClass.
 3. Use Pydantic's BaseModel.
 
+Plus a 4th one for large, long-running graphs: a compact __slots__ class validated only at the
+graph boundary (see codes/benchmarks/state_schemas.py for the numbers).
+
 Each has its own control level, below there is full description of each.
 """
 # Import libraries
@@ -70,6 +73,32 @@ except ValidationError as e:
     print("Validation Error:", e)
 
 
+######### Method 4: Compact __slots__ state #########
+"""
+BaseModel validates the whole state every time a node runs, which gets expensive once the state
+holds lists of records (analysts, tasks, ...). TypeDict and DataClass never validate at all.
+
+compact_state makes a __slots__ dataclass: no per-instance __dict__ (less memory, faster
+attribute access), and StateValidator checks the types once when data enters and leaves the
+graph, plus optionally a sample of node updates.
+"""
+from codes.utils.compact_state import StateValidator, compact_state
+
+@compact_state
+class CompactState:
+    name: str
+    age: int
+    gender: Literal["male", "female"]
+
+state6 = CompactState(name="Peyman", age=20, gender="male")  # No validation here, like DataClass
+compact_validator = StateValidator(CompactState)
+
+try:
+    compact_validator.validate_input({"name": "Peyman", "age": 20, "gender": "meaw"})  # At the graph boundary
+except ValidationError as e:
+    print("Validation Error:", e)
+
+
 """
 Multiple Schemas:
 
@@ -80,32 +109,34 @@ schemas.
 from typing_extensions import TypedDict
 from langgraph.graph import StateGraph, START, END
 
-class OverallState(TypedDict):
+from codes.utils.graph_registry import get_compiled_graph, register_graph
+
+class PublicState(TypedDict):
     foo: int
 
 class PrivateState(TypedDict):
     baz: int
 
-def node_1(state: OverallState) -> PrivateState:
+def node_1(state: PublicState) -> PrivateState:
     print("---Node 1---")
     return {"baz": state['foo'] + 1}
 
-def node_2(state: PrivateState) -> OverallState:
+def node_2(state: PrivateState) -> PublicState:
     print("---Node 2---")
     return {"foo": state['baz'] + 1}
 
-# Build graph
-builder = StateGraph(OverallState)
-builder.add_node("node_1", node_1)
-builder.add_node("node_2", node_2)
-
-# Logic
-builder.add_edge(START, "node_1")
-builder.add_edge("node_1", "node_2")
-builder.add_edge("node_2", END)
+# Build graph (registered, compiled on first use with get_compiled_graph("state-private"))
+@register_graph("state-private")
+def build_private_state_graph() -> StateGraph:
+    builder = StateGraph(PublicState)
+    builder.add_node("node_1", node_1)
+    builder.add_node("node_2", node_2)
 
-# Add
-graph = builder.compile()
+    # Logic
+    builder.add_edge(START, "node_1")
+    builder.add_edge("node_1", "node_2")
+    builder.add_edge("node_2", END)
+    return builder
 
 
 """
@@ -133,14 +164,18 @@ def answer_node(state: OverallState) -> OutputState:
     return {"answer": "bye Lance"}
 
 
-graph1 = StateGraph(OverallState, input_schema=InputState, output_schema=OutputState)
-graph1.add_node("answer_node", answer_node)
-graph1.add_node("thinking_node", thinking_node)
-graph1.add_edge(START, "thinking_node")
-graph1.add_edge("thinking_node", "answer_node")
-graph1.add_edge("answer_node", END)
+@register_graph("state-input-output")
+def build_input_output_graph() -> StateGraph:
+    graph1 = StateGraph(OverallState, input_schema=InputState, output_schema=OutputState)
+    graph1.add_node("answer_node", answer_node)
+    graph1.add_node("thinking_node", thinking_node)
+    graph1.add_edge(START, "thinking_node")
+    graph1.add_edge("thinking_node", "answer_node")
+    graph1.add_edge("answer_node", END)
+    return graph1
 
-graph3 = graph1.compile()
 
-graph.invoke({"question":"hi"})
+if __name__ == "__main__":
+    print(get_compiled_graph("state-private").invoke({"foo": 1}))
+    print(get_compiled_graph("state-input-output").invoke({"question": "hi"}))
 